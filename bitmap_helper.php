@@ -7,6 +7,8 @@ class BitmapHelper {
     private $player_stats = null;
     private $loaded_player_bitmaps = [];
     
+    private static $prop_catalog = null;
+
     public function __construct() {
         $this->redis = new RedisHelper();
         $this->loadMetadata();
@@ -98,6 +100,127 @@ class BitmapHelper {
         return false;
     }
     
+    /**
+     * The published prop catalog, shared with the simulator (python/prop_catalog.json)
+     */
+    public static function getPropCatalog() {
+        if (self::$prop_catalog === null) {
+            $catalog_json = file_get_contents(__DIR__ . '/python/prop_catalog.json');
+            self::$prop_catalog = $catalog_json ? json_decode($catalog_json, true) : null;
+            if (!self::$prop_catalog) {
+                error_log("Failed to load prop catalog");
+                self::$prop_catalog = ['batters' => [], 'pitchers' => []];
+            }
+        }
+        return self::$prop_catalog;
+    }
+
+    /**
+     * Bitmap key of an Underdog line, e.g. hits at 1.5 -> hits_2_plus
+     */
+    public static function getPropKey($stat_name, $stat_value) {
+        foreach (self::getPropCatalog() as $stats) {
+            foreach ($stats as $stat) {
+                if ($stat['stat'] === $stat_name) {
+                    $key = isset($stat['key']) ? $stat['key'] : '{stat}_{threshold}_plus';
+                    return str_replace(['{stat}', '{threshold}'], [$stat_name, ceil($stat_value)], $key);
+                }
+            }
+        }
+        return null;
+    }
+
+    /**
+     * Bitmap of an Underdog line built from a player's published stat levels
+     * (pickem_player_levels_*) or their bit planes (pickem_player_planes_*),
+     * bit i%8 of byte i/8 set when sim i hits
+     */
+    public static function levelsBitmap($levels, $stat_name, $stat_value) {
+        if (!isset($levels['stats'][$stat_name])) {
+            return null;
+        }
+        $threshold = ceil($stat_value);
+        $comparison = '>=';
+        $catalog = self::getPropCatalog();
+        foreach ($catalog[$levels['group']] ?? [] as $stat) {
+            if ($stat['stat'] === $stat_name) {
+                if (in_array($threshold, $stat['at_most'] ?? [])) {
+                    $comparison = '<=';
+                } else if (in_array($threshold, $stat['thresholds'])) {
+                    $comparison = $stat['comparison'] ?? '>=';
+                }
+                break;
+            }
+        }
+
+        $data = $levels['stats'][$stat_name];
+        if (isset($data['planes'])) {
+            return self::planesBitmap($data, $levels['num_sims'], $comparison, $threshold);
+        }
+        $values = gzdecode(implode('', array_map('chr', $data['levels'])));
+        if ($values === false) {
+            error_log("Failed to decompress levels of {$stat_name}");
+            return null;
+        }
+        $num_sims = min(strlen($values), $levels['num_sims']);
+        $bytes = array_fill(0, intdiv($num_sims + 7, 8), 0);
+        for ($i = 0; $i < $num_sims; $i++) {
+            $value = ord($values[$i]) + $data['offset'];
+            if ($comparison === '>=' ? $value >= $threshold
+                    : ($comparison === '<=' ? $value <= $threshold : $value == $threshold)) {
+                $bytes[$i >> 3] |= 1 << ($i & 7);
+            }
+        }
+        return implode('', array_map('chr', $bytes));
+    }
+
+    /**
+     * Bitmap of a stat published as bit planes compared with a threshold,
+     * worked out with bitwise string operations over whole planes
+     */
+    private static function planesBitmap($data, $num_sims, $comparison, $threshold) {
+        $planes = gzdecode(implode('', array_map('chr', $data['planes'])));
+        if ($planes === false) {
+            error_log("Failed to decompress bit planes");
+            return null;
+        }
+        $num_bytes = intdiv($num_sims + 7, 8);
+        $planes = $data['num_planes'] > 0 ? str_split($planes, $num_bytes) : [];
+        $level = (int) $threshold - $data['offset'];
+        if ($comparison === '<=') {
+            return ~self::planesAtLeast($planes, $level + 1, $num_bytes);
+        }
+        if ($comparison === '==') {
+            return self::planesAtLeast($planes, $level, $num_bytes)
+                & ~self::planesAtLeast($planes, $level + 1, $num_bytes);
+        }
+        return self::planesAtLeast($planes, $level, $num_bytes);
+    }
+
+    /**
+     * Sims whose level is at least $level, comparing a plane at a time from
+     * the highest while tracking the sims above and still equal to $level
+     */
+    private static function planesAtLeast($planes, $level, $num_bytes) {
+        if ($level <= 0) {
+            return str_repeat("\xFF", $num_bytes);
+        }
+        if ($level >= (1 << count($planes))) {
+            return str_repeat("\0", $num_bytes);
+        }
+        $greater = str_repeat("\0", $num_bytes);
+        $equal = str_repeat("\xFF", $num_bytes);
+        for ($j = count($planes) - 1; $j >= 0; $j--) {
+            if (($level >> $j) & 1) {
+                $equal = $equal & $planes[$j];
+            } else {
+                $greater = $greater | ($equal & $planes[$j]);
+                $equal = $equal & ~$planes[$j];
+            }
+        }
+        return $greater | $equal;
+    }
+
     public function getProbability($prop_name) {
         // Parse the prop name to extract components
         $parts = explode('_', $prop_name);
@@ -46,6 +46,15 @@ try {
             }
             
             $bitmap = $full_bitmap;
+        } else if ($levels = $redis->get("pickem_player_levels_{$player_key}")
+                ?: $redis->get("pickem_player_planes_{$player_key}")) {
+            // Runs published in levels or planes storage keep each stat's value
+            // per sim rather than a bitmap per line, so build the line's bitmap here
+            $levels = json_decode($levels, true);
+            if (!$levels) {
+                throw new Exception('Failed to decode player levels JSON data');
+            }
+            $bitmap = null;
         } else {
             // Try to get non-chunked data (for backward compatibility)
             $bitmap = $redis->get("pickem_player_bitmap_" . $player_key);
@@ -60,28 +69,32 @@ try {
             }
         }
         
-        // Get the specific stat bitmap
-        $stat_key = $prop['stat_name'];
-        if (strpos($prop['stat_name'], 'first') === false) {
-            $stat_key .= '_' . ceil($prop['stat_value']) . '_plus';
-        }
-        
-        if (!isset($bitmap[$stat_key])) {
-            throw new Exception("Stat bitmap not found for: " . $stat_key);
-        }
-        
-        // The bitmap data is already a string, no need for base64_decode
-        $bitmap_data = $bitmap[$stat_key];
-        
-        // Convert array of bytes back to string if needed
-        if (is_array($bitmap_data)) {
-            $bitmap_data = implode('', array_map('chr', $bitmap_data));
-        }
-        
-        // Decompress the bitmap
-        $decompressed = gzdecode($bitmap_data);
-        if ($decompressed === false) {
-            throw new Exception('Failed to decompress bitmap data');
+        if ($bitmap === null) {
+            $decompressed = BitmapHelper::levelsBitmap($levels, $prop['stat_name'], $prop['stat_value']);
+            if ($decompressed === null) {
+                throw new Exception("Stat levels not found for: " . $prop['stat_name']);
+            }
+        } else {
+            // Get the specific stat bitmap
+            $stat_key = BitmapHelper::getPropKey($prop['stat_name'], $prop['stat_value']);
+            
+            if ($stat_key === null || !isset($bitmap[$stat_key])) {
+                throw new Exception("Stat bitmap not found for: " . ($stat_key ?? $prop['stat_name']));
+            }
+            
+            // The bitmap data is already a string, no need for base64_decode
+            $bitmap_data = $bitmap[$stat_key];
+            
+            // Convert array of bytes back to string if needed
+            if (is_array($bitmap_data)) {
+                $bitmap_data = implode('', array_map('chr', $bitmap_data));
+            }
+            
+            // Decompress the bitmap
+            $decompressed = gzdecode($bitmap_data);
+            if ($decompressed === false) {
+                throw new Exception('Failed to decompress bitmap data');
+            }
         }
         
         // For under props, invert the bitmap
@@ -110,6 +123,15 @@ try {
     
     $totalSims = $metadata['num_sims'];
     
+    // Importance-sampled runs weight each simulation by its likelihood ratio
+    $weights = null;
+    if (!empty($metadata['weighted'])) {
+        $weights = json_decode($redis->get('pickem_sim_weights') ?: 'null', true);
+        if (!is_array($weights) || count($weights) !== $totalSims) {
+            throw new Exception('Simulation weights not found');
+        }
+    }
+    
     // Count the number of simulations where all props hit
     $allHit = 0;
     $allButOneHit = 0;
@@ -129,12 +151,13 @@ try {
         }
         
         // Update counters based on number of props that hit
+        $weight = $weights === null ? 1 : $weights[$i];
         if ($propsHit === count($bitmaps)) {
-            $allHit++;
+            $allHit += $weight;
         } elseif ($propsHit === count($bitmaps) - 1) {
-            $allButOneHit++;
+            $allButOneHit += $weight;
         } elseif (count($bitmaps) >= 6 && $propsHit === count($bitmaps) - 2) {
-            $allButTwoHit++;
+            $allButTwoHit += $weight;
         }
     }
     
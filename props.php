@@ -128,6 +128,17 @@ if (isset($_GET['action']) && $_GET['action'] == 'fetch_props') {
         
         // Directly load the player stats from Redis
         $player_stats_json = $redis->get('pickem_all_player_stats');
+        // While a new slate is simulating, show its Markov chain props
+        // instead of the last published slate's
+        $preliminary_json = $redis->get('pickem_preliminary_player_stats');
+        if ($preliminary_json) {
+            $preliminary = json_decode($preliminary_json, true);
+            $metadata = $response['data']['simulation_metadata'] ? json_decode($response['data']['simulation_metadata'], true) : null;
+            if ($preliminary && ($metadata['slate'] ?? null) !== $preliminary['slate']) {
+                $player_stats_json = $preliminary_json;
+                $response['data']['preliminary'] = true;
+            }
+        }
         if (!$player_stats_json) {
             $debug_messages[] = "No simulation data found in Redis (pickem_all_player_stats)";
         } else {
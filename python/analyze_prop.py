@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 import argparse
 import json
+import math
 from prop_bitmap import PropBitmap
+from prop_catalog import load_catalog
 
 def analyze_prop(prop_id: str, redis_key_prefix: str) -> dict:
     """Analyze a prop using stored simulation results from Redis.
@@ -17,18 +19,19 @@ def analyze_prop(prop_id: str, redis_key_prefix: str) -> dict:
         # Load bitmap data from Redis
         bitmap = PropBitmap.load_from_redis(redis_key_prefix)
         
-        # Parse prop ID to get components
-        player_name, stat_type, value = prop_id.split('_', 2)
+        # Parse prop ID to get components: player, catalog stat and line
+        head, _, value = prop_id.rpartition('_')
         value = float(value)
+        stats = [stat for group in load_catalog().values() for stat in group if head.endswith(f"_{stat.stat}")]
+        if not stats:
+            raise ValueError(f"Unsupported stat type in prop: {prop_id}")
+        # The longest match, so period_1_hits is not read as hits
+        stat = max(stats, key=lambda stat: len(stat.stat))
+        player_name = head[:-len(stat.stat) - 1]
+        stat_type = stat.stat
         
-        # Construct prop name based on stat type
-        if stat_type == 'hits':
-            prop_name = f"{player_name}_hits_{int(value)}_plus"
-        elif stat_type == 'strikeouts':
-            prop_name = f"{player_name}_strikeouts_{int(value)}_plus"
-        # Add more stat types as needed...
-        else:
-            raise ValueError(f"Unsupported stat type: {stat_type}")
+        # Construct prop name from the catalog's bitmap key of the line
+        prop_name = f"{player_name}_{stat.prop_key(math.ceil(value))}"
             
         # Get probability from bitmap
         probability = bitmap.get_prob(prop_name)
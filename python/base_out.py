@@ -0,0 +1,177 @@
+"""Base-out states and the runner-advancement tables both engines resolve plays with.
+
+A base-out state is the integer 8 * outs + occupancy, where occupancy has bit
+0 set for a runner on first, bit 1 for second and bit 2 for third. The 24
+states of a half inning are 0-23, and any state >= THREE_OUTS ends it.
+"""
+import numpy as np
+
+# PA outcomes in the order sim_pa_outcome samples them
+OUTCOMES = ['1B', '2B', '3B', 'HR', 'BB', 'HBP', 'OUT']
+SINGLE, DOUBLE, TRIPLE, HOME_RUN, WALK, HIT_BY_PITCH, OUT = range(len(OUTCOMES))
+
+# Outcome split indices (SP = facing the starter, RP = facing the bullpen)
+SP, RP = 0, 1
+
+# Runner sources used by the tables: the runners on first, second and third,
+# then the batter. EMPTY is -1, so indexing [*bases, batter, None] with a
+# source yields None for an empty base.
+EMPTY, FIRST, SECOND, THIRD, BATTER = -1, 0, 1, 2, 3
+
+NUM_STATES = 24
+THREE_OUTS = 24
+
+
+def occupancy(bases):
+    """Occupancy bits of a (first, second, third) list of runner ids or None."""
+    return (bases[0] is not None) | (bases[1] is not None) << 1 | (bases[2] is not None) << 2
+
+
+def base_out_state(bases, outs):
+    return 8 * outs + occupancy(bases)
+
+
+# Runner movement on hits and free passes, keyed by outcome code. Each entry is
+# (new bases, runners who score in the order they are credited, bases after
+# the hit a lead runner may take an extra base from, first occupied one wins).
+# Walks and HBP push every runner up a base, forced or not.
+ADVANCES = {
+    SINGLE: ((BATTER, FIRST, SECOND), (THIRD,), (THIRD, SECOND)),
+    DOUBLE: ((EMPTY, BATTER, FIRST), (SECOND, THIRD), (THIRD,)),
+    TRIPLE: ((EMPTY, EMPTY, BATTER), (FIRST, SECOND, THIRD), ()),
+    HOME_RUN: ((EMPTY, EMPTY, EMPTY), (FIRST, SECOND, THIRD), ()),
+    WALK: ((BATTER, FIRST, SECOND), (THIRD,), ()),
+    HIT_BY_PITCH: ((BATTER, FIRST, SECOND), (THIRD,), ()),
+}
+
+# Lead runner trying for an extra base after a single or double, keyed by
+# (outcome, lead runner's base after the hit). Each entry is (new bases if
+# safe, whether the lead runner scores if safe, new bases if thrown out),
+# with sources taken from the bases after the hit.
+EXTRA_BASE = {
+    (SINGLE, THIRD): ((FIRST, EMPTY, SECOND), True, (FIRST, EMPTY, SECOND)),
+    (SINGLE, SECOND): ((FIRST, EMPTY, SECOND), False, (FIRST, EMPTY, EMPTY)),
+    (DOUBLE, THIRD): ((EMPTY, SECOND, EMPTY), True, (EMPTY, EMPTY, SECOND)),
+}
+
+# Ball-in-play outs with runners on, keyed by base occupancy (first, second, third).
+# Each entry is (upper bound on r, new bases, scoring runner, rbi, outs added).
+# Follow-up draws in the original scalar path (sac fly success, run scoring on
+# a force) are folded into the thresholds, which leaves the outcome
+# distribution unchanged. A run only counts if the play does not end the inning.
+BALL_IN_PLAY = {
+    (0, 0, 1): [
+        (0.558, (EMPTY, EMPTY, EMPTY), THIRD, True, 0),    # Successful sac fly
+        (0.6, (EMPTY, EMPTY, EMPTY), None, False, 1),      # Runner thrown out at home
+        (0.96, (EMPTY, EMPTY, THIRD), None, False, 0),
+        (1.0, (BATTER, EMPTY, EMPTY), None, False, 0),     # Fielder's choice
+    ],
+    (0, 1, 0): [
+        (0.46, (EMPTY, EMPTY, SECOND), None, False, 0),    # Runner advances to third
+        (0.98, (EMPTY, SECOND, EMPTY), None, False, 0),
+        (1.0, (BATTER, EMPTY, EMPTY), None, False, 0),     # Fielder's choice
+    ],
+    (0, 1, 1): [
+        (0.5, (EMPTY, EMPTY, SECOND), THIRD, True, 0),     # Sac fly, runner advances
+        (0.6, (EMPTY, SECOND, EMPTY), THIRD, True, 0),     # Sac fly, no advancement
+        (0.98, (EMPTY, SECOND, THIRD), None, False, 0),
+        (1.0, (BATTER, EMPTY, SECOND), None, False, 0),    # Fielder's choice, out at home
+    ],
+    (1, 0, 0): [
+        (0.08, (EMPTY, EMPTY, EMPTY), None, False, 1),     # Double play
+        (0.36, (EMPTY, FIRST, EMPTY), None, False, 0),     # Runner advances
+        (1.0, (FIRST, EMPTY, EMPTY), None, False, 0),
+    ],
+    (1, 0, 1): [
+        (0.07, (EMPTY, EMPTY, EMPTY), THIRD, False, 1),    # Double play, run may score
+        (0.26, (EMPTY, FIRST, EMPTY), THIRD, True, 0),     # Run scores, runner advances
+        (0.31, (EMPTY, FIRST, THIRD), None, False, 0),     # Advances to second, no score
+        (0.86, (FIRST, EMPTY, EMPTY), THIRD, True, 0),     # Sac fly
+        (1.0, (FIRST, EMPTY, THIRD), None, False, 0),
+    ],
+    (1, 1, 0): [
+        (0.08, (EMPTY, EMPTY, SECOND), None, False, 1),    # Double play, runner to third
+        (0.3, (EMPTY, FIRST, SECOND), None, False, 0),     # Both runners advance
+        (0.54, (FIRST, EMPTY, SECOND), None, False, 0),    # Runner advances to third
+        (1.0, (FIRST, SECOND, EMPTY), None, False, 0),
+    ],
+    (1, 1, 1): [
+        (0.05, (EMPTY, EMPTY, SECOND), THIRD, False, 1),   # Double play, run scores
+        # Out at first: the original scalar path credits the runner who moves up to third
+        (0.164, (EMPTY, FIRST, SECOND), SECOND, True, 0),
+        (0.17, (EMPTY, FIRST, SECOND), None, False, 1),    # Double play at home
+        (0.5, (FIRST, EMPTY, SECOND), THIRD, True, 0),     # Sac, runner advances to third
+        (0.72, (FIRST, SECOND, EMPTY), THIRD, True, 0),    # Sac, no advancement
+        (1.0, (FIRST, SECOND, THIRD), None, False, 0),
+    ],
+}
+
+
+def _bases_occupancy(sources, code):
+    """Occupancy after moving runners by sources, given the occupancy before (batter always present)."""
+    occupied = [bool(code & 1 << base) for base in range(3)] + [True]
+    return sum(1 << base for base, source in enumerate(sources) if source != EMPTY and occupied[source])
+
+
+def _compile_advances():
+    """Resolve ADVANCES for every occupancy.
+
+    ADVANCE_TABLE[outcome][occupancy] is (new bases, scoring runners that are
+    on base, new occupancy, extra-base lead base or EMPTY).
+    """
+    table = {}
+    for outcome, (sources, scorers, leads) in ADVANCES.items():
+        rows = []
+        for code in range(8):
+            occupied = [bool(code & 1 << base) for base in range(3)]
+            after = _bases_occupancy(sources, code)
+            lead = next((base for base in leads if after & 1 << base), EMPTY)
+            rows.append((sources, tuple(base for base in scorers if occupied[base]), after, lead))
+        table[outcome] = rows
+    return table
+
+
+def _compile_ball_in_play_states():
+    """Resolve BALL_IN_PLAY for every base-out state.
+
+    BALL_IN_PLAY_TABLE[state] lists (bound, new bases, scorer, rbi, outs
+    added, next state) per branch. The scorer is EMPTY when the play ends the
+    inning. States with the bases empty have no branches.
+    """
+    table = [[] for _ in range(NUM_STATES)]
+    for (first, second, third), branches in BALL_IN_PLAY.items():
+        code = first + 2 * second + 4 * third
+        for outs in range(3):
+            for bound, sources, runner, rbi, added in branches:
+                next_state = 8 * (outs + added) + _bases_occupancy(sources, code)
+                scorer = EMPTY if runner is None or next_state >= THREE_OUTS else runner
+                table[8 * outs + code].append((bound, sources, scorer, rbi, added, next_state))
+    return table
+
+
+def _compile_ball_in_play():
+    """Pack BALL_IN_PLAY into arrays indexed by occupancy code (1st + 2*2nd + 4*3rd)."""
+    width = max(len(branches) for branches in BALL_IN_PLAY.values())
+    bounds = np.ones((8, width))
+    new_bases = np.full((8, width, 3), EMPTY, dtype=np.int8)
+    scorer = np.full((8, width), EMPTY, dtype=np.int8)
+    rbi = np.zeros((8, width), dtype=bool)
+    outs = np.zeros((8, width), dtype=np.int8)
+    for (first, second, third), branches in BALL_IN_PLAY.items():
+        code = first + 2 * second + 4 * third
+        for i, (bound, bases, runner, credit, added) in enumerate(branches):
+            bounds[code, i] = bound
+            new_bases[code, i] = bases
+            scorer[code, i] = EMPTY if runner is None else runner
+            rbi[code, i] = credit
+            outs[code, i] = added
+        # Pad with copies of the last branch so the bounds stay monotonic
+        for i in range(len(branches), width):
+            bounds[code, i] = 1.0
+            new_bases[code, i] = new_bases[code, len(branches) - 1]
+    return bounds, new_bases, scorer, rbi, outs
+
+
+ADVANCE_TABLE = _compile_advances()
+BALL_IN_PLAY_TABLE = _compile_ball_in_play_states()
+BIP_BOUNDS, BIP_BASES, BIP_SCORER, BIP_RBI, BIP_OUTS = _compile_ball_in_play()
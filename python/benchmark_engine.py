@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import time
+
+import numpy as np
+
+from mlb_slate_simulator import MLB_Game_Simulator
+
+
+def time_per_sim(run, num_sims, repeats):
+    """Best-of-repeats wall time per simulated game, in microseconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - start)
+    return best / num_sims * 1e6
+
+
+def benchmark(hitter_file: str, pitcher_file: str, num_sims: int, repeats: int, seed: int) -> dict:
+    """Time one game of the slate on each engine path in a single process.
+
+    Args:
+        hitter_file: Path to hitter projections
+        pitcher_file: Path to pitcher projections
+        num_sims: Games simulated per timing run
+        repeats: Timing runs per path; the fastest is reported
+        seed: Seed for the simulator's RNG
+
+    Returns:
+        Dictionary of microseconds per simulated game for each path
+    """
+    sim = MLB_Game_Simulator(num_sims, hitter_file, pitcher_file, seed=seed)
+    away_team, home_team = sim.games[0]
+    sim.set_rng(np.random.default_rng(seed))
+
+    def scalar_rows():
+        for sim_number in range(num_sims):
+            sim.simulate_game(away_team, home_team, sim_number)
+
+    def scalar_table():
+        for _ in range(num_sims):
+            sim.play_game(away_team, home_team)
+
+    def scalar_block():
+        sim.simulate_game_block(away_team, home_team, num_sims)
+
+    def vectorized():
+        sim.engine = 'vectorized'
+        sim.simulate_block(((away_team, home_team), 0, num_sims, np.random.SeedSequence(seed)))
+        sim.engine = 'scalar'
+
+    paths = {
+        'scalar_rows': scalar_rows,
+        'scalar_table': scalar_table,
+        'scalar_block': scalar_block,
+        'vectorized': vectorized
+    }
+    return {
+        'game': f"{away_team}@{home_team}",
+        'num_sims': num_sims,
+        'us_per_sim': {name: round(time_per_sim(run, num_sims, repeats), 1) for name, run in paths.items()}
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Time per-sim cost of the simulation engines')
+    parser.add_argument('hitter_file', help='Hitter projections CSV')
+    parser.add_argument('pitcher_file', help='Pitcher projections CSV')
+    parser.add_argument('--sims', type=int, default=1000, help='Games per timing run')
+    parser.add_argument('--repeats', type=int, default=3, help='Timing runs per path')
+    parser.add_argument('--seed', type=int, default=0, help='RNG seed')
+
+    args = parser.parse_args()
+    print(json.dumps(benchmark(args.hitter_file, args.pitcher_file, args.sims, args.repeats, args.seed)))
@@ -0,0 +1,68 @@
+import logging
+import os
+import tempfile
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class GameResultCache:
+    """Disk cache of one game's simulated stat arrays.
+
+    Entries are keyed by MLB_Game_Simulator.game_key, a hash of everything a
+    game's sims depend on, and hold one int16 stats x players x sims array
+    per result group in the SharedResults layout. They are uncompressed .npz
+    files, so they are cheap to read back into the shared buffers; the least
+    recently used are removed once the directory grows past MAX_BYTES.
+    """
+
+    DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'game_cache')
+    MAX_BYTES = 2 * 1024 ** 3
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or self.DEFAULT_DIR
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        """Dict of group -> stats x players x sims array for key, or None."""
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {group: data[group] for group in data.files}
+            # Mark the entry as recently used for pruning
+            os.utime(path)
+            return arrays
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached game {key}: {str(e)}")
+            return None
+
+    def put(self, key, arrays):
+        """Atomically store a game's group -> array dict under key."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as file:
+                np.savez(file, **arrays)
+            os.replace(tmp_path, self.path(key))
+        except OSError as e:
+            logger.warning(f"Could not write cached game {key}: {str(e)}")
+
+    def prune(self):
+        if not os.path.isdir(self.cache_dir):
+            return
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.npz')]
+        total = sum(entry.stat().st_size for entry in entries)
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries:
+            if total <= self.MAX_BYTES:
+                break
+            try:
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+            except OSError:
+                pass
@@ -0,0 +1,58 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from base_out import OUTCOMES
+
+# Default tilt toward the extra-base hits and times on base behind tail
+# props like home_runs_2_plus, total_bases_8_plus and fantasy_points_14_plus
+TAIL_FACTORS = {'1B': 1.3, '2B': 1.6, '3B': 1.6, 'HR': 2.5, 'BB': 1.2, 'HBP': 1.2}
+
+
+@dataclass(frozen=True)
+class Tilt:
+    """Importance-sampling tilt of one hitter's PA outcome probabilities.
+
+    The hitter's PAs are drawn from their SP and RP outcome probabilities
+    scaled by factors and renormalized, and every sim carries the
+    likelihood ratio of the real probabilities to the tilted ones for the
+    outcomes drawn. Weighting each sim's props by it keeps their hit rates
+    unbiased, while the tilt makes the hitter's rare outcomes, and the
+    props at the tail of their stat lines, come up far more often.
+
+    Attributes:
+        player: Hitter name as in the projection files, or in player_key form
+        factors: Outcome name (OUTCOMES) -> multiplier on its probability;
+            outcomes left out keep theirs before renormalizing
+    """
+    player: str
+    factors: dict = field(default_factory=lambda: dict(TAIL_FACTORS))
+
+    def __post_init__(self):
+        unknown = set(self.factors) - set(OUTCOMES)
+        if unknown:
+            raise ValueError(f"Unknown outcomes {sorted(unknown)}, expected some of {OUTCOMES}")
+        if any(factor <= 0 for factor in self.factors.values()):
+            raise ValueError(f"Tilt factors must be positive, got {self.factors}")
+
+    def tables(self, cdf):
+        """Tilted cumulative tables and log likelihood ratios for one hitter.
+
+        Args:
+            cdf: The hitter's (2, len(OUTCOMES)) SP/RP cumulative table, as in
+                MLB_Game_Simulator.pa_cdf
+
+        Returns:
+            Tuple of (tilted cdf, log ratio) arrays of cdf's shape, where
+            log ratio [split, outcome] is log p - log q of drawing outcome
+        """
+        probs = np.diff(cdf, prepend=0.0, axis=1)
+        factors = np.array([self.factors.get(outcome, 1.0) for outcome in OUTCOMES])
+        tilted = probs * factors
+        tilted /= tilted.sum(axis=1, keepdims=True)
+        tilted_cdf = np.cumsum(tilted, axis=1)
+        tilted_cdf[:, -1] = 1.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Outcomes the hitter never has are never drawn either way
+            log_ratio = np.where(probs > 0, np.log(probs) - np.log(tilted), 0.0)
+        return tilted_cdf, log_ratio
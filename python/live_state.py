@@ -0,0 +1,66 @@
+import json
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class LiveGameState:
+    """A game in progress, to simulate the rest of the game from.
+
+    Players are named as in the projection files, or in the lowercased
+    player_key form the Redis keys use. MLB_Game_Simulator.compile_live_state
+    resolves the names against the game's two rosters.
+
+    Attributes:
+        inning: Current inning, from 1
+        half: 0 for the top of the inning, 1 for the bottom
+        outs: Outs in the half inning, 0 to 2
+        bases: Names of the runners on first, second and third, None for
+            an empty base; runners off the slate count as the pinch hitter
+        runs: (away, home) score
+        runs_inning: Runs the batting team has scored this half inning
+        order: (away, home) lineup slot, 0 to 8, of each team's next batter
+        pitchers: (away, home) pitcher on the mound; None or the starter's
+            name while the starter is in, any other name once relieved
+        stats: Player name -> {stat: count} of the game so far, in
+            HITTER_STATS and PITCHER_STATS columns; a starter's pitch count
+            is his pPC
+    """
+    inning: int
+    half: int
+    outs: int = 0
+    bases: tuple = (None, None, None)
+    runs: tuple = (0, 0)
+    runs_inning: int = 0
+    order: tuple = (0, 0)
+    pitchers: tuple = (None, None)
+    stats: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        if self.inning < 1 or self.half not in (0, 1):
+            raise ValueError(f"Invalid inning {self.inning}, half {self.half}")
+        if not 0 <= self.outs <= 2:
+            raise ValueError(f"Outs must be 0 to 2, got {self.outs}")
+        if len(self.bases) != 3 or len(self.runs) != 2 or len(self.pitchers) != 2:
+            raise ValueError("Expected three bases and an (away, home) pair of runs and pitchers")
+        if len(self.order) != 2 or not all(0 <= slot <= 8 for slot in self.order):
+            raise ValueError(f"Lineup slots must be 0 to 8, got {self.order}")
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a state from its JSON form, where the pairs are lists."""
+        return cls(**{key: tuple(value) if isinstance(value, list) else value for key, value in data.items()})
+
+
+def load_live_states(path):
+    """Read live game states from a JSON object keyed by "AWAY@HOME".
+
+    Returns:
+        Dict mapping (away_team, home_team) to LiveGameState
+    """
+    with open(path) as f:
+        data = json.load(f)
+    states = {}
+    for matchup, state in data.items():
+        away_team, _, home_team = matchup.partition('@')
+        states[(away_team, home_team)] = LiveGameState.from_dict(state)
+    return states
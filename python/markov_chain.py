@@ -0,0 +1,836 @@
+#!/usr/bin/env python3
+"""Base-out Markov chain for hitters' stat lines, without simulating.
+
+A lineup is followed PA by PA: the n-th PA it sends up is always slot
+n % 9's, so one step of the chain plays that slot's steal attempt and PA
+from each of the 24 base-out states, through the same ADVANCE_TABLE,
+EXTRA_BASE and BALL_IN_PLAY_TABLE moves and the same per-hitter SP/RP
+outcome, strikeout, steal and extra-base rates the scalar engine plays
+with.
+
+A first pass over a lineup (LineupChain.team_path) carries the inning,
+the team's runs and whether the opposing starter is still in. It gives,
+by the PAs sent up, each slot's chance of having been pinch hit for, the
+starter's chance of being pulled and the team's runs at the end of the
+eighth and ninth. A second pass (LineupChain.count_distributions) carries
+every hitter's CHAIN_STATS counts with the inning and whether the starter
+is in, and ends the game as MarkovChainCalculator.game_ends works out
+from both lineups' first passes.
+
+The chain follows the simulator's rules except for these approximations:
+
+- The starter's pitch count is followed apart from the innings and runs,
+  so pulls for pitches come at the rate of every game that has reached
+  the PA; blowup pulls come at the rate of games in the same inning and
+  base-out state.
+- Slots other than the counted hitter's bat, and run the bases, as a mix
+  of their hitter and the team's pinch hitter by the chance the slot has
+  been pinch hit for.
+- Steals and extra bases are run with the rates of the slot batting
+  before the one up, the runner on base most of the time.
+- The team's runs are taken to depend on the PAs it has sent up, not on
+  the counted hitter's line, when deciding whether the home team bats in
+  the ninth, what it trails by and whether the game goes to extra
+  innings. Deficits of MAX_DEFICIT runs or more are never made up.
+- Each extra inning is led off from where the ninth left the lineup.
+"""
+import argparse
+import json
+import logging
+import math
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from base_out import (ADVANCE_TABLE, BALL_IN_PLAY_TABLE, DOUBLE, EMPTY, EXTRA_BASE, HIT_BY_PITCH, HOME_RUN,
+                      NUM_STATES, OUT, RP, SINGLE, SP, THREE_OUTS, TRIPLE, WALK)
+from mlb_slate_simulator import MLB_Game_Simulator
+from redis_helper import RedisHelper
+from sim_results import player_key
+from slate_cache import SlateCache
+
+logger = logging.getLogger(__name__)
+
+# Events of a step of the chain: the PA outcomes, with outs split into
+# balls in play and strikeouts, and a caught stealing that ends the half
+# inning before the batter completes the PA
+STRIKEOUT, NO_PA = OUT + 1, OUT + 2
+NUM_EVENTS = NO_PA + 1
+# Chain destinations past the live states: the half inning ended on the
+# batter's PA, or on a caught stealing with the batter still up
+ENDED, CAUGHT_ENDED = THREE_OUTS, THREE_OUTS + 1
+# Whether the opposing starter is still in
+STARTER_IN, RELIEVED = 0, 1
+# Who bats or runs in a step: the slot's own hitter or the team's pinch hitter
+ORIGINAL, PINCH_HITTER = 0, 1
+
+# Stats the chain counts, as the hitter's increment on each event, and their
+# thresholds, as SimulationHandler.process_results publishes them where it
+# publishes the stat
+CHAIN_STATS = {
+    'plate_appearances': ((1, 1, 1, 1, 1, 1, 1, 1, 0), range(1, 7)),
+    'hits': ((1, 1, 1, 1, 0, 0, 0, 0, 0), range(1, 4)),
+    'singles': ((1, 0, 0, 0, 0, 0, 0, 0, 0), range(1, 3)),
+    'doubles': ((0, 1, 0, 0, 0, 0, 0, 0, 0), range(1, 3)),
+    'home_runs': ((0, 0, 0, 1, 0, 0, 0, 0, 0), range(1, 3)),
+    'total_bases': ((1, 2, 3, 4, 0, 0, 0, 0, 0), range(1, 9)),
+    'walks': ((0, 0, 0, 0, 1, 0, 0, 0, 0), range(1, 3)),
+    'batter_strikeouts': ((0, 0, 0, 0, 0, 0, 0, 1, 0), range(1, 3)),
+}
+# Simulator stat each chain stat is checked against, as a sum of hitter stats
+SIMULATED_STATS = {
+    'plate_appearances': ('bPA',),
+    'hits': ('b1B', 'b2B', 'b3B', 'bHR'),
+    'singles': ('b1B',),
+    'doubles': ('b2B',),
+    'home_runs': ('bHR',),
+    'total_bases': ('b1B', 'b2B', 'b2B', 'b3B', 'b3B', 'b3B', 'bHR', 'bHR', 'bHR', 'bHR'),
+    'walks': ('bBB',),
+    'batter_strikeouts': ('bK',),
+}
+# A hitter's counts of the CHAIN_STATS side by side, each from 0 to the
+# stat's top threshold, which holds that count or more
+COUNT_WIDTHS = [max(thresholds) + 1 for _, thresholds in CHAIN_STATS.values()]
+COUNT_OFFSETS = np.cumsum([0] + COUNT_WIDTHS[:-1])
+NUM_COUNTS = sum(COUNT_WIDTHS)
+
+
+def _count_shifts():
+    """(event, count, count) matrices adding each stat's increment on the event to a hitter's counts."""
+    shifts = np.zeros((NUM_EVENTS, NUM_COUNTS, NUM_COUNTS))
+    for (increments, _), offset, width in zip(CHAIN_STATS.values(), COUNT_OFFSETS, COUNT_WIDTHS):
+        for event, increment in enumerate(increments):
+            for count in range(width):
+                shifts[event, offset + count, offset + min(count + increment, width - 1)] = 1.0
+    return shifts
+
+
+COUNT_SHIFTS = _count_shifts()
+
+
+def _occupancy(sources, before):
+    """Occupancy after moving the runners of occupancy before by base sources."""
+    return sum(1 << base for base, source in enumerate(sources) if source != EMPTY and before & 1 << source)
+
+
+def _shift(probs, amount, axis):
+    """Shift probs up one axis by amount, keeping what passes the end at the last bin."""
+    if amount == 0:
+        return probs
+    probs = np.moveaxis(probs, axis, -1)
+    width = probs.shape[-1]
+    shifted = np.zeros_like(probs)
+    if amount < width:
+        shifted[..., amount:] = probs[..., :width - amount]
+    shifted[..., -1] += probs[..., max(width - amount, 0):].sum(axis=-1)
+    return np.moveaxis(shifted, -1, axis)
+
+
+def _conditional(joint):
+    """Rows of a joint distribution normalized, taking the marginal for rows without mass."""
+    totals = joint.sum(axis=1, keepdims=True)
+    marginal = joint.sum(axis=0) / joint.sum()
+    return np.where(totals > 0, joint / np.where(totals > 0, totals, 1.0), marginal)
+
+
+def _band(mass, negligible):
+    """Slice from the first to the last entry of mass above negligible."""
+    held = np.flatnonzero(mass > negligible)
+    return slice(held[0], held[-1] + 1) if len(held) else slice(0, 0)
+
+
+def _step(live, moves, slot, on):
+    """Play one step of the chain on (state, hitter, ..., count) probabilities.
+
+    Only the hitter up has the step's events added to their counts.
+
+    Args:
+        live: (state, hitter, ..., count) probabilities, of the first
+            states only when the rest are empty
+        moves: (up, on, other) steps for the hitter up, the hitter before
+            them and the rest, each (event, runs, destination, state)
+        slot, on: Slots of the hitter up and the hitter before them
+
+    Returns:
+        (destination, hitter, ..., count) probabilities
+    """
+    states = len(live)
+    up, on_base, other = (move[..., :states].sum(axis=1) for move in moves)
+    destinations = other.shape[1]
+    stepped = (other.sum(axis=0) @ live.reshape(states, -1)).reshape((destinations,) + live.shape[1:])
+    stepped[:, on] = (on_base.sum(axis=0) @ live[:, on].reshape(states, -1)).reshape(
+        (destinations,) + live.shape[2:])
+    batted = (up.reshape(-1, states) @ live[:, slot].reshape(states, -1)).reshape(
+        (NUM_EVENTS, destinations) + live.shape[2:])
+    # Every event's count shift in one product over (event, count)
+    batted = np.moveaxis(batted, 0, -2)
+    stepped[:, slot] = batted.reshape(batted.shape[:-2] + (-1,)) @ COUNT_SHIFTS.reshape(-1, NUM_COUNTS)
+    return stepped
+
+
+def _late_step(live, moves, slot, on, late_runs):
+    """Play one step of the chain on late innings' (state, marker, hitter, count) probabilities.
+
+    As _step, with the step's runs moving the markers by late_runs.
+
+    Args:
+        live: (state, marker, hitter, count) probabilities, of the first
+            states only when the rest are empty
+        moves: (up, on, other) steps as for _step
+        slot, on: Slots of the hitter up and the hitter before them
+        late_runs: GameEnd.late_runs
+
+    Returns:
+        (destination, marker, hitter, count) probabilities over the markers
+        after the step, the last one a walk-off
+    """
+    states = len(live)
+    runs, markers, after = late_runs.shape
+    folding = late_runs.reshape(runs * markers, after).T
+
+    def play(move, part):
+        # (..., destination, runs) rows by (marker, ...) columns, then the
+        # runs and markers folded together
+        ordered = np.swapaxes(move[..., :states], -3, -2)
+        reached = ordered.reshape(-1, states) @ part.reshape(states, -1)
+        return folding @ reached.reshape(-1, runs * markers, part[0, 0].size)
+
+    up, on_base, other = moves
+    destinations = other.shape[2]
+    stepped = play(other.sum(axis=0), live).reshape((destinations, after) + live.shape[2:])
+    stepped[:, :, on] = play(on_base.sum(axis=0), live[:, :, on])
+    batted = play(up, live[:, :, slot]).reshape((NUM_EVENTS, destinations, after, NUM_COUNTS))
+    batted = np.moveaxis(batted, 0, -2)
+    stepped[:, :, slot] = batted.reshape(batted.shape[:-2] + (-1,)) @ COUNT_SHIFTS.reshape(-1, NUM_COUNTS)
+    return stepped
+
+
+@dataclass(frozen=True)
+class LineupPath:
+    """A lineup's LineupChain.team_path, indexed by the PAs the lineup has sent up.
+
+    Attributes:
+        replaced: (PAs, slot) chance each slot's hitter has been pinch hit
+            for by the PA, the slot up included
+        pitch_hazard: (PAs,) chance the starter is pulled for the pitch count at the PA
+        blowup_hazard: (PAs, inning, state) chance the starter is pulled for
+            the inning's runs at the PA
+        eighth, ninth: (PAs, runs) chance the eighth and ninth end after that
+            many PAs with the team at those runs
+    """
+    replaced: np.ndarray
+    pitch_hazard: np.ndarray
+    blowup_hazard: np.ndarray
+    eighth: np.ndarray
+    ninth: np.ndarray
+
+
+@dataclass(frozen=True)
+class GameEnd:
+    """How a lineup's game ends, for LineupChain.count_distributions.
+
+    After its last regular inning a lineup's game is over or goes on to
+    late innings, which carry a marker: the home team's deficit or the away
+    team's runs in the inning.
+
+    Attributes:
+        innings: Regular innings, played out in full (9 away, 8 home)
+        after_regulation: (PAs, 1 + marker) chance, by the PAs sent up when
+            the last regular inning ends, of the game being over, then of
+            going on with each marker
+        late_runs: (runs, marker, 1 + marker) marker after a step scoring
+            runs, the last column ending the game on a walk-off
+        late_end: (marker, marker) chance a late inning ending at a marker
+            goes on to another starting at each marker
+    """
+    innings: int
+    after_regulation: np.ndarray
+    late_runs: np.ndarray
+    late_end: np.ndarray
+
+
+class LineupChain:
+    """Base-out chain of one team's lineup batting against the other team's starter and bullpen.
+
+    Attributes:
+        lineup: The nine hitters by batting order
+        pinch_hitter: The team's pinch hitter, who takes a removed hitter's place
+        starter: The opposing starter
+        moves: (slot, split, batter, runner, event, runs, destination, state)
+            probabilities of one step, from each live state to a live state,
+            ENDED or CAUGHT_ENDED, with the batter and the runner ORIGINAL or
+            PINCH_HITTER
+        pa_pitches: (slot, batter, pitches) chance of each pitch count of a
+            PA against the starter
+        pull_hazard: Chance the starter is pulled at each pitch count, the
+            last holding the starter's MPC and above
+    """
+    # Batters up in a half inning inning_runs follows; the mass left after
+    # 24 is below 1e-9
+    MAX_BATTERS = 24
+    # Most runs a single step can score, and the caps on runs in a half
+    # inning and a game (higher totals are counted at the cap)
+    MAX_PLAY_RUNS = 4
+    MAX_INNING_RUNS = 15
+    MAX_GAME_RUNS = 40
+    # Most PAs of a lineup's game the chain follows
+    MAX_PAS = 150
+    REGULATION_INNINGS = 9
+    # Runs in an inning that blow the starter up in the first, as in
+    # handle_pitching_change; each later inning takes one fewer
+    BLOWUP_RUNS = 8
+    # Chance any PA is the last of a hitter's game, before pinch-hitting risk
+    REMOVAL_RATE = 0.01
+    # Chance of the starter leaving with an injury or ejection at each PA
+    INJURY_RATE = 0.0015
+    # Live mass below which a pass stops, ending the games left where they
+    # are, and mass of an inning's games below which the inning is played
+    # out no further
+    TOLERANCE = 1e-7
+    NEGLIGIBLE = 1e-12
+
+    def __init__(self, simulator, team, opponent):
+        """
+        Args:
+            simulator: MLB_Game_Simulator of the slate
+            team: The batting team
+            opponent: The team whose starter and bullpen pitch
+        """
+        self.sim = simulator
+        self.team = team
+        self.lineup = simulator.create_lineup(team)
+        self.pinch_hitter = simulator.pinch_hitters[simulator.team_ids[team]]
+        self.starter = simulator.get_pitcher(opponent)
+
+        transitions = {}
+
+        def transition(batter, runner, split):
+            key = (batter['Index'], runner['Index'], split)
+            if key not in transitions:
+                transitions[key] = self.transition(batter, runner, split).swapaxes(-1, -2)
+            return transitions[key]
+
+        self.moves = np.array([[[[transition(batter, runner, split)
+                                  for runner in (self.lineup[slot - 1], self.pinch_hitter)]
+                                 for batter in (hitter, self.pinch_hitter)]
+                                for split in (SP, RP)] for slot, hitter in enumerate(self.lineup)])
+
+        pitches = {kind: self.pitch_pmf(*simulator.pitch_distribution(self.starter['Index'], kind))
+                   for kind in simulator.PITCHES_PER_OUTCOME}
+        longest = max(len(pmf) for pmf in pitches.values())
+        pitches = {kind: np.pad(pmf, (0, longest - len(pmf))) for kind, pmf in pitches.items()}
+        self.pa_pitches = np.array([[sum(p * pitches[kind] for kind, p in self.pitch_kinds(batter).items())
+                                     for batter in (hitter, self.pinch_hitter)] for hitter in self.lineup])
+
+        projected, most = self.starter['PPC'], self.starter['MPC']
+        counts = np.arange(max(int(math.ceil(most)), 0) + 1)
+        spread = most - projected if most > projected else 1.0
+        self.pull_hazard = np.where(counts >= most, 1.0,
+                                    np.where(counts >= projected,
+                                             np.clip(0.5 + 0.5 * (counts - projected) / spread, 0, 1), 0.0))
+
+    def transition(self, batter, runner, split):
+        """One batter's step of the chain for a split, from steal attempt to the end of the PA.
+
+        Args:
+            batter: Hitter due up
+            runner: Hitter whose steal and extra-base rates the runners take
+            split: SP or RP
+
+        Returns:
+            (event, runs, state, destination) probabilities
+        """
+        probs = np.diff(self.sim.pa_cdf[batter['Index']][split], prepend=0.0)
+        strikeout = self.sim.k_per_out[batter['Index']][split]
+        steal = np.clip(self.sim.steal_rates[runner['Index']][split], 0, 1)
+        advance = np.clip(self.sim.advance_rates[runner['Index']][split], 0, 1)
+        moves = np.zeros((NUM_EVENTS, self.MAX_PLAY_RUNS + 1, NUM_STATES, NUM_STATES + 2))
+        for state in range(NUM_STATES):
+            for start, p in self.steal_branches(state, *steal):
+                if start >= THREE_OUTS:
+                    moves[NO_PA, 0, state, CAUGHT_ENDED] += p
+                    continue
+                for event, runs, end, q in self.plate_appearance_branches(start, probs, strikeout, *advance):
+                    moves[event, runs, state, min(end, ENDED)] += p * q
+        return moves
+
+    @staticmethod
+    def steal_branches(state, attempt, success):
+        """(state, probability) after the lead runner's steal attempt, as in sim_stolen_base."""
+        if not state & 3 or state & 4:
+            return [(state, 1.0)]
+        lead = 1 if state & 2 else 0
+        return [(state, 1 - attempt), (state + (1 << lead), attempt * success),
+                (state + 8 - (1 << lead), attempt * (1 - success))]
+
+    @staticmethod
+    def plate_appearance_branches(state, probs, strikeout, attempt, success):
+        """(event, runs, state, probability) of every way a PA from state can end.
+
+        Follows advance_runners, extra_base_advancement and resolve_out.
+        """
+        occupied, outs = state & 7, state >> 3
+        branches = []
+        for outcome in (SINGLE, DOUBLE, TRIPLE, HOME_RUN, WALK, HIT_BY_PITCH):
+            p = probs[outcome]
+            _, scorers, after, lead = ADVANCE_TABLE[outcome][occupied]
+            runs = len(scorers) + (outcome == HOME_RUN)
+            if lead == EMPTY:
+                branches.append((outcome, runs, 8 * outs + after, p))
+                continue
+            safe, scores, thrown_out = EXTRA_BASE[(outcome, lead)]
+            branches += [(outcome, runs, 8 * outs + after, p * (1 - attempt)),
+                         (outcome, runs + scores, 8 * outs + _occupancy(safe, after), p * attempt * success),
+                         (outcome, runs, 8 * (outs + 1) + _occupancy(thrown_out, after), p * attempt * (1 - success))]
+
+        p, state = probs[OUT], state + 8
+        branches.append((STRIKEOUT, 0, state, p * strikeout))
+        if state >= THREE_OUTS or not occupied:
+            branches.append((OUT, 0, state, p * (1 - strikeout)))
+            return branches
+        bound = 0.0
+        for upper, _, scorer, _, _, next_state in BALL_IN_PLAY_TABLE[state]:
+            branches.append((OUT, int(scorer != EMPTY), next_state, p * (1 - strikeout) * (upper - bound)))
+            bound = upper
+        return branches
+
+    @staticmethod
+    def pitch_pmf(mean, std, minimum):
+        """Chance of each pitch count of a PA, as refill_pitch_pool draws them."""
+        minimum = int(minimum)
+        top = max(int(math.ceil(mean + 8 * std)), minimum) + 1
+        if std > 0:
+            below = [0.5 * math.erfc((mean - count - 0.5) / (std * math.sqrt(2))) for count in range(top + 1)]
+            pmf = np.diff(below, prepend=0.0)
+        else:
+            pmf = np.zeros(top + 1)
+            pmf[min(max(int(np.rint(mean)), 0), top)] = 1.0
+        pmf[minimum] += pmf[:minimum].sum()
+        pmf[:minimum] = 0.0
+        return pmf / pmf.sum()
+
+    def pitch_kinds(self, batter):
+        """Chance a batter's PA against the starter ends in each pitch-count kind."""
+        probs = np.diff(self.sim.pa_cdf[batter['Index']][SP], prepend=0.0)
+        strikeouts = probs[OUT] * self.sim.k_per_out[batter['Index']][SP]
+        return {'hit': probs[:WALK].sum(), 'bb': probs[WALK], 'hbp': probs[HIT_BY_PITCH], 'k': strikeouts,
+                'out': probs[OUT] - strikeouts}
+
+    def mixed_moves(self, slot, split, batter_replaced, runner_replaced):
+        """A slot's (event, runs, destination, state) step with its batter and runner pinch hit for at these chances."""
+        batter = np.array([1 - batter_replaced, batter_replaced])
+        runner = np.array([1 - runner_replaced, runner_replaced])
+        return np.tensordot(np.outer(batter, runner), self.moves[slot, split], axes=2)
+
+    def team_path(self):
+        """Follow the lineup PA by PA through nine innings without counting any hitter's stats.
+
+        Carries the base-out state, the inning and the team's runs, and while
+        the starter is in the runs in the inning, which handle_pitching_change
+        pulls a starter on. The starter's pitch count is carried on its own,
+        over the games still in at each PA.
+
+        Returns:
+            LineupPath of the lineup
+        """
+        innings = self.REGULATION_INNINGS
+        runs = self.MAX_GAME_RUNS + 1
+        # Runs in the inning that blow the starter up, by inning
+        blowup = np.arange(self.BLOWUP_RUNS + 1) >= (innings - 1 - np.arange(innings))[:, None]
+        # (state, inning, runs in the inning, runs) with the starter in and
+        # (state, inning, runs) once relieved
+        live = [np.zeros((NUM_STATES, innings, self.BLOWUP_RUNS + 1, runs)), np.zeros((NUM_STATES, innings, runs))]
+        live[STARTER_IN][0, 0, 0, 0] = 1.0
+        pitches = np.zeros(len(self.pull_hazard))
+        pitches[0] = 1.0
+        replaced = np.zeros(9)
+        path = {'replaced': [], 'pitch_hazard': [], 'blowup_hazard': []}
+        ends = np.zeros((2, self.MAX_PAS + 1, runs))
+        for pas in range(self.MAX_PAS):
+            slot = pas % 9
+            ph_risk = self.lineup[slot]['PH']
+            reached = live[STARTER_IN].sum() + live[RELIEVED].sum()
+            survivors = pitches.sum()
+            pitch_hazard = pitches @ self.pull_hazard / survivors if survivors > 0 else 1.0
+            stays = (1 - self.INJURY_RATE) * (1 - pitch_hazard) * ~blowup
+            # Games with the starter in blowing up, and all, by inning and state
+            blowups = np.zeros((2, innings, NUM_STATES))
+            upcoming = [np.zeros_like(part) for part in live]
+            if reached < self.TOLERANCE:
+                # Past nine innings every hitter up faces the bullpen
+                replaced[slot] = 1 - (1 - replaced[slot]) * (1 - self.REMOVAL_RATE) * (1 - ph_risk)
+                path['replaced'].append(replaced.copy())
+                appearances = 0
+            else:
+                # Innings whose games have all but run out are dropped
+                band = _band(live[STARTER_IN].sum(axis=(0, 2, 3)) + live[RELIEVED].sum(axis=(0, 2)), self.NEGLIGIBLE)
+                pending = live
+                appearances = 2
+            for appearance in range(appearances):
+                # A half inning ended by a caught stealing brings the batter
+                # back up leading off the next one
+                states = NUM_STATES if appearance == 0 else 1
+                if appearance:
+                    band = slice(band.start + 1, min(band.stop + 1, innings))
+                starter_in, relieved = (part[:states, band] for part in pending)
+                if appearance and not (starter_in.any() or relieved.any()):
+                    break
+                pending = [np.zeros_like(part) for part in live]
+                blowups[0, band, :states] += (starter_in * blowup[band, :, None]).sum(axis=(2, 3)).T
+                blowups[1, band, :states] += starter_in.sum(axis=(2, 3)).T
+                pulled = starter_in * (1 - stays[band])[:, :, None]
+                starter_in = starter_in - pulled
+                relieved = relieved + pulled.sum(axis=2)
+                removed = (self.REMOVAL_RATE * (starter_in.sum() + relieved.sum())
+                           + (1 - self.REMOVAL_RATE) * ph_risk * relieved.sum())
+                replaced[slot] = 1 - (1 - replaced[slot]) * (1 - removed / reached)
+                if appearance == 0:
+                    path['replaced'].append(replaced.copy())
+
+                following = slice(band.start + 1, min(band.stop + 1, innings))
+                for starter, split, part in ((STARTER_IN, SP, starter_in), (RELIEVED, RP, relieved)):
+                    moves = self.mixed_moves(slot, split, replaced[slot], replaced[slot - 1]).sum(axis=0)[..., :states]
+                    stepped = (moves.reshape(-1, states) @ part.reshape(states, -1)).reshape(
+                        (self.MAX_PLAY_RUNS + 1, NUM_STATES + 2) + part.shape[1:])
+                    # Runs scored go on the game's runs and, with the starter
+                    # in, the inning's
+                    stepped = sum(_shift(stepped[scored], scored, -1) if starter == RELIEVED
+                                  else _shift(_shift(stepped[scored], scored, -1), scored, -2)
+                                  for scored in range(self.MAX_PLAY_RUNS + 1))
+                    upcoming[starter][:, band] += stepped[:NUM_STATES]
+                    for into, at, ended in ((upcoming, pas + 1, stepped[ENDED]), (pending, pas, stepped[CAUGHT_ENDED])):
+                        totals = ended.sum(axis=1) if starter == STARTER_IN else ended
+                        for inning in range(max(band.start, innings - 2), band.stop):
+                            ends[inning - (innings - 2), at] += totals[inning - band.start]
+                        # The next inning starts with no runs in it
+                        count = following.stop - following.start
+                        if starter == STARTER_IN:
+                            into[starter][0, following, 0] += totals[:count]
+                        else:
+                            into[starter][0, following] += totals[:count]
+            live = upcoming
+
+            path['pitch_hazard'].append(pitch_hazard)
+            path['blowup_hazard'].append(np.where(blowups[1] > 0, blowups[0] / np.where(blowups[1] > 0, blowups[1], 1),
+                                                  blowup[:, :1]))
+            pa = (1 - replaced[slot]) * self.pa_pitches[slot, ORIGINAL] + replaced[slot] * self.pa_pitches[slot, PINCH_HITTER]
+            grown = np.convolve(pitches * (1 - self.pull_hazard), pa)
+            pitches = grown[:len(pitches)]
+            pitches[-1] += grown[len(pitches):].sum()
+        return LineupPath(replaced=np.array(path['replaced']), pitch_hazard=np.array(path['pitch_hazard']),
+                          blowup_hazard=np.array(path['blowup_hazard']), eighth=ends[0], ninth=ends[1])
+
+    def count_distributions(self, path, end):
+        """Distribution of every hitter's CHAIN_STATS counts over the game.
+
+        Follows the lineup PA by PA as team_path does, carrying every
+        hitter's counts, and hands each count to the hitter's final line
+        when the hitter is removed or the game ends. The hitter up is
+        pinch hit for with the simulator's chances; the other slots bat as
+        mixes by path.replaced.
+
+        Args:
+            path: The lineup's team_path
+            end: The lineup's GameEnd
+
+        Returns:
+            (slot, count) probabilities, the stats side by side at COUNT_OFFSETS
+        """
+        innings = end.innings
+        markers = len(end.late_end)
+        start = np.zeros(NUM_COUNTS)
+        start[COUNT_OFFSETS] = 1.0
+        # regular[state, hitter, starter in or relieved, inning, count] and
+        # late[state, marker, hitter, count], always against the bullpen
+        regular = np.zeros((NUM_STATES, 9, 2, innings, NUM_COUNTS))
+        regular[0, :, STARTER_IN, 0] = start
+        late = np.zeros((NUM_STATES, markers, 9, NUM_COUNTS))
+        final = np.zeros((9, NUM_COUNTS))
+
+        def end_regulation(ended, at, into):
+            """Send (hitter, count) probabilities ending the last regular inning after at PAs on or out."""
+            after = end.after_regulation[at]
+            final[:] += after[0] * ended
+            into[0] += after[1:, None, None] * ended
+
+        for pas in range(self.MAX_PAS):
+            if regular.sum() + late.sum() < self.TOLERANCE:
+                break
+            slot, on = pas % 9, (pas - 1) % 9
+            replaced = path.replaced[pas]
+            stays = ((1 - self.INJURY_RATE) * (1 - path.pitch_hazard[pas])
+                     * (1 - path.blowup_hazard[pas, :innings])).T[:, None, :, None]
+            removal = (self.REMOVAL_RATE, 1 - (1 - self.REMOVAL_RATE) * (1 - self.lineup[slot]['PH']))
+            moves = [(self.mixed_moves(slot, split, 0.0, replaced[on]),
+                      self.mixed_moves(slot, split, replaced[slot], 0.0),
+                      self.mixed_moves(slot, split, replaced[slot], replaced[on])) for split in (SP, RP)]
+            # Regular innings have no use for the runs, nor the other hitters for the events
+            regular_moves = [(up.sum(axis=1, keepdims=True), on_base.sum(axis=(0, 1), keepdims=True),
+                              other.sum(axis=(0, 1), keepdims=True)) for up, on_base, other in moves]
+            up, on_base, other = moves[RP]
+            late_moves = (up, on_base.sum(axis=0, keepdims=True), other.sum(axis=0, keepdims=True))
+
+            # Innings whose games have all but run out end where they are
+            band = _band(regular.sum(axis=(0, 1, 2, 4)), self.NEGLIGIBLE)
+            dropped = np.ones(innings, dtype=bool)
+            dropped[band] = False
+            final += regular[:, :, :, dropped].sum(axis=(0, 2, 3))
+
+            upcoming = [np.zeros_like(regular), np.zeros_like(late)]
+            pending = [regular, late]
+            for appearance in range(2):
+                # A half inning ended by a caught stealing brings the batter
+                # back up leading off the next one
+                states = NUM_STATES if appearance == 0 else 1
+                if appearance:
+                    band = slice(band.start + 1, min(band.stop + 1, innings))
+                regular, late = pending[0][:states, :, :, band], pending[1][:states]
+                if not (regular.any() or late.any()):
+                    break
+                pending = [np.zeros_like(part) for part in upcoming]
+                pulled = regular[:, :, STARTER_IN] * (1 - stays[:states, :, band])
+                regular[:, :, STARTER_IN] -= pulled
+                regular[:, :, RELIEVED] += pulled
+                for starter in (STARTER_IN, RELIEVED):
+                    removed = removal[starter] * regular[:, slot, starter]
+                    final[slot] += removed.sum(axis=(0, 1))
+                    regular[:, slot, starter] -= removed
+                removed = removal[RELIEVED] * late[:, :, slot]
+                final[slot] += removed.sum(axis=(0, 1))
+                late[:, :, slot] -= removed
+
+                following = slice(band.start + 1, min(band.stop + 1, innings))
+                for starter, split in ((STARTER_IN, SP), (RELIEVED, RP)):
+                    # Games all but run out with or without the starter end where they are
+                    part = regular[:, :, starter]
+                    if part.sum() < self.NEGLIGIBLE:
+                        final += part.sum(axis=(0, 2))
+                        part[:] = 0.0
+                        continue
+                    stepped = _step(part, regular_moves[split], slot, on)
+                    upcoming[0][:, :, starter, band] += stepped[:NUM_STATES]
+                    for into, at, ended in ((upcoming, pas + 1, stepped[ENDED]), (pending, pas, stepped[CAUGHT_ENDED])):
+                        into[0][0, :, starter, following] += ended[:, :following.stop - following.start]
+                        if band.stop == innings:
+                            end_regulation(ended[:, -1], at, into[1])
+
+                if not late.any():
+                    continue
+                stepped = _late_step(late, late_moves, slot, on, end.late_runs)
+                # The last marker column is the game ending on a walk-off
+                final += stepped[:, -1].sum(axis=0)
+                upcoming[1] += stepped[:NUM_STATES, :-1]
+                for into, ended in ((upcoming, stepped[ENDED, :-1]), (pending, stepped[CAUGHT_ENDED, :-1])):
+                    going_on = np.tensordot(end.late_end, ended, axes=([0], [0]))
+                    into[1][0] += going_on
+                    final += ended.sum(axis=0) - going_on.sum(axis=0)
+            regular, late = upcoming
+        return final + regular.sum(axis=(0, 2, 3)) + late.sum(axis=(0, 1))
+
+    def inning_runs(self, replaced):
+        """Batters up and runs scored in a half inning against the bullpen, by leadoff slot.
+
+        Args:
+            replaced: Chance each slot has been pinch hit for
+
+        Returns:
+            (leadoff slot, batters up, runs) probabilities; a half inning
+            ended by a caught stealing counts the batter left up as not up
+        """
+        # Steps as (slot, runs, destination, state) matrices to multiply live mass by
+        moves = np.array([self.mixed_moves(slot, RP, replaced[slot], replaced[slot - 1]).sum(axis=0)
+                          for slot in range(9)])
+        slots = np.arange(9)
+        live = np.zeros((9, NUM_STATES, self.MAX_INNING_RUNS + 1))
+        live[:, 0, 0] = 1.0
+        innings = np.zeros((9, self.MAX_BATTERS + 1, self.MAX_INNING_RUNS + 1))
+        for n in range(self.MAX_BATTERS):
+            reached = moves[(slots + n) % 9] @ live[:, None]
+            step = sum(_shift(reached[:, scored], scored, -1) for scored in range(self.MAX_PLAY_RUNS + 1))
+            innings[:, n + 1] += step[:, ENDED]
+            innings[:, n] += step[:, CAUGHT_ENDED]
+            live = step[:, :NUM_STATES]
+        return innings
+
+
+class MarkovChainCalculator:
+    """Stat distributions of every lineup's hitters on a slate, from LineupChains.
+
+    Gives the same props as a published run, at the probabilities the
+    simulator converges to up to the chain's approximations, while the
+    sims are still running, and checks the simulator against them with
+    compare.
+    """
+    # Deficits the home team is followed coming back from, and runs the
+    # away team is followed scoring in an extra inning
+    MAX_DEFICIT = 6
+
+    def __init__(self, simulator):
+        """
+        Args:
+            simulator: MLB_Game_Simulator of the slate, whose rates the chains use
+        """
+        self.sim = simulator
+
+    def game_distributions(self, away_team, home_team):
+        """Distribution of every chain stat of both lineups of a game.
+
+        Returns:
+            {(player name, team): {stat: probabilities of 0, 1, ... up to
+            the stat's top threshold, which holds that count or more}}
+        """
+        chains = [LineupChain(self.sim, away_team, home_team), LineupChain(self.sim, home_team, away_team)]
+        paths = [chain.team_path() for chain in chains]
+        distributions = {}
+        for chain, path, end in zip(chains, paths, self.game_ends(chains, paths)):
+            counts = chain.count_distributions(path, end)
+            for slot, batter in enumerate(chain.lineup):
+                distributions[(batter['Name'], batter['Team'])] = {
+                    stat: counts[slot, offset:offset + width]
+                    for stat, offset, width in zip(CHAIN_STATS, COUNT_OFFSETS, COUNT_WIDTHS)}
+        return distributions
+
+    def game_ends(self, chains, paths):
+        """GameEnds of a game's away and home lineups.
+
+        The home team bats in the ninth unless ahead after the top of it,
+        trailing by the away team's runs after nine less its own after
+        eight, given the PAs it sent up in eight; the away team plays on
+        after the ninth if the home team's nine innings, walk-offs aside,
+        tie its runs given the PAs it sent up in nine. In extra innings the
+        away team scores from its inning_runs and the home team has to
+        match it from its own.
+
+        Args:
+            chains: The away and home LineupChains
+            paths: Their team_paths
+
+        Returns:
+            [away GameEnd, home GameEnd]
+        """
+        depth = self.MAX_DEFICIT
+        away_path, home_path = paths
+        away_nine, home_nine = away_path.ninth.sum(axis=0), home_path.ninth.sum(axis=0)
+        padded = np.concatenate((away_nine, np.zeros(depth)))
+        # Game over, then each deficit, by the home team's runs after eight
+        deficits = np.array([np.concatenate(([away_nine[:runs].sum()], padded[runs:runs + depth],
+                                             [away_nine[runs + depth:].sum()])) for runs in range(len(away_nine))])
+        home_after = _conditional(home_path.eighth) @ deficits
+        tied = _conditional(away_path.ninth) @ home_nine
+        away_after = np.zeros_like(home_after)
+        away_after[:, 0], away_after[:, 1] = 1 - tied, tied
+
+        away_extra, home_extra = [self.extra_inning_runs(chain, path) for chain, path in zip(chains, paths)]
+        home_late_end = np.zeros((depth + 1, depth + 1))
+        home_late_end[0] = np.append(away_extra[:depth], away_extra[depth:].sum())
+        away_late_end = np.zeros((depth + 1, depth + 1))
+        away_late_end[:depth, 0] = home_extra[:depth]
+        if away_extra[depth:].sum() > 0:
+            away_late_end[depth, 0] = away_extra[depth:] @ home_extra[depth:] / away_extra[depth:].sum()
+
+        home_late_runs = np.zeros((LineupChain.MAX_PLAY_RUNS + 1, depth + 1, depth + 2))
+        away_late_runs = np.zeros_like(home_late_runs)
+        for scored in range(LineupChain.MAX_PLAY_RUNS + 1):
+            for marker in range(depth + 1):
+                away_late_runs[scored, marker, min(marker + scored, depth)] = 1.0
+                if marker == depth:
+                    home_late_runs[scored, marker, depth] = 1.0
+                elif scored <= marker:
+                    home_late_runs[scored, marker, marker - scored] = 1.0
+                else:
+                    home_late_runs[scored, marker, -1] = 1.0
+        return [GameEnd(innings=9, after_regulation=away_after, late_runs=away_late_runs, late_end=away_late_end),
+                GameEnd(innings=8, after_regulation=home_after, late_runs=home_late_runs, late_end=home_late_end)]
+
+    @staticmethod
+    def extra_inning_runs(chain, path):
+        """A lineup's runs in an extra inning, led off from where its ninth ended."""
+        ended = path.ninth.sum(axis=1)
+        leadoffs = np.bincount(np.arange(len(ended)) % 9, weights=ended, minlength=9)
+        typical = int(round(ended @ np.arange(len(ended)) / ended.sum()))
+        return leadoffs / leadoffs.sum() @ chain.inning_runs(path.replaced[typical]).sum(axis=1)
+
+    def player_distributions(self, games=None):
+        """Chain stat distributions of every lineup's hitters, by (player name, team)."""
+        distributions = {}
+        for away_team, home_team in games or self.sim.games:
+            distributions.update(self.game_distributions(away_team, home_team))
+            logger.debug(f'Chained {away_team}@{home_team}')
+        return distributions
+
+    def player_stats(self, games=None):
+        """Hitter props in the structure of pickem_all_player_stats.
+
+        Each prop's count is its probability, with total_sims 1, so count /
+        total_sims reads the same as for a published run.
+        """
+        player_stats = {'batters': {}, 'pitchers': {}}
+        for (name, _), distributions in self.player_distributions(games).items():
+            player_stats['batters'][player_key(name)] = {
+                'stats': {stat: {str(threshold): float(distributions[stat][threshold:].sum())
+                                 for threshold in thresholds}
+                          for stat, (_, thresholds) in CHAIN_STATS.items()},
+                'total_sims': 1
+            }
+        return player_stats
+
+    def compare(self, num_sims=2000, games=None):
+        """Check the simulator's hitter props against the chain's.
+
+        Simulates num_sims games of each matchup and compares every chain
+        prop's simulated hit rate with the chain probability by z-score.
+
+        Returns:
+            DataFrame with one row per hitter, stat and threshold, sorted by |z|
+        """
+        rows = []
+        for game in games or self.sim.games:
+            distributions = self.game_distributions(*game)
+            block = self.sim.simulate_games([game], num_sims=num_sims)['hitters']
+            for i, player in enumerate(zip(block['player'], block['team'])):
+                if player not in distributions:
+                    continue
+                for stat, (_, thresholds) in CHAIN_STATS.items():
+                    values = sum(block['stats'][column][i] for column in SIMULATED_STATS[stat])
+                    for threshold in thresholds:
+                        chain_p = distributions[player][stat][threshold:].sum()
+                        sim_p = (values >= threshold).mean()
+                        se = math.sqrt(chain_p * (1 - chain_p) / len(values))
+                        rows.append({
+                            'player': player[0],
+                            'stat': stat,
+                            'threshold': threshold,
+                            'chain_probability': chain_p,
+                            'sim_probability': sim_p,
+                            'z': (sim_p - chain_p) / se if se > 0 else 0.0
+                        })
+        comparison = pd.DataFrame(rows)
+        return comparison.reindex(comparison['z'].abs().sort_values(ascending=False).index)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Hitter props of a slate from the base-out Markov chain')
+    parser.add_argument('hitter_file', help='Hitter projections CSV')
+    parser.add_argument('pitcher_file', help='Pitcher projections CSV')
+    parser.add_argument('--publish', action='store_true',
+                        help='Store the props as the preliminary stats props.php shows until a run is published')
+    parser.add_argument('--compare', type=int, metavar='SIMS',
+                        help='Check the simulator against the chain with this many sims per game')
+    args = parser.parse_args()
+
+    try:
+        calculator = MarkovChainCalculator(MLB_Game_Simulator(args.compare or 1, args.hitter_file, args.pitcher_file))
+        if args.compare:
+            comparison = calculator.compare(num_sims=args.compare)
+            result = {'success': True, 'worst': json.loads(comparison.head(20).to_json(orient='records'))}
+        else:
+            player_stats = calculator.player_stats()
+            if args.publish:
+                redis = RedisHelper.get_instance()
+                player_stats['slate'] = SlateCache(redis=redis).key(args.hitter_file, args.pitcher_file)
+                redis.set('pickem_preliminary_player_stats', json.dumps(player_stats))
+            result = {'success': True, 'player_stats': player_stats}
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    print(json.dumps(result))
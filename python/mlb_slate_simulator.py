@@ -1,546 +1,1056 @@
-import collections
-import csv
+import array
+import hashlib
 import itertools
+import json
+import time
+import zlib
 import multiprocessing as mp
 import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
+from base_out import (OUTCOMES, SINGLE, DOUBLE, TRIPLE, HOME_RUN, WALK, HIT_BY_PITCH, OUT, SP, RP, EMPTY,
+                      THREE_OUTS, ADVANCE_TABLE, BALL_IN_PLAY_TABLE, EXTRA_BASE, base_out_state)
+from vectorized_engine import VectorizedGameEngine
+from sim_results import LABELS, SharedResults, add_derived_stats, add_rate_stats, player_key
+from slate import RATE_COLUMNS, load_slate
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Simulator, shared result buffers and per-game buffer rows used by pool
+# workers, set once per process by _init_worker
+_worker_simulator = None
+_worker_results = None
+_worker_rows = None
+
+
+def _init_worker(simulator, players, stats, num_sims, spec, rows):
+    global _worker_simulator, _worker_results, _worker_rows
+    _worker_simulator = simulator
+    _worker_results = SharedResults(players, stats, num_sims, spec=spec, weighted=bool(simulator.tilts))
+    _worker_rows = rows
+
+
+def _simulate_block(task):
+    game, start, branches = _worker_simulator.simulate_block(task)
+    stop = task[2]
+    for branch, results in branches.items():
+        for group, block in results.items():
+            rows = _worker_rows[game, branch][group]
+            block_rows = [rows[(player, team)] for player, team in zip(block['player'], block['team'])]
+            _worker_results.write(group, block_rows, block['stats'], start, stop, block.get('weights'))
+    return game, start, stop
+
+
+PITCHER_STATS = ["pBF", "pOuts", "pW", "pQS", "pIP", "pH", "p1B", "p2B", "p3B", "pHR", "pSB", "pCS", "pK", "pBB", "pHBP", "pR", "pPC", "In_Game", "In_Line_For_Win",
+                 "pFirstInnK", "pFirst3InnK", "pFirstInnPC", "pFirst3InnPC", "pFirstInnR", "pFirst3InnR", "pFirstInnH", "pFirst3InnH", "pFirstInnBF", "pFirst3InnBF", "pFirstRunAllowed", "pFirstK"]
+HITTER_STATS = ["bPA", "b1B", "b2B", "b3B", "bHR", "bSB", "bCS", "bK", "bBB", "bHBP", "bR", "bRBI",
+                "bFirstInnR", "bFirst3InnR", "bFirstInnH", "bFirst3InnH", "bFirstInnHRBI", "bFirst3InnHRBI",
+                "bFirstHit", "bFirstRBI", "bFirstRun", "bFirstHR"]
+# PA outcome counts of each hitter by [SP/RP][outcome code], the sufficient
+# statistics for reweighting a run's sims to other outcome probabilities;
+# only returned with the hitter stats when a run asks for outcome counts
+OUTCOME_STATS = [[f"b{split}{outcome}" for outcome in OUTCOMES] for split in ('SP', 'RP')]
+# Column of every hitter and pitcher stat in a row of the scalar engine's stat table
+STAT_COLUMNS = {stat: i for i, stat in enumerate(HITTER_STATS + OUTCOME_STATS[SP] + OUTCOME_STATS[RP]
+                                                 + PITCHER_STATS)}
+OUTCOME_COLUMNS = [[STAT_COLUMNS[stat] for stat in split_stats] for split_stats in OUTCOME_STATS]
+# Batter stat, pitcher stat and pitch-count kind logged for each hit and free pass
+PLAY_STATS = {
+    SINGLE: ('b1B', 'p1B', 'hit'),
+    DOUBLE: ('b2B', 'p2B', 'hit'),
+    TRIPLE: ('b3B', 'p3B', 'hit'),
+    HOME_RUN: ('bHR', 'pHR', 'hit'),
+    WALK: ('bBB', 'pBB', 'bb'),
+    HIT_BY_PITCH: ('bHBP', 'pHBP', 'hbp')
+}
+# Stats whose count in a live game state shows each first-event flag of
+# GameState has already been decided
+FIRST_EVENT_STATS = {
+    'first_hit': ('bFirstHit', 'b1B', 'b2B', 'b3B', 'bHR', 'p1B', 'p2B', 'p3B', 'pHR'),
+    'first_rbi': ('bFirstRBI', 'bRBI'),
+    'first_run': ('bFirstRun', 'bR'),
+    'first_hr': ('bFirstHR', 'bHR', 'pHR'),
+    'first_k': ('pFirstK', 'pK', 'bK'),
+    'first_run_allowed': ('pFirstRunAllowed', 'pR')
+}
+
+
+class GameState:
+    """Mutable state of one game on the scalar engine.
+
+    state is the base-out state from base_out (8 * outs + occupancy), kept in
+    step with bases, which holds the id of the runner on each base or None.
+    batter, pitcher and starter are the ids of the PA's batter, the pitcher
+    on the mound and the fielding team's starter, who is charged for
+    inherited runners. A game starts at first pitch, or at a live state
+    compiled by MLB_Game_Simulator.compile_live_state.
+    """
+    __slots__ = ('inning', 'half', 'state', 'bases', 'inherited', 'runs', 'runs_inning',
+                 'batter', 'pitcher', 'starter', 'split',
+                 'first_hit', 'first_rbi', 'first_run', 'first_hr', 'first_k', 'first_run_allowed')
+
+    def __init__(self, start=None):
+        self.inning = 1
+        self.half = 0
+        self.runs = [0, 0]
+        self.batter = self.pitcher = self.starter = None
+        self.split = SP
+        self.first_hit = self.first_rbi = self.first_run = False
+        self.first_hr = self.first_k = self.first_run_allowed = False
+        self.end_half_inning(advance=False)
+        if start is not None:
+            self.inning, self.half = start['inning'], start['half']
+            self.runs = list(start['runs'])
+            self.runs_inning = start['runs_inning']
+            self.bases = list(start['bases'])
+            self.state = base_out_state(self.bases, start['outs'])
+            for flag, decided in start['first'].items():
+                setattr(self, flag, decided)
+
+    def copy(self):
+        game = GameState.__new__(GameState)
+        for slot in self.__slots__:
+            setattr(game, slot, getattr(self, slot))
+        game.runs, game.bases, game.inherited = list(self.runs), list(self.bases), list(self.inherited)
+        return game
+
+    def end_half_inning(self, advance=True):
+        """Clear the bases, outs and inning runs, and move to the next half inning."""
+        self.state = 0
+        self.bases = [None] * 3
+        self.inherited = [None] * 3
+        self.runs_inning = 0
+        if advance:
+            self.inning += self.half
+            self.half = 1 - self.half
+
+
 class MLB_Game_Simulator:
-    def __init__(self, num_sims, hitter_file_path, pitcher_file_path):
+    PITCHER_STATS = PITCHER_STATS
+    HITTER_STATS = HITTER_STATS
+    OUTCOME_STATS = OUTCOME_STATS
+    # Integer stats computed from the counts above once a game ends
+    HITTER_DERIVED_STATS = ["bH", "bHRRBI", "bTB", "bUD"]
+    PITCHER_DERIVED_STATS = ["pUD"]
+    # Mean and standard deviation of pitches thrown per PA outcome
+    PITCHES_PER_OUTCOME = {
+        'hit': (3.35, 1.84),
+        'bb': (5.73, 1.36),
+        'k': (4.85, 1.4),
+        'out': (3.38, 1.83),
+        'hbp': (3.17, 1.8)
+    }
+    MIN_PITCHES_PER_OUTCOME = {'bb': 4, 'k': 3}
+    ENGINES = ('scalar', 'vectorized')
+    # Version of the game model; bump it whenever a change alters simulated
+    # results, so games cached by GameResultCache are simulated again
+    ENGINE_VERSION = 1
+    # Sims per work unit; each block of a game gets its own RNG stream
+    SIM_BLOCK_SIZES = {'scalar': 250, 'vectorized': 5000}
+    # Uniform cache and pitch pool sizes when every sim reseeds its own
+    # stream, sized to about one game's draws
+    CRN_RANDOM_CACHE_SIZE = 1024
+    CRN_PITCH_POOL_SIZE = 32
+
+    def __init__(self, num_sims, hitter_file_path=None, pitcher_file_path=None, engine='scalar', seed=None, slate=None,
+                 antithetic=False, common_random_numbers=False, tilts=(), outcome_counts=False):
+        """
+        Args:
+            num_sims: Sims per game
+            hitter_file_path: Hitter projections CSV, unless slate is given
+            pitcher_file_path: Pitcher projections CSV, unless slate is given
+            engine: 'scalar' or 'vectorized'
+            seed: Seed for the run, fresh entropy when None
+            slate: CompiledSlate to simulate instead of loading the files
+            antithetic: Play sims in antithetic pairs, the second game of a
+                pair replaying the first one's uniforms as 1 - u (scalar
+                engine only)
+            common_random_numbers: Give every sim its own seed stream, so
+                variants of a slate run with the same seed see the same
+                draws sim by sim, and restart the stream at the checkpoint
+                for every scenario branch
+            tilts: importance.Tilts of hitters whose PAs are drawn from
+                tilted outcome probabilities; results then carry each
+                sim's likelihood ratio as 'weights'
+            outcome_counts: Return each hitter's PA outcome counts, the
+                OUTCOME_STATS, with the hitter stats, for reweighting
+        """
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
+        if antithetic and engine != 'scalar':
+            raise ValueError("Antithetic sims need the scalar engine")
+        if antithetic and tilts:
+            raise ValueError("Antithetic sims cannot be combined with tilted PA outcomes")
         self.num_sims = int(num_sims)
+        self.engine = engine
+        self.sim_block_size = self.SIM_BLOCK_SIZES[engine]
+        # Without a seed, fresh entropy is drawn and kept so the run can be replayed
+        self.seed_sequence = np.random.SeedSequence(seed)
+        self.seed = self.seed_sequence.entropy
         self.hitter_file_path = hitter_file_path
         self.pitcher_file_path = pitcher_file_path
-        self.dh = "2"
-        self.id_counter = 1
-        self.hitters_dict = {}
-        self.pitchers_dict = {}
-        self.teams_dict = collections.defaultdict(list)
-        self.pitcher_totals = collections.defaultdict(dict)
-        self.hitter_totals_vs_sp = collections.defaultdict(dict)
-        self.games = []
         # Pre-allocate numpy arrays for better memory efficiency
         self.random_cache_size = 10000
-        self.random_cache = np.random.random(self.random_cache_size)
+        self.pitch_pool_size = 4096
+        self.antithetic = antithetic
+        self.common_random_numbers = common_random_numbers
+        self.outcome_counts = outcome_counts
+        # Hitter stats returned by the run
+        self.hitter_stats = self.HITTER_STATS + (OUTCOME_STATS[SP] + OUTCOME_STATS[RP] if outcome_counts else [])
+        if common_random_numbers and engine == 'scalar':
+            self.random_cache_size = self.CRN_RANDOM_CACHE_SIZE
+            self.pitch_pool_size = self.CRN_PITCH_POOL_SIZE
+        # Uniforms recorded by the first game of an antithetic pair, by
+        # stream, and how far the second game has replayed each
+        self.antithetic_tapes = {}
+        self.antithetic_positions = {}
+        self.antithetic_replay = False
+        self.pitch_distributions = []
+        self.pitch_sources = {}
+        self.set_rng(np.random.default_rng(self.seed_sequence))
+
+        if slate is None:
+            try:
+                slate = load_slate(hitter_file_path, pitcher_file_path)
+            except Exception as e:
+                logger.error(f"Error loading projections: {str(e)}")
+                raise
+        self.slate = slate
+        self.games = list(slate.games)
+        self.assign_ids()
+        self.compile_outcome_samplers()
+        self.compile_tilts(tilts)
+        self.compile_pitch_distributions()
+        self.stat_table = None
+        # Compiled live states of the games simulate_games starts mid-game
+        self.live_states = {}
+        # Scenarios branched from the checkpoint inning by simulate_scenarios
+        self.scenarios = ()
+        self.checkpoint = None
+
+    def __getstate__(self):
+        # The stat table holds memoryviews, so each process builds its own
+        state = self.__dict__.copy()
+        state.update(stat_buffer=None, stat_table=None, stat_array=None, zero_row=None)
+        return state
+
+    def assign_ids(self):
+        """Look up the slate's dense team and player ids.
+
+        Every player dict carries an 'Index' into self.players, which the
+        scalar engine uses in place of (name, position, team) keys. Teams are
+        numbered in load order, and each team's pinch hitter and bullpen come
+        right after its roster.
+        """
+        slate = self.slate
+        self.team_ids = {team: i for i, team in enumerate(slate.teams)}
+        self.players = slate.players
+        self.team_players = [roster + (ph, bullpen)
+                             for roster, ph, bullpen in zip(slate.rosters, slate.pinch_hitters, slate.bullpens)]
+        self.pinch_hitters = [self.players[index] for index in slate.pinch_hitters]
+        self.bullpens = [self.players[index] for index in slate.bullpens]
+        self.game_layouts = {}
+
+    def build_stat_table(self):
+        """Preallocate the int16 stat rows the scalar engine counts into.
+
+        stat_table[player['Index']] is a row of STAT_COLUMNS counters. All rows
+        share one flat buffer, which stat_array exposes as a players x stats
+        ndarray without copying.
+        """
+        width = len(STAT_COLUMNS)
+        self.stat_buffer = array.array('h', [0]) * (width * len(self.players))
+        view = memoryview(self.stat_buffer)
+        self.stat_table = [view[i * width:(i + 1) * width] for i in range(len(self.players))]
+        self.stat_array = np.frombuffer(self.stat_buffer, dtype=np.int16).reshape(len(self.players), width)
+        self.zero_row = memoryview(array.array('h', [0]) * width)
+
+    def game_layout(self, away_team, home_team):
+        """Player ids a game resets and reports, cached per matchup.
+
+        Returns:
+            Dict with the ids of the game's hitters, pitchers, the [away, home]
+            starters and every row to reset between sims, plus both lineups
+        """
+        game = (away_team, home_team)
+        if game not in self.game_layouts:
+            layout = {'hitters': [], 'pitchers': [], 'starters': [], 'players': [],
+                      'lineups': [self.create_lineup(team) for team in game]}
+            for team in game:
+                team_id = self.team_ids[team]
+                layout['players'].extend(self.team_players[team_id])
+                starter = None
+                for player in self.roster(team):
+                    if 'Opener' in player['Position']:
+                        continue
+                    elif 'P' in player['Position']:
+                        layout['pitchers'].append(player['Index'])
+                        starter = player['Index']
+                    else:
+                        layout['hitters'].append(player['Index'])
+                layout['starters'].append(starter)
+            self.game_layouts[game] = layout
+        return self.game_layouts[game]
+
+    def compile_outcome_samplers(self):
+        """Build cumulative outcome tables for every hitter's SP and RP splits.
+
+        self.pa_cdf maps each hitter's Index to a (2, len(OUTCOMES)) array
+        indexed by [SP/RP, outcome code], so a PA outcome is a single uniform
+        draw and a searchsorted into the batter's row.
+
+        The baserunning rates the scalar engine uses are compiled alongside,
+        each keyed by Index and indexed by SP/RP: k_per_out (chance an out is
+        a strikeout), and steal_rates and advance_rates (attempt, success)
+        pairs for stolen bases and extra bases taken on hits.
+        """
+        self.pa_cdf = {}
+        self.k_per_out = {}
+        self.steal_rates = {}
+        self.advance_rates = {}
+        for index in self.slate.hitters:
+            hitter = self.players[index]
+            cdf = np.empty((2, len(OUTCOMES)))
+            k_per_out, steal_rates, advance_rates = [], [], []
+            for split, indicator in ((SP, 'SP'), (RP, 'RP')):
+                rates = dict(zip(RATE_COLUMNS, self.slate.rates[index, split].tolist()))
+                probs = np.array([rates[outcome] for outcome in OUTCOMES])
+                if (probs < 0).any() or probs.sum() <= 0:
+                    raise ValueError(f"Invalid {indicator} outcome rates for {hitter['Name']} ({hitter['Team']})")
+                cdf[split] = np.cumsum(probs / probs.sum())
+
+                k_per_out.append(rates['K'] / rates['OUT'] if rates['OUT'] > 0 else 0)
+                attempt_denominator = rates['1B'] + rates['BB'] + rates['HBP']
+                success_denominator = rates['SB'] + rates['CS']
+                attempt_ratio = success_denominator / attempt_denominator if attempt_denominator > 0 else 0
+                success_ratio = rates['SB'] / success_denominator if success_denominator > 0 else 0
+                steal_rates.append((attempt_ratio * 0.7, success_ratio))
+                advance_rates.append((attempt_ratio * 1.2, success_ratio * 1.3))
+            # Guard against rounding so a draw just below 1 still lands on OUT
+            cdf[:, -1] = 1.0
+            self.pa_cdf[hitter['Index']] = cdf
+            self.k_per_out[hitter['Index']] = tuple(k_per_out)
+            self.steal_rates[hitter['Index']] = tuple(steal_rates)
+            self.advance_rates[hitter['Index']] = tuple(advance_rates)
+
+    def compile_tilts(self, tilts):
+        """Build the tilted outcome tables of every hitter a Tilt names.
+
+        self.tilted_cdf and self.tilt_log_ratio map each tilted hitter's
+        Index to the hitter's tilted (2, len(OUTCOMES)) cumulative table and the log
+        likelihood ratio of each outcome, as from Tilt.tables. A name shared
+        by hitters on different teams tilts all of them.
+        """
+        self.tilts = tuple(tilts)
+        self.tilted_cdf = {}
+        self.tilt_log_ratio = {}
+        for tilt in self.tilts:
+            indexes = [index for index in self.slate.hitters
+                       if player_key(self.players[index]['Name']) == player_key(tilt.player)]
+            if not indexes:
+                raise ValueError(f"No hitter {tilt.player} on the slate to tilt")
+            for index in indexes:
+                self.tilted_cdf[index], self.tilt_log_ratio[index] = tilt.tables(self.pa_cdf[index])
+        # Log likelihood ratio of the sim in progress on the scalar engine
+        self.log_weight = 0.0
+
+    def compile_pitch_distributions(self):
+        """Map every pitcher to the pitch-count distribution of each PA outcome kind.
+
+        self.pitch_distributions lists the distinct (mean, std, minimum)
+        triples, and self.pitch_sources maps a pitcher's Index (None for the
+        league default) to {kind: distribution index}. Pitchers without
+        overrides share the default distributions and so draw from the same
+        pools.
+        """
+        distributions = {}
+
+        def distribution_index(kind, mean, std):
+            key = (mean, std, self.MIN_PITCHES_PER_OUTCOME.get(kind, 1))
+            if key not in distributions:
+                distributions[key] = len(distributions)
+            return distributions[key]
+
+        def pitcher_distribution(overrides, kind):
+            mean, std = self.PITCHES_PER_OUTCOME[kind]
+            if kind in overrides:
+                # Overrides without a standard deviation keep the default one
+                mean, override_std = overrides[kind]
+                std = std if override_std is None else override_std
+            return distribution_index(kind, mean, std)
+
+        self.pitch_sources = {None: {kind: pitcher_distribution({}, kind) for kind in self.PITCHES_PER_OUTCOME}}
+        for index in self.slate.pitchers:
+            overrides = self.players[index].get('Pitches', {})
+            self.pitch_sources[index] = {kind: pitcher_distribution(overrides, kind) for kind in self.PITCHES_PER_OUTCOME}
+        self.pitch_distributions = list(distributions)
+        self.pitch_pools = {}
+
+    def pitch_distribution(self, pitcher, outcome):
+        """(mean, std, minimum) pitch count for pitcher's PAs ending in outcome."""
+        return self.pitch_distributions[self.pitch_sources[pitcher][outcome]]
+
+    def set_rng(self, rng):
+        """Draw all further randomness from rng and refill the cache from it"""
+        self.rng = rng
+        self.random_cache = self.rng.random(self.random_cache_size).tolist()
         self.random_cache_index = 0
-        
-        self.replacement_hitter = {
-            "PA": 10,
-            "1B": 1.27,
-            "2B": 0.36,
-            "3B": 0.02,
-            "HR": 0.21,
-            "SB": 0.37,
-            "CS": 0.087,
-            "K": 2.99,
-            "BB": 1.16,
-            "HBP": 0.14,
-            "OUT": 6.84
-        }
+        # Pitch pools refill lazily from the new rng
+        self.pitch_pools = {}
 
-        self.load_projections()
-        
     def get_random(self):
         """Get a random number from pre-allocated cache"""
         if self.random_cache_index >= self.random_cache_size:
-            self.random_cache = np.random.random(self.random_cache_size)
+            self.random_cache = self.rng.random(self.random_cache_size).tolist()
             self.random_cache_index = 0
         val = self.random_cache[self.random_cache_index]
         self.random_cache_index += 1
         return val
 
-        self.load_projections()
-
-    def lower_first(self, iterator):
-        iterator = iter(iterator)
-        # Skip comment lines
-        for line in iterator:
-            if not line.strip().startswith("#"):
-                # Lowercase the header row and yield it
-                yield line.lower()
-                break
-        # Yield the rest of the file unchanged
-        for line in iterator:
-            yield line
-
-    def load_pitcher_totals(self, path):
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-            for row in reader:
-                if "2h" in row and row["2h"] == self.dh:
-                    continue
-                opener = False
-                if "mpc" in row and row["mpc"] == "IP CAP":
-                    opener = True
-                opponent = row.get("opp_tm") or row.get("opp")
-                pitcher_totals = {
-                    "H": float(row['h']),
-                    "HR": float(row["hr"]),
-                    "SB": float(row.get("sb", 0.5)),
-                    "CS": float(row.get("cs", 0.15)),
-                    "K": float(row["k"]),
-                    "BB": float(row["bb"]),
-                    "HBP": float(row["hbp"]) if row["hbp"] else 0.0,
-                    "OUT": float(row['outs']) if row['outs'] else float(row['ip']) * 3,
-                }
-                if opponent in self.pitcher_totals:
-                    if opener:
-                        opener_value = row["opener"]
-                        if "Yes" in opener_value:
-                            pass
-                        else:
-                            self.pitcher_totals[opponent] = pitcher_totals
-                    else:
-                        self.pitcher_totals[opponent] = pitcher_totals
-                else:
-                    self.pitcher_totals[opponent] = pitcher_totals
-
-    def load_hitter_totals(self, path):
-        team_order = {}  # Dictionary to track order of teams
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-            for row in reader:
-                if "2h" in row and row["2h"] == self.dh:
-                    continue
-                if not row["hbp"] or not row["hbp"].strip():
-                    row["hbp"] = "0"
-                if not row["cs"] or not row["cs"].strip():
-                    row["cs"] = "0.05"
-                team = row.get('team') or row.get('tm')
-                if not row["lp"] or not row["lp"].strip():
-                    # Increment team order counter
-                    team_order[team] = team_order.get(team, 0) + 1
-                    row["lp"] = str(team_order[team])
-                if ("ipl" in row and row["ipl"] == "false") or float(row["lp"]) > 9:
-                    player_data = {
-                        "PA": float(row["pa"]),
-                        "1B": float(row["1b"]),
-                        "2B": float(row["2b"]),
-                        "3B": float(row["3b"]),
-                        "HR": float(row["hr"]),
-                        "SB": float(row["sb"]),
-                        "CS": float(row["cs"]),
-                        "K": float(row["k"]),
-                        "BB": float(row["bb"]),
-                        "HBP": float(row["hbp"]),
-                        "OUT": 1 - float(row["_obp"])
-                    }
-                    for key, val in player_data.items():
-                        if key in self.replacement_hitter:
-                            self.replacement_hitter[key] += val
-                        else:
-                            self.replacement_hitter[key] = val
-                else:
-                    if "pavssp" in row:
-                        pavssp = float(row["pavssp%"].replace("%", '')) / 100
-                    else:
-                        pavssp = .053 + -.007 * float(row["lp"]) + .038 * float(self.pitcher_totals[team]["OUT"])
-                    if "_obp" in row:
-                        outs = (1 - float(row["_obp"])) * float(row["pa"])
-                    else:
-                        outs = float(row["pa"]) - float(row["bb"]) - float(row["hbp"]) - float(row["1b"]) - float(row["2b"]) - float(row["3b"]) - float(row["hr"])
-                    h = (float(row["1b"]) + float(row["2b"]) + float(row["3b"]) + float(row["hr"])) * pavssp
-                    hr = float(row["hr"]) * pavssp
-                    sb = float(row["sb"]) * pavssp
-                    cs = float(row["cs"]) * pavssp
-                    k = float(row["k"]) * pavssp
-                    bb = float(row["bb"]) * pavssp
-                    hbp = float(row["hbp"]) * pavssp
-                    out = outs * pavssp
-                    player_data = {
-                        "HR": hr,
-                        "H": h,
-                        "SB": sb,
-                        "CS": cs,
-                        "K": k,
-                        "BB": bb,
-                        "HBP": hbp,
-                        "OUT": out
-                    }
-
-                    if team in self.hitter_totals_vs_sp:
-                        for key, val in player_data.items():
-                            if key in self.hitter_totals_vs_sp[team]:
-                                self.hitter_totals_vs_sp[team][key] += val
-                            else:
-                                self.hitter_totals_vs_sp[team][key] = val
-                    else:
-                        self.hitter_totals_vs_sp[team] = player_data
-
-    def load_projections(self):
-        try:
-            self.load_pitcher_totals(self.pitcher_file_path)
-            self.load_hitter_totals(self.hitter_file_path)
-            self.load_hitters_projections(self.hitter_file_path)
-            self.load_pitchers_projections(self.pitcher_file_path)
-            self.load_games(self.pitcher_file_path)
-            self.teams_dict = self.update_pitcher_positions(self.teams_dict)
-        except Exception as e:
-            logger.error(f"Error loading projections: {str(e)}")
-            raise
-
-    def update_pitcher_positions(self, teams_dict):
-        for team, players in teams_dict.items():
-            pitchers = [player for player in players if "P" in player["Position"]]
-            
-            if len(pitchers) == 2:
-                for pitcher in pitchers:
-                    if pitcher["Opener"]:
-                        pitcher["Position"] = ["Opener"]
-                        break  # Only change one pitcher's position
-
-        return teams_dict
-
-    def load_hitters_projections(self, path):
-        team_order = {}  # Dictionary to track order of teams
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-            for row in reader:
-                if not row["hbp"] or not row["hbp"].strip():
-                    row["hbp"] = "0"
-                if not row["cs"] or not row["cs"].strip():
-                    row["cs"] = "0"
-                if "2h" in row and row["2h"] == self.dh:
-                    continue
-                if "ipl" in row and row["ipl"] == "false":
-                    continue
-                team = row.get('team') or row.get('tm')
-                if not row["lp"] or not row["lp"].strip():
-                    # Increment team order counter
-                    team_order[team] = team_order.get(team, 0) + 1
-                    row["lp"] = str(team_order[team])
-                if "lp" in row and float(row["lp"]) > 9:
-                    continue
-                if team not in self.pitcher_totals:
-                    continue
-                player_name = row["name"].replace("-", "#").lower()
-                if "playerid" in row:
-                    player_id = row["playerid"]
-                else:
-                    player_id = self.id_counter
-                    self.id_counter += 1
-                if "pos" in row:
-                    position = sorted([pos for pos in row["pos"].split("/")])
-                else:
-                    position = ['batter']
-                opp = row.get("opp_tm") or row.get("opp")
-                # hfa = row.get("hfa")
-                batting_order = int(row["lp"])
-                
-                if "pavssp" in row:
-                    pavssp = float(row["pavssp%"].replace("%", '')) / 100
-                else:
-                    pavssp = .053 + -.007 * float(row["lp"]) + .038 * float(self.pitcher_totals[team]["OUT"])
-                if "_obp" in row:
-                    outs = (1 - float(row["_obp"])) * float(row["pa"])
-                else:
-                    outs = float(row["pa"]) - float(row["bb"]) - float(row["hbp"]) - float(row["1b"]) - float(row["2b"]) - float(row["3b"]) - float(row["hr"]) 
-
-                if "ph%" in row:
-                    pa_no_ph = (float(row["0%_ph%_fpts"]) / float(row["fpts"])) * float(row["pa"])
-                    pa_vs_pen_no_ph = pa_no_ph - float(row["pavssp"])
-                    ph = float(row["ph%"].replace("%", '')) / 100
-                    ph_risk = 1 - ((1 - ph) ** (1 / pa_vs_pen_no_ph)) if pa_vs_pen_no_ph > 0 else 0
-                else:
-                    ph_risk = max(0, 1.56 + -.03 * float(row["lp"]) + -.36 * float(row["pa"]) + .006 * self.pitcher_totals[team]["OUT"])
-
-                non_hr_hits = float(row["1b"]) + float(row["2b"]) + float(row["3b"])
-                non_hr_hits_singles = float(row["1b"]) / non_hr_hits
-                non_hr_hits_doubles = float(row["2b"]) / non_hr_hits
-                non_hr_hits_triples = float(row["3b"]) / non_hr_hits
+    def antithetic_draw(self, stream):
+        """Next uniform of one of an antithetic pair's streams.
+
+        The first game of a pair records each stream's uniforms; the second
+        replays them as 1 - u. Draws past the end of the record come fresh
+        from the cache.
+        """
+        tape = self.antithetic_tapes.setdefault(stream, [])
+        if self.antithetic_replay:
+            position = self.antithetic_positions.get(stream, 0)
+            if position < len(tape):
+                self.antithetic_positions[stream] = position + 1
+                val = tape[position]
+                # 1 - 0 would fall past the end of a cumulative table
+                return 1.0 - val if val else val
+            return MLB_Game_Simulator.get_random(self)
+        val = MLB_Game_Simulator.get_random(self)
+        tape.append(val)
+        return val
 
-                hits_vs_sp = (non_hr_hits + float(row["hr"])) * pavssp
-                adj_hits_vs_sp = hits_vs_sp * (self.pitcher_totals[team]["H"] / self.hitter_totals_vs_sp[team]["H"])
-                hr_vs_sp = float(row["hr"]) * pavssp * (self.pitcher_totals[team]["HR"] / self.hitter_totals_vs_sp[team]["HR"])
-                adj_non_hr_hits_vs_sp = adj_hits_vs_sp - hr_vs_sp
-                
-                single_vs_sp = adj_non_hr_hits_vs_sp * non_hr_hits_singles
-                double_vs_sp = adj_non_hr_hits_vs_sp * non_hr_hits_doubles
-                triple_vs_sp = adj_non_hr_hits_vs_sp * non_hr_hits_triples
-                
-                sb_vs_sp = float(row["sb"]) * pavssp * (self.pitcher_totals[team]["SB"] / self.hitter_totals_vs_sp[team]["SB"])
-                cs_vs_sp = float(row["cs"]) * pavssp * (self.pitcher_totals[team]["CS"] / (self.hitter_totals_vs_sp[team]["CS"] + 0.0001))
-                k_vs_sp = float(row["k"]) * pavssp * (self.pitcher_totals[team]["K"] / self.hitter_totals_vs_sp[team]["K"])
-                bb_vs_sp = float(row["bb"]) * pavssp * (self.pitcher_totals[team]["BB"] / self.hitter_totals_vs_sp[team]["BB"])
-                hbp_vs_sp = float(row["hbp"]) * pavssp * (self.pitcher_totals[team]["HBP"] / (self.hitter_totals_vs_sp[team]["HBP"] + 0.0001))
-                out_vs_sp = outs * pavssp * (self.pitcher_totals[team]["OUT"] / self.hitter_totals_vs_sp[team]["OUT"])
-
-                player_data = {
-                    "Position": position[0],
-                    "Name": player_name,
-                    "Team": team,
-                    "Opp": opp,
-                    #"HFA": hfa,
-                    "ID": player_id,
-                    "Opp Pitcher ID": "",
-                    "Opp Pitcher Name": "",
-                    "In Lineup": True,
-                    "Order": batting_order,
-                    "PH": float(ph_risk),
-                    "SP": {
-                        "PA": pavssp,
-                        "1B": single_vs_sp,
-                        "2B": double_vs_sp,
-                        "3B": triple_vs_sp,
-                        "HR": hr_vs_sp,
-                        "SB": sb_vs_sp,
-                        "CS": cs_vs_sp,
-                        "K": k_vs_sp,
-                        "BB": bb_vs_sp,
-                        "HBP": hbp_vs_sp,
-                        "OUT": out_vs_sp
-                    },
-                    "RP": {
-                        "PA": float(row["pa"]) - pavssp,
-                        "1B": float(row["1b"]) - single_vs_sp,
-                        "2B": float(row["2b"]) - double_vs_sp,
-                        "3B": float(row["3b"]) - triple_vs_sp,
-                        "HR": float(row["hr"]) - hr_vs_sp,
-                        "SB": float(row["sb"]) - sb_vs_sp,
-                        "CS": float(row["cs"]) - cs_vs_sp,
-                        "K": float(row["k"]) - k_vs_sp,
-                        "BB": float(row["bb"]) - bb_vs_sp,
-                        "HBP": float(row["hbp"]) - hbp_vs_sp,
-                        "OUT": outs - out_vs_sp
-                    }
-                }
-
-
-                self.hitters_dict[(player_name, position[0], team)] = player_data
-                if self.teams_dict[team]:
-                    self.teams_dict[team].append(player_data)
-                else:
-                    self.teams_dict[team].append(player_data)
-                    self.hitters_dict[('ph', 'ph', team)] = {
-                        "Position": 'ph',
-                        "Name": 'ph',
-                        "Team": team,
-                        "Opp": opp,
-                        #"HFA": hfa,
-                        "ID": -1,
-                        "Opp Pitcher ID": "",
-                        "Opp Pitcher Name": "",
-                        "In Lineup": False,
-                        "Order": -1,
-                        "PH": 0.0,
-                        "SP": self.replacement_hitter,
-                        "RP": self.replacement_hitter
-                    }
-                    self.pitchers_dict[('bullpen', 'bullpen', team)] = {
-                        "Position": 'bullpen',
-                        "Name": 'bullpen',
-                        "Team": team,
-                        "Opp": opp,
-                        #"HFA": hfa,
-                        "Opp Pitcher ID": "",
-                        "Opp Pitcher Name": "",
-                        "In Lineup": True,
-                        "ID": -1
-                    }
-
-    def load_pitchers_projections(self, path):
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-            for row in reader:
-                if not row["hbp"] or not row["hbp"].strip():
-                    row["hbp"] = "0"
-                if not row["outs"] or not row["outs"].strip():
-                    row["outs"] = float(row["ip"]) * 3
-                if "2h" in row and row["2h"] == self.dh:
-                    continue
-                opener = False
-                if "mpc" in row and row["mpc"] == "IP CAP":
-                    opener = True
-                player_name = row["player"].replace("-", "#").lower()
-                if "playerid" in row:
-                    player_id = row["playerid"]
-                else:
-                    player_id = self.id_counter
-                    self.id_counter += 1
-                position = ['P']
-                team = row.get("tm") or row.get("team")
-                opp = row.get("opp_tm") or row.get("opp")
-                #hfa = row.get("hfa")
-                ppc = 0
-                mpc = 0
-                if "ppc" in row and row["ppc"] == "--":
-                    opener_value = row["opener"]
-                    if "Yes" in opener_value:
-                        # Extract the number in parentheses
-                        ip_value = float(opener_value.split("(")[1].split()[0])
-                        ppc = ip_value * 15
-                        mpc = ppc + 15
-                    else:
-                        ppc = 5 * float(row["outs"])
-                        mpc = 6 * float(row["outs"])
-                elif "pitch count (optional)" in row:
-                    ppc = float(row["pitch count (optional)"]) if row["pitch count (optional)"].strip() else 3.35 * float(row["h"]) + 5.46 * float(row["bb"]) + 4.85 * float(row["k"]) + 3.35 * (float(row["outs"]) - float(row["k"]))
-                    mpc = ppc * 1.12 if ppc > 0 else 0
-                else:
-                    ppc = float(row["ppc"])
-                    mpc = float(row["mpc"])
-
-                player_data = {
-                    "Position": position[0],
-                    "Name": player_name,
-                    "Team": team,
-                    "Opp": opp,
-                    #"HFA": hfa,
-                    "Opp Pitcher ID": "",
-                    "Opp Pitcher Name": "",
-                    "In Lineup": True,
-                    "Opener": opener,
-                    "ID": player_id,
-                    "HR": float(row["hr"]),
-                    "K": float(row["k"]),
-                    "BB": float(row["bb"]),
-                    "HBP": float(row["hbp"]),
-                    "PPC": ppc,
-                    "MPC": mpc
-                }
-
-                self.pitchers_dict[(player_name, position[0], team)] = player_data
-                self.teams_dict[team].append(player_data)
-
-    def load_games(self, path):
-        home_teams = set()
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-            for row in reader:
-                if row['hfa'] == 'TRUE' or row['hfa'] == 'true' or row['hfa'].startswith('H') or row['hfa'].startswith('h'):
-                    home_teams.add(row.get('team') or row.get('tm'))
-
-        with open(path, encoding="utf-8-sig") as file:
-            reader = csv.DictReader(self.lower_first(file))
-            for row in reader:
-                if row['hfa'] == 'FALSE' or row['hfa'] == 'false' or row['hfa'].startswith('A') or row['hfa'].startswith('a'):
-                    away_team = row.get('tm') or row.get('team')
-                    home_team = row.get('opp_tm') or row.get('opp')
-
-                    if not any(game for game in self.games if game[0] == away_team and game[1] == home_team):
-                        self.games.append((away_team, home_team))
+    def antithetic_random(self):
+        """get_random for antithetic pairs: removals, steals and advances share one stream."""
+        return self.antithetic_draw(None)
+
+    def antithetic_pa_outcome(self, batter, split):
+        """sim_pa_outcome for antithetic pairs.
+
+        Each batter's PAs are their own stream, so a batter's k-th PA of the
+        second game mirrors the same batter's k-th PA of the first, even once
+        the games have drifted apart. OUTCOMES run from hits to outs, so 1 - u turns
+        a likely hit into a likely out.
+        """
+        return self.pa_cdf[batter['Index']][split].searchsorted(self.antithetic_draw(batter['Index']), side='right')
+
+    def tilted_pa_outcome(self, batter, split):
+        """sim_pa_outcome for runs with tilts, adding each tilted draw's log likelihood ratio to log_weight."""
+        index = batter['Index']
+        tilted = self.tilted_cdf.get(index)
+        if tilted is None:
+            return self.pa_cdf[index][split].searchsorted(self.get_random(), side='right')
+        outcome = tilted[split].searchsorted(self.get_random(), side='right')
+        self.log_weight += self.tilt_log_ratio[index][split, outcome]
+        return outcome
+
+    def start_antithetic_game(self, sim):
+        """Record uniforms for even sims and replay them mirrored for odd ones."""
+        self.antithetic_replay = sim % 2 == 1
+        if not self.antithetic_replay:
+            self.antithetic_tapes = {}
+        self.antithetic_positions = {}
+
+    def save_random_state(self):
+        """Snapshot everything the scalar engine draws from, for restore_random_state."""
+        pools = {distribution: list(pool) for distribution, pool in self.pitch_pools.items()}
+        tapes = {stream: len(tape) for stream, tape in self.antithetic_tapes.items()}
+        return (self.random_cache, self.random_cache_index, self.rng.bit_generator.state, pools,
+                tapes, dict(self.antithetic_positions))
+
+    def restore_random_state(self, saved):
+        """Rewind the scalar engine's draws to a save_random_state snapshot."""
+        self.random_cache, self.random_cache_index, state, pools, tapes, positions = saved
+        self.rng.bit_generator.state = state
+        self.pitch_pools = {distribution: list(pool) for distribution, pool in pools.items()}
+        self.antithetic_tapes = {stream: tape[:tapes[stream]] for stream, tape in self.antithetic_tapes.items()
+                                 if stream in tapes}
+        self.antithetic_positions = dict(positions)
 
     def run_simulation(self):
-        h_results_list, p_results_list = self.simulate_games(self.games)
+        results = self.simulate_games(self.games)
+
+        return results['hitters'], results['pitchers']
 
-        return h_results_list, p_results_list
+    def result_ids(self, game):
+        """Ids of the players a game reports results for: its hitters and starters."""
+        return {
+            'hitters': self.game_layout(*game)['hitters'],
+            'pitchers': [self.get_pitcher(team)['Index'] for team in game]
+        }
 
-    def simulate_game_wrapper(self, game_and_sim):
-        game, sim_number = game_and_sim
+    def result_players(self, game):
+        """Labels of the players a game reports results for, in result_ids order."""
+        away_team, home_team = game
+        players = {}
+        for group, ids in self.result_ids(game).items():
+            players[group] = []
+            for index in ids:
+                player = self.players[index]
+                opp = home_team if player['Team'] == away_team else away_team
+                players[group].append({'player': player['Name'], 'team': player['Team'], 'opp': opp, 'pos': player['Position']})
+        return players
+
+    def block_seeds(self, game, num_blocks, first_block=0):
+        """Spawn one SeedSequence per sim block of a game.
+
+        The game's stream is keyed by its matchup rather than its position on
+        the slate, so the same seed reproduces a game's sims regardless of
+        which other games are simulated alongside it. Block i of the game is
+        always child i of the game's sequence, so a run simulated in several
+        calls starting at first_block draws the same sims as one long run.
+        """
         away_team, home_team = game
-        result = self.simulate_game(away_team, home_team, sim_number)
-        return result
+        game_key = zlib.crc32(f"{away_team}@{home_team}".encode('utf-8'))
+        return [np.random.SeedSequence(self.seed, spawn_key=(game_key, block))
+                for block in range(first_block, first_block + num_blocks)]
+
+    def simulate_block(self, task):
+        """Run sims [start, stop) of one game.
+
+        Returns:
+            Tuple of (game, start, branches) where branches maps each
+            scenario name, or None without scenarios, to the block's stats
+            as players x sims arrays, as from VectorizedGameEngine.run
+        """
+        game, start, stop, seed_sequence = task
+        away_team, home_team = game
+        rng = np.random.default_rng(seed_sequence)
+        live_state = self.live_states.get(game)
+
+        if self.engine == 'vectorized':
+            engine = VectorizedGameEngine(self, away_team, home_team, rng=rng)
+            if self.scenarios:
+                return game, start, engine.run_scenarios(stop - start, self.checkpoint, self.scenarios, live_state)
+            return game, start, {None: engine.run(stop - start, live_state)}
+
+        self.set_rng(rng)
+        # Child i of the block's sequence is the stream of sim start + i
+        seeds = seed_sequence.spawn(stop - start) if self.common_random_numbers else None
+        if self.antithetic:
+            self.get_random = self.antithetic_random
+            self.sim_pa_outcome = self.antithetic_pa_outcome
+        elif self.tilted_cdf:
+            self.sim_pa_outcome = self.tilted_pa_outcome
+        try:
+            if self.scenarios:
+                return game, start, self.simulate_scenario_block(away_team, home_team, stop - start, self.checkpoint,
+                                                                 self.scenarios, live_state, seeds)
+            return game, start, {None: self.simulate_game_block(away_team, home_team, stop - start, live_state, seeds)}
+        finally:
+            self.__dict__.pop('get_random', None)
+            self.__dict__.pop('sim_pa_outcome', None)
+
+    def simulate_game_block(self, away_team, home_team, num_sims, start=None, seeds=None):
+        """Play num_sims games on the scalar engine, copying each game's stat
+        rows straight out of the stat table into players x sims arrays.
+        Each game is played from the compiled live state start if given,
+        and from its own stream of seeds if given."""
+        game = (away_team, home_team)
+        ids = self.result_ids(game)
+        blocks = {group: np.empty((len(ids[group]), len(STAT_COLUMNS), num_sims), dtype=np.int16) for group in ids}
+        log_weights = np.zeros(num_sims)
+
+        for sim in range(num_sims):
+            self.start_sim(sim, seeds)
+            self.play_game(away_team, home_team, start)
+            for group, block in blocks.items():
+                block[:, :, sim] = self.stat_array[ids[group]]
+            log_weights[sim] = self.log_weight
+
+        return self.block_results(game, blocks, log_weights)
+
+    def simulate_scenario_block(self, away_team, home_team, num_sims, checkpoint, scenarios, start=None, seeds=None):
+        """Play num_sims games to a checkpoint once and branch every scenario from each.
+
+        Each sim is played on the scalar engine until inning checkpoint is
+        complete, snapshotted, and then finished once per scenario from the
+        snapshot, so the innings before the checkpoint are only simulated
+        once. Games over before the checkpoint end the same in every branch.
+        With common random numbers every branch also draws from the same
+        point of the sim's stream.
+
+        Returns:
+            Dict of scenario name -> results as from simulate_game_block
+        """
+        game = (away_team, home_team)
+        ids = self.result_ids(game)
+        layout = self.game_layout(away_team, home_team)
+        blocks = {scenario.name: {group: np.empty((len(ids[group]), len(STAT_COLUMNS), num_sims), dtype=np.int16)
+                                  for group in ids}
+                  for scenario in scenarios}
+        log_weights = {scenario.name: np.zeros(num_sims) for scenario in scenarios}
+
+        for sim in range(num_sims):
+            self.start_sim(sim, seeds)
+            state, team_data, starter_info = self.start_game(away_team, home_team, start)
+            over = self.play_innings(state, team_data, starter_info, until=checkpoint)
+            saved = self.save_checkpoint(layout, state, team_data)
+            draws = self.save_random_state() if self.common_random_numbers else None
+            checkpoint_weight = self.log_weight
+            for scenario in scenarios:
+                state, team_data = self.restore_checkpoint(layout, saved)
+                if draws is not None:
+                    self.restore_random_state(draws)
+                self.log_weight = checkpoint_weight
+                if not over:
+                    self.play_innings(state, team_data, starter_info, scenario)
+                self.finish_game(starter_info)
+                for group, block in blocks[scenario.name].items():
+                    block[:, :, sim] = self.stat_array[ids[group]]
+                log_weights[scenario.name][sim] = self.log_weight
+
+        return {name: self.block_results(game, branch_blocks, log_weights[name])
+                for name, branch_blocks in blocks.items()}
+
+    def start_sim(self, sim, seeds=None):
+        """Switch to sim's own stream and antithetic role before it is played."""
+        self.log_weight = 0.0
+        if seeds is not None:
+            self.set_rng(np.random.default_rng(seeds[sim]))
+        if self.antithetic:
+            self.start_antithetic_game(sim)
+
+    def block_results(self, game, blocks, log_weights=None):
+        """Columnar results of a game from players x STAT_COLUMNS x sims blocks.
+
+        With tilts, each group also gets the sims' likelihood ratios from
+        log_weights as a players x sims 'weights' array.
+        """
+        results = {}
+        for group, labels in self.result_players(game).items():
+            stats = self.hitter_stats if group == 'hitters' else PITCHER_STATS
+            results[group] = {label: [player[label] for player in labels] for label in LABELS}
+            results[group]['stats'] = {stat: blocks[group][:, STAT_COLUMNS[stat]] for stat in stats}
+            if self.tilts:
+                results[group]['weights'] = np.broadcast_to(np.exp(log_weights), (len(labels), len(log_weights)))
+        return add_derived_stats(results)
+
+    def game_key(self, game, num_sims, first_sim, stats):
+        """Hash of everything one game's sims depend on.
+
+        Each game draws from its own seed stream, so its sims are fixed by
+        its own two teams' player records and rates, the seed, the block
+        layout of the sims and the model version, whatever else is on the
+        slate. Indexes are left out as they shift when other teams change.
+        """
+        digest = hashlib.sha256(json.dumps({
+            'version': self.ENGINE_VERSION,
+            'engine': self.engine,
+            'block_size': self.sim_block_size,
+            'antithetic': self.antithetic,
+            'common_random_numbers': self.common_random_numbers,
+            'seed': self.seed,
+            'num_sims': num_sims,
+            'first_sim': first_sim,
+            'game': game,
+            'live_state': self.live_states.get(game),
+            'stats': stats,
+            'pitches': self.PITCHES_PER_OUTCOME,
+            'min_pitches': self.MIN_PITCHES_PER_OUTCOME
+        }, sort_keys=True).encode('utf-8'))
+        for team in game:
+            for index in self.team_players[self.team_ids[team]]:
+                record = {key: value for key, value in self.players[index].items() if key != 'Index'}
+                digest.update(json.dumps(record, sort_keys=True, default=str).encode('utf-8'))
+                digest.update(self.slate.rates[index].tobytes())
+        return digest.hexdigest()
+
+    def compile_live_state(self, game, state):
+        """Resolve a LiveGameState's player names to the game's player Indexes.
+
+        Names are matched by player_key within the game's two teams. Runners
+        who are not on the batting team's roster count as its pinch hitter,
+        and stats of players off the slate are dropped with a warning. The
+        first-event flags are set for every event the stats or score show
+        has already happened.
+
+        Returns:
+            JSON-serializable dict of the state's fields with runners as
+            Indexes, 'relieved' flags for the [away, home] starters, the
+            'first' flags and 'stats' as sorted [Index, stat, count] triples
+        """
+        layout = self.game_layout(*game)
+        team_indexes = []
+        for team in game:
+            indexes = {}
+            for index in self.team_players[self.team_ids[team]]:
+                indexes.setdefault(player_key(self.players[index]['Name']), index)
+            team_indexes.append(indexes)
+
+        batting = state.half
+        ph = self.pinch_hitters[self.team_ids[game[batting]]]['Index']
+        bases = [None if runner is None else team_indexes[batting].get(player_key(runner), ph)
+                 for runner in state.bases]
+
+        relieved = []
+        for side, team in enumerate(game):
+            pitcher = state.pitchers[side]
+            starters = {player_key(self.get_pitcher(team)['Name']),
+                        player_key(self.players[layout['starters'][side]]['Name'])}
+            relieved.append(pitcher is not None and player_key(pitcher) not in starters)
+
+        stats = []
+        totals = {}
+        unknown = []
+        for name, counts in state.stats.items():
+            key = player_key(name)
+            index = team_indexes[0].get(key, team_indexes[1].get(key))
+            if index is None:
+                unknown.append(name)
+                continue
+            for stat, count in counts.items():
+                if stat not in STAT_COLUMNS:
+                    raise ValueError(f"Unknown stat {stat} for {name} in {game[0]}@{game[1]}")
+                stats.append([index, stat, int(count)])
+                totals[stat] = totals.get(stat, 0) + int(count)
+        if unknown:
+            logger.warning(f"Ignoring live stats of players not on the slate: {', '.join(map(str, unknown))}")
+
+        scored = sum(state.runs) > 0
+        first = {flag: any(totals.get(stat, 0) > 0 for stat in columns) for flag, columns in FIRST_EVENT_STATS.items()}
+        first['first_run'] = first['first_run'] or scored
+        first['first_run_allowed'] = first['first_run_allowed'] or scored
+        return {
+            'inning': state.inning,
+            'half': state.half,
+            'outs': state.outs,
+            'bases': bases,
+            'runs': list(state.runs),
+            'runs_inning': state.runs_inning,
+            'order': list(state.order),
+            'relieved': relieved,
+            'first': first,
+            'stats': sorted(stats)
+        }
+
+    def simulate_games(self, games, num_sims=None, first_sim=0, deadline=None, cache=None, states=None):
+        """Simulate every game in blocks of sims across a process pool.
+
+        Workers write their blocks straight into shared-memory buffers, so
+        only (game, start, stop) tuples come back through the pool. The stat
+        arrays returned are views of those buffers, which stay mapped for as
+        long as any of the views is alive.
+
+        Args:
+            games: List of (away_team, home_team) tuples
+            num_sims: Sims to run per game, self.num_sims by default
+            first_sim: Index of the first sim in the run, a multiple of
+                sim_block_size, so later sims of a run can be added on
+            deadline: time.monotonic() at which to stop waiting for blocks;
+                the pool is terminated and only the sims every game has
+                completed are returned
+            cache: Optional GameResultCache; games whose inputs are unchanged
+                since they were cached are read back instead of simulated,
+                and the rest are stored once all their sims are done
+            states: Optional dict of game -> LiveGameState; those games are
+                only simulated from their state to the end, the others from
+                first pitch
+
+        Returns:
+            Dict with 'hitters' and 'pitchers' groups covering all games, each
+            holding player labels and a players x sims array per stat, with
+            num_sims sims unless the deadline cut the run short
+        """
+        self.scenarios, self.checkpoint = (), None
+        return self.simulate_branches(games, num_sims, first_sim, deadline, cache, states)[None]
+
+    def simulate_scenarios(self, games, scenarios, checkpoint, num_sims=None, first_sim=0, deadline=None, states=None):
+        """Simulate every game to a checkpoint once and branch each scenario from there.
+
+        Each sim plays its game until inning checkpoint is complete and then
+        finishes it once per scenario, so the shared innings are simulated
+        once instead of once per what-if. Runs like simulate_games otherwise,
+        without the result cache.
+
+        Args:
+            games: List of (away_team, home_team) tuples
+            scenarios: Scenarios to branch, with distinct names; include
+                scenario.BASELINE to compare against the unchanged model
+            checkpoint: Last inning played before branching
+            num_sims, first_sim, deadline, states: As for simulate_games
+
+        Returns:
+            Dict of scenario name -> results as from simulate_games, where
+            sim i of every branch continues the same checkpoint
+        """
+        names = [scenario.name for scenario in scenarios]
+        if not names or len(set(names)) != len(names):
+            raise ValueError(f"Expected scenarios with distinct names, got {names}")
+        self.scenarios, self.checkpoint = tuple(scenarios), checkpoint
+        try:
+            return self.simulate_branches(games, num_sims, first_sim, deadline, None, states)
+        finally:
+            self.scenarios, self.checkpoint = (), None
+
+    def simulate_branches(self, games, num_sims, first_sim, deadline, cache, states):
+        """Run the blocks of simulate_games, or of simulate_scenarios while
+        self.scenarios is set.
+
+        Returns:
+            Dict of scenario name, or None without scenarios, -> results
+        """
+        if num_sims is None:
+            num_sims = self.num_sims
+        if first_sim % self.sim_block_size:
+            raise ValueError(f"first_sim must be a multiple of the sim block size ({self.sim_block_size})")
+        states = states or {}
+        for game in states:
+            if game not in games:
+                raise ValueError(f"No game {game[0]}@{game[1]} to start from a live state")
+        self.live_states = {game: self.compile_live_state(game, state) for game, state in states.items()}
+
+        # pIP and pERA are floats, so they are derived from pOuts and pR afterwards
+        stats = {
+            'hitters': self.hitter_stats + self.HITTER_DERIVED_STATS,
+            'pitchers': [stat for stat in self.PITCHER_STATS if stat != 'pIP'] + self.PITCHER_DERIVED_STATS
+        }
 
-    def simulate_games(self, games):
-        h_results_list = []
-        p_results_list = []
+        # The cache holds no weights, so tilted runs are always simulated
+        if self.tilts:
+            cache = None
+        cached = {}
+        if cache is not None:
+            keys = {game: self.game_key(game, num_sims, first_sim, stats) for game in games}
+            for game in games:
+                arrays = cache.get(keys[game])
+                if arrays is not None:
+                    cached[game] = arrays
+            logger.info(f"{len(cached)} of {len(games)} games read from the result cache")
+
+        # Split each game's sims into blocks, each with an independent RNG stream.
+        # Blocks are queued block by block across games so that every game
+        # has about as many sims done when a deadline stops the pool.
+        num_blocks = -(-num_sims // self.sim_block_size)
+        first_block = first_sim // self.sim_block_size
+        simulated = [game for game in games if game not in cached]
+        game_seeds = [self.block_seeds(game, num_blocks, first_block) for game in simulated]
+        tasks = []
+        for block in range(num_blocks):
+            start = block * self.sim_block_size
+            stop = min(start + self.sim_block_size, num_sims)
+            for game, seeds in zip(simulated, game_seeds):
+                tasks.append((game, start, stop, seeds[block]))
 
         # Calculate optimal number of processes based on CPU cores and simulation size
         num_cpus = mp.cpu_count()
-        optimal_processes = max(1, min(num_cpus, len(games)))  # Use all available CPUs
-        
-        # Create smaller chunks for better memory management and more even distribution
-        chunk_size = max(1, min(
-            self.num_sims // (optimal_processes * 20),  # Smaller chunks for more even distribution
-            100  # Cap maximum chunk size
-        ))
-        simulation_params = [(game, i) for game in games for i in range(self.num_sims)]
-        
-        # Use a context manager for the pool to ensure proper cleanup
-        with mp.Pool(processes=optimal_processes) as pool:
-            # Use imap_unordered for better performance with large datasets
-            for result in pool.imap_unordered(self.simulate_game_wrapper, simulation_params, chunksize=chunk_size):
-                h_results_list.extend(result['hitter_results'])
-                p_results_list.extend(result['pitcher_results'])
-
-        return h_results_list, p_results_list
+        optimal_processes = max(1, min(num_cpus, len(tasks)))  # Use all available CPUs
+
+        # Lay out every game's players in the shared buffers, game by game
+        # and within a game branch by branch
+        branches = [scenario.name for scenario in self.scenarios] or [None]
+        players = {'hitters': [], 'pitchers': []}
+        rows = {}
+        for game in games:
+            for branch in branches:
+                rows[game, branch] = {}
+                for group, labels in self.result_players(game).items():
+                    rows[game, branch][group] = {(label['player'], label['team']): len(players[group]) + i
+                                                 for i, label in enumerate(labels)}
+                    players[group].extend(labels)
+
+        shared_results = SharedResults(players, stats, num_sims, weighted=bool(self.tilts))
+        try:
+            completed = {game: set() for game in simulated}
+            for game, arrays in cached.items():
+                for group, values in arrays.items():
+                    shared_results.fill(group, list(rows[game, None][group].values()), values)
+
+            if tasks:
+                # The simulator is handed to each worker once, not pickled with every task
+                initargs = (self, players, stats, num_sims, shared_results.spec(), rows)
+                with mp.Pool(processes=optimal_processes, initializer=_init_worker, initargs=initargs) as pool:
+                    # Use imap_unordered for better performance with large datasets
+                    finished = pool.imap_unordered(_simulate_block, tasks)
+                    for _ in tasks:
+                        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                        try:
+                            game, start, stop = finished.next(timeout)
+                        except mp.TimeoutError:
+                            logger.warning(f"Deadline reached with {sum(map(len, completed.values()))} of {len(tasks)} blocks done")
+                            break
+                        completed[game].add(start)
+        finally:
+            # The parent's mapping outlives the name, so nothing is left behind in /dev/shm
+            shared_results.unlink()
+
+        # Keep the sims every game finished without a gap; later blocks are dropped
+        done = num_sims
+        for starts in completed.values():
+            blocks = 0
+            while blocks * self.sim_block_size in starts:
+                blocks += 1
+            done = min(done, blocks * self.sim_block_size)
+
+        if cache is not None and done == num_sims:
+            for game in simulated:
+                cache.put(keys[game], {group: shared_results.read(group, list(rows[game, None][group].values()))
+                                       for group in rows[game, None]})
+            cache.prune()
+
+        results = shared_results.results()
+        if done < num_sims:
+            for group in results.values():
+                group['stats'] = {stat: values[:, :done] for stat, values in group['stats'].items()}
+                if 'weights' in group:
+                    group['weights'] = group['weights'][:, :done]
+        add_rate_stats(results['pitchers'])
+        if branches == [None]:
+            return {None: results}
+
+        branch_results = {}
+        for branch in branches:
+            branch_results[branch] = {}
+            for group, block in results.items():
+                branch_rows = [row for game in games for row in rows[game, branch][group].values()]
+                branch_results[branch][group] = {label: [block[label][row] for row in branch_rows] for label in LABELS}
+                branch_results[branch][group]['stats'] = {stat: values[branch_rows] for stat, values in block['stats'].items()}
+                if 'weights' in block:
+                    branch_results[branch][group]['weights'] = block['weights'][branch_rows]
+        return branch_results
 
     def simulate_game(self, away_team, home_team, sim_number):
-        # Initialize game state
-        inning = 1
-        half_inning = 0
-        outs = 0
-        runners = [None] * 3
-        inherited_runners = [None] * 3
-        runs = np.zeros(2, dtype=int)
-        runs_current_inning = 0
-        starter_info = [None, None]
-        results_dict = {}
-
-        # Add tracking variables for first occurrences
-        first_hit = False
-        first_rbi = False
-        first_run = False
-        first_hr = False
-        first_k = False
-        first_run_allowed = False
-
-        # Add inning-specific tracking
-        first_inning_complete = False
-        first_three_innings_complete = False
+        self.play_game(away_team, home_team)
+        stat_table = self.stat_table
+        layout = self.game_layout(away_team, home_team)
 
-        if not (home_team and away_team):
-            raise ValueError("Unable to determine home and away teams")
-        
-        pitcher_stats = ["pBF", "pOuts", "pW", "pQS", "pIP", "pH", "p1B", "p2B", "p3B", "pHR", "pSB", "pCS", "pK", "pBB", "pHBP", "pR", "pPC", "In_Game", "In_Line_For_Win",
-                        "pFirstInnK", "pFirst3InnK", "pFirstInnPC", "pFirst3InnPC", "pFirstInnR", "pFirst3InnR", "pFirstInnH", "pFirst3InnH", "pFirstInnBF", "pFirst3InnBF", "pFirstRunAllowed", "pFirstK"]
-        hitter_stats = ["bPA", "b1B", "b2B", "b3B", "bHR", "bSB", "bCS", "bK", "bBB", "bHBP", "bR", "bRBI",
-                       "bFirstInnR", "bFirst3InnR", "bFirstInnH", "bFirst3InnH", "bFirstInnHRBI", "bFirst3InnHRBI",
-                       "bFirstHit", "bFirstRBI", "bFirstRun", "bFirstHR"]
-
-        for team, index in [(away_team, 0), (home_team, 1)]:
-            for player in self.teams_dict[team]:
-                if 'Opener' in player['Position']:
-                    continue
-                elif 'P' in player['Position']:
-                    starter_info[index] = (player['Name'], player['Position'], player['Team'])
-                    results_dict[starter_info[index]] = {stat: (1 if stat == 'In_Game' else 0) for stat in pitcher_stats}
-                else:
-                    results_dict[(player['Name'], player['Position'], player['Team'])] = {stat: 0 for stat in hitter_stats}
+        hitter_results = []
+        pitcher_results = []
 
+        for index in layout['pitchers']:
+            player = self.players[index]
+            stats = {stat: stat_table[index][STAT_COLUMNS[stat]] for stat in PITCHER_STATS}
+            stats['pIP'] = round(stats['pOuts'] / 3, 2)
+            stats['pERA'] = round((9 / (stats['pOuts'] / 3)) * stats['pR'], 2) if stats['pOuts'] > 0 else 'inf'
+            stats["pH"] = stats["p1B"] + stats["p2B"] + stats["p3B"] + stats["pHR"]
+            stats["pUD"] = stats["pW"] * 5 + stats["pQS"] * 5 + stats["pK"] * 3 + stats["pOuts"] - stats["pR"] * 3
+            opp_team = away_team if player['Team'] != away_team else home_team
+            pitcher_results.append({**stats, 'player': player['Name'], 'team': player['Team'], 'opp': opp_team, 'pos': player['Position'], 'sim_no': sim_number})
+
+        for index in layout['hitters']:
+            player = self.players[index]
+            stats = {stat: stat_table[index][STAT_COLUMNS[stat]] for stat in self.hitter_stats}
+            stats["bH"] = stats["b1B"] + stats["b2B"] + stats["b3B"] + stats["bHR"]
+            stats["bHRRBI"] = stats["bH"] + stats["bR"] + stats["bRBI"]
+            stats["bTB"] = stats["b1B"] + 2 * stats["b2B"] + 3 * stats["b3B"] + 4 * stats["bHR"]
+            stats["bUD"] = stats["b1B"] * 3 + stats["b2B"] * 6 + stats["b3B"] * 8 + stats["bHR"] * 10 + stats["bR"] * 2 + stats["bRBI"] * 2 + stats["bBB"] * 3 + stats["bHBP"] * 3 + stats["bSB"] * 4
+            opp_team = away_team if player['Team'] != away_team else home_team
+            hitter_results.append({**stats, 'player': player['Name'], 'team': player['Team'], 'opp': opp_team, 'pos': player['Position'], 'sim_no': sim_number})
 
-        results_dict[('bullpen', 'bullpen', away_team)] = {stat: 0 for stat in pitcher_stats}
-        results_dict[('bullpen', 'bullpen', home_team)] = {stat: 0 for stat in pitcher_stats}
-        results_dict[('ph', 'ph', away_team)] = {stat: 0 for stat in hitter_stats}
-        results_dict[('ph', 'ph', home_team)] = {stat: 0 for stat in hitter_stats}
+        return {
+            'hitter_results': hitter_results,
+            'pitcher_results': pitcher_results
+        }
 
+    def play_game(self, away_team, home_team, start=None):
+        """Simulate one game, leaving every player's counts in self.stat_table.
+
+        With a live state compiled by compile_live_state as start, the
+        players' rows begin at its stats and only the rest of the game is
+        played.
+        """
+        game, team_data, starter_info = self.start_game(away_team, home_team, start)
+        self.play_innings(game, team_data, starter_info)
+        self.finish_game(starter_info)
+
+    def start_game(self, away_team, home_team, start=None):
+        """Reset a game's stat rows and set up its state for play_innings.
+
+        Returns:
+            Tuple of (GameState, team_data, starter_info), where team_data
+            holds each side's lineup, pitcher, batting order slot, bullpen
+            and pinch hitter, and starter_info the [away, home] starters
+        """
+        if not (home_team and away_team):
+            raise ValueError("Unable to determine home and away teams")
+        
+        if self.stat_table is None:
+            self.build_stat_table()
+        stat_table = self.stat_table
+        layout = self.game_layout(away_team, home_team)
+
+        # Reset the game's rows from the previous sim
+        for index in layout['players']:
+            stat_table[index][:] = self.zero_row
+        for index in layout['pitchers']:
+            stat_table[index][STAT_COLUMNS['In_Game']] = 1
+        starter_info = list(layout['starters'])
+
+        away_id, home_id = self.team_ids[away_team], self.team_ids[home_team]
         team_data = {
-            0: {'lineup': self.create_lineup(away_team), 'pitcher': self.get_pitcher(away_team), 'order': 0},
-            1: {'lineup': self.create_lineup(home_team), 'pitcher': self.get_pitcher(home_team), 'order': 0}
+            0: {'team': away_team, 'lineup': list(layout['lineups'][0]), 'pitcher': self.get_pitcher(away_team),
+                'order': 0, 'bullpen': self.bullpens[away_id], 'ph': self.pinch_hitters[away_id]},
+            1: {'team': home_team, 'lineup': list(layout['lineups'][1]), 'pitcher': self.get_pitcher(home_team),
+                'order': 0, 'bullpen': self.bullpens[home_id], 'ph': self.pinch_hitters[home_id]}
         }
+        if start is not None:
+            for index, stat, count in start['stats']:
+                stat_table[index][STAT_COLUMNS[stat]] = count
+            for side in range(2):
+                team_data[side]['order'] = start['order'][side]
+                if start['relieved'][side]:
+                    stat_table[starter_info[side]][STAT_COLUMNS['In_Game']] = 0
+                    team_data[side]['pitcher'] = team_data[side]['bullpen']
+        game = GameState(start)
+        return game, team_data, starter_info
+
+    def play_innings(self, game, team_data, starter_info, scenario=None, until=None):
+        """Play half innings of a started game.
+
+        Args:
+            game, team_data, starter_info: As returned by start_game
+            scenario: Optional Scenario changing how the teams manage
+            until: Stop once this inning is complete instead of playing
+                to the end of the game
+
+        Returns:
+            True once the game is over, False if it stopped after until
+        """
+        stat_table = self.stat_table
+        pull_after, bullpen_split, pinch_hit_rate = (scenario.settings([team_data[0]['team'], team_data[1]['team']])
+                                                      if scenario is not None else ([None, None], [RP, RP], 1.0))
 
         # Game loop
         while True:
+            if until is not None and game.inning > until:
+                return False
+            half_inning = game.half
             batting_team = team_data[half_inning]['lineup']
             place_in_batting_order = team_data[half_inning]['order']
             current_pitcher = team_data[1 - half_inning]['pitcher']
-            
-            # Track inning-specific stats
-            team_key = 'home' if half_inning == 1 else 'away'
+            game.starter = starter_info[1 - half_inning]
             
             # Simulate plate appearances until 3 outs
-            while outs < 3:
+            while game.state < THREE_OUTS:
 
                 # check if pitcher was pulled
-                if results_dict[starter_info[1 - half_inning]]['In_Game']:
-                    was_pulled, inherited_runners = self.handle_pitching_change(current_pitcher, runners, inning, runs_current_inning, results_dict)
+                if stat_table[game.starter][STAT_COLUMNS['In_Game']]:
+                    was_pulled, game.inherited = self.handle_pitching_change(current_pitcher, game.bases, game.inning, game.runs_inning, stat_table,
+                                                                             pull_after[1 - half_inning])
 
                     if was_pulled:
-                        results_dict[starter_info[1 - half_inning]]['In_Game'] = 0
+                        stat_table[game.starter][STAT_COLUMNS['In_Game']] = 0
 
                         # Check if starter is in line for the win
-                        if self.check_win_eligibility(inning, runs, half_inning):
-                            results_dict[starter_info[1 - half_inning]]['In_Line_For_Win'] = 1
+                        if self.check_win_eligibility(game.inning, game.runs, half_inning):
+                            stat_table[game.starter][STAT_COLUMNS['In_Line_For_Win']] = 1
 
                         # Switch to bullpen pitcher
-                        current_pitcher = self.pitchers_dict[('bullpen', 'bullpen', starter_info[1 - half_inning][2])]
+                        current_pitcher = team_data[1 - half_inning]['bullpen']
                         team_data[1 - half_inning]['pitcher'] = current_pitcher
 
+                game.pitcher = current_pitcher['Index']
+                game.split = SP if stat_table[game.starter][STAT_COLUMNS['In_Game']] else bullpen_split[1 - half_inning]
                 current_batter = batting_team[place_in_batting_order]
 
                 # check to see if batter gets pinch hit for or gets removed from the game
@@ -548,108 +1058,81 @@ class MLB_Game_Simulator:
                 if self.get_random() < 0.01: 
                     remove = True
                 if current_pitcher['Name'] == 'bullpen':
-                    if self.get_random() < current_batter['PH']:
+                    if self.get_random() < current_batter['PH'] * pinch_hit_rate:
                         remove = True
                 else:
                     pass
 
                 if remove:
-                    if half_inning == 0: 
-                        team = away_team
-                    else: 
-                        team = home_team
                     # replace current batter
-                    current_batter = self.hitters_dict[('ph', 'ph', team)]
+                    current_batter = team_data[half_inning]['ph']
 
                     team_data[half_inning]['lineup'][place_in_batting_order] = current_batter
 
-                # check for stolen base shenanigans
-                lead_runner_index = next((i for i in range(2, -1, -1) if runners[i] is not None), None)
-
-                if lead_runner_index is not None and lead_runner_index < 2:
-                    runners, outs = self.sim_stolen_base(lead_runner_index, runners, outs, results_dict, current_pitcher)
-                    if outs == 3:
+                # check for stolen base shenanigans: lead runner on first or second with third open
+                if game.state & 3 and not game.state & 4:
+                    self.sim_stolen_base(game)
+                    if game.state >= THREE_OUTS:
                         break
                 
                 # sim plate appearance
-                runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed = self.simulate_plate_appearance(current_batter, current_pitcher, results_dict, runners, outs, inherited_runners, starter_info, half_inning, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed)
-
-                # add runs scored during plate appearance to score
-                runs[half_inning] += pa_runs
-                runs_current_inning += pa_runs
+                self.simulate_plate_appearance(game, current_batter)
 
                 # check for walk off
-                if half_inning == 1 and inning >= 9 and runs[1] > runs[0]:
+                if half_inning == 1 and game.inning >= 9 and game.runs[1] > game.runs[0]:
                     break
 
                 # update batting order
                 if place_in_batting_order == 8: place_in_batting_order = 0
                 else: place_in_batting_order = place_in_batting_order + 1
 
-            # Update inning completion flags
-            if inning == 1 and half_inning == 1:
-                first_inning_complete = True
-            if inning == 3 and half_inning == 1:
-                first_three_innings_complete = True
-
             # check for game over
+            inning, runs = game.inning, game.runs
             if (inning >= 9 and half_inning == 1 and runs[0] != runs[1]) or (inning == 9 and half_inning == 0 and runs[1] > runs[0]):
                 break
 
             # handle end of half-inning
-            outs = 0
-            runs_current_inning = 0
-            runners = [None] * 3
-            inherited_runners = [None] * 3
+            game.end_half_inning()
             team_data[half_inning]['order'] = place_in_batting_order
 
             # check if starter still in line for win
             for i in range(2):
-                if results_dict[starter_info[i]]['In_Line_For_Win'] == 1:
-                    results_dict[starter_info[i]]['In_Line_For_Win'] = int(runs[i] > runs[1-i])
-
-            if half_inning == 1:
-                inning += 1
-            half_inning = 1 - half_inning
-
-        hitter_results = []
-        pitcher_results = []
+                if stat_table[starter_info[i]][STAT_COLUMNS['In_Line_For_Win']] == 1:
+                    stat_table[starter_info[i]][STAT_COLUMNS['In_Line_For_Win']] = int(runs[i] > runs[1-i])
+        return True
 
+    def finish_game(self, starter_info):
+        """Credit the starters' quality starts and wins once a game is over."""
+        stat_table = self.stat_table
         for starter in starter_info:
-            results_dict[starter]['pIP'] = round(results_dict[starter]['pOuts'] / 3, 2)
-            results_dict[starter]['pERA'] = round((9 / (results_dict[starter]['pOuts'] / 3)) * results_dict[starter]['pR'], 2) if results_dict[starter]['pOuts'] > 0 else 'inf'
-            if results_dict[starter]['pOuts'] >= 18 and results_dict[starter]['pR'] <= 3:
-                results_dict[starter]['pQS'] = 1
-            if results_dict[starter]['In_Line_For_Win']:
-                results_dict[starter]['pW'] = 1
-
-        for player, stats in results_dict.items():
-            if player[0] == 'bullpen' or player[0] == 'ph': continue
-            opp_team = away_team if player[2] != away_team else home_team
-            if player[1] == 'P':
-                stats["pH"] = stats["p1B"] + stats["p2B"] + stats["p3B"] + stats["pHR"]
-                stats["pUD"] = stats["pW"] * 5 + stats["pQS"] * 5 + stats["pK"] * 3 + stats["pOuts"] - stats["pR"] * 3
-
-                pitcher_results.append({**stats, 'player': player[0], 'team': player[2], 'opp': opp_team, 'pos': player[1], 'sim_no': sim_number})
-            else:
-                stats["bH"] = stats["b1B"] + stats["b2B"] + stats["b3B"] + stats["bHR"]
-                stats["bHRRBI"] = stats["bH"] + stats["bR"] + stats["bRBI"]
-                stats["bTB"] = stats["b1B"] + 2 * stats["b2B"] + 3 * stats["b3B"] + 4 * stats["bHR"]
-                stats["bUD"] = stats["b1B"] * 3 + stats["b2B"] * 6 + stats["b3B"] * 8 + stats["bHR"] * 10 + stats["bR"] * 2 + stats["bRBI"] * 2 + stats["bBB"] * 3 + stats["bHBP"] * 3 + stats["bSB"] * 4
-                hitter_results.append({**stats, 'player': player[0], 'team': player[2], 'opp': opp_team,'pos': player[1], 'sim_no': sim_number})
-
-        return {
-            'hitter_results': hitter_results,
-            'pitcher_results': pitcher_results
-        }
-
-    def handle_pitching_change(self, current_pitcher, runners, inning, runs_current_inning, results_dict):
-        starter_key = (current_pitcher['Name'], current_pitcher['Position'], current_pitcher['Team'])
+            if stat_table[starter][STAT_COLUMNS['pOuts']] >= 18 and stat_table[starter][STAT_COLUMNS['pR']] <= 3:
+                stat_table[starter][STAT_COLUMNS['pQS']] = 1
+            if stat_table[starter][STAT_COLUMNS['In_Line_For_Win']]:
+                stat_table[starter][STAT_COLUMNS['pW']] = 1
+
+    def save_checkpoint(self, layout, game, team_data):
+        """Snapshot a paused game: its players' stat rows, state and team_data."""
+        team_data = {side: dict(data, lineup=list(data['lineup'])) for side, data in team_data.items()}
+        return self.stat_array[layout['players']].copy(), game.copy(), team_data
+
+    def restore_checkpoint(self, layout, checkpoint):
+        """Put a game back at a checkpoint, returning fresh (game, team_data) to play on."""
+        rows, game, team_data = checkpoint
+        self.stat_array[layout['players']] = rows
+        team_data = {side: dict(data, lineup=list(data['lineup'])) for side, data in team_data.items()}
+        return game.copy(), team_data
+
+    def handle_pitching_change(self, current_pitcher, runners, inning, runs_current_inning, stat_table, pull_after=None):
+        starter_key = current_pitcher['Index']
+
+        # A scenario can pull the starter once he has finished an inning
+        if pull_after is not None and inning > pull_after:
+            return True, runners.copy()
         
         # Check if the current pitcher is the starter
         #if starter_key == self.starters[1 - half_inning]:
-        pitch_count = results_dict[starter_key]['pPC']
-        runs_allowed = results_dict[starter_key]['pR']
+        pitch_count = stat_table[starter_key][STAT_COLUMNS['pPC']]
+        runs_allowed = stat_table[starter_key][STAT_COLUMNS['pR']]
         projected_pitch_count = current_pitcher['PPC']
         max_pitch_count = current_pitcher['MPC']
 
@@ -680,1326 +1163,309 @@ class MLB_Game_Simulator:
                 return runs[0] > runs[1]
         return False
 
+    def roster(self, team):
+        """A team's hitters then pitchers, in file order."""
+        return [self.players[index] for index in self.slate.rosters[self.team_ids[team]]]
+
     def create_lineup(self, team):
-        lineup = sorted([player for player in self.teams_dict[team] if 'P' not in player['Position']], key=lambda x: x.get('Order', float('inf')))[:9]
-        return lineup
+        """The team's first nine hitters by batting order."""
+        return [self.players[index] for index in self.slate.lineups[self.team_ids[team]]]
 
     def get_pitcher(self, team):
-        pitcher = next(player for player in self.teams_dict[team] if 'P' in player['Position'])
-        return pitcher
-
-    def add_pitches(self, outcome):
-        outcome_stats = {
-            'hit': (3.35, 1.84),
-            'bb': (5.73, 1.36),
-            'k': (4.85, 1.4),
-            'out': (3.38, 1.83),
-            'hbp': (3.17, 1.8)
-        }
-        
-        outcome_mean, outcome_std = outcome_stats.get(outcome, (0, 0))
-        p = round(np.random.normal(outcome_mean, outcome_std))
-        
-        if outcome == 'bb':
-            return max(p, 4)
-        elif outcome == 'k':
-            return max(p, 3)
-        else:
-            return max(p, 1)
+        starter = self.slate.starters[self.team_ids[team]]
+        if starter is None:
+            raise ValueError(f"No starting pitcher projected for {team}")
+        return self.players[starter]
+
+    def add_pitches(self, outcome, pitcher=None):
+        """Pitches thrown in a PA ending in outcome, from the pitcher's pool for it.
+
+        Args:
+            outcome: Pitch-count kind ('hit', 'bb', 'k', 'out' or 'hbp')
+            pitcher: Pitcher Index, or None for the league-wide distribution
+        """
+        distribution = self.pitch_sources[pitcher][outcome]
+        pool = self.pitch_pools.get(distribution)
+        if pool is None or pool[1] >= len(pool[0]):
+            pool = self.refill_pitch_pool(distribution)
+        pitches = pool[0][pool[1]]
+        pool[1] += 1
+        return pitches
+
+    def refill_pitch_pool(self, distribution):
+        """Draw a fresh pool of clamped integer pitch counts from self.rng.
+
+        Returns:
+            [counts, next position] list stored in self.pitch_pools
+        """
+        mean, std, minimum = self.pitch_distributions[distribution]
+        counts = np.maximum(np.rint(self.rng.normal(mean, std, self.pitch_pool_size)), minimum)
+        pool = [counts.astype(int).tolist(), 0]
+        self.pitch_pools[distribution] = pool
+        return pool
     
-    def simulate_plate_appearance(self, batter, pitcher, results_dict, runners, outs, inherited_runners, starter_info, half_inning, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
+    def simulate_plate_appearance(self, game, batter):
+        """Play one PA for batter against game.pitcher and resolve it through the base-out tables."""
+        stat_table = self.stat_table
+        batter_row = stat_table[batter['Index']]
+        pitcher_row = stat_table[game.pitcher]
+        game.batter = batter['Index']
+
         # Log PA stat
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bPA"] += 1
+        batter_row[STAT_COLUMNS['bPA']] += 1
         
         # Log BF stat for pitcher
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pBF"] += 1
+        pitcher_row[STAT_COLUMNS['pBF']] += 1
 
-        if results_dict[starter_info[1 - half_inning]]['In_Game'] == 0:
-            outcome_indicator = "RP"
-        else:
-            outcome_indicator = "SP"
-        
         # Simulate PA outcome
-        outcome = self.sim_pa_outcome(batter, outcome_indicator)
-        pa_runs = 0
-        
-        if inning == 1 and not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnBF"] += 1
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnBF"] += 1
-            if outcome in ['1B', '2B', '3B', 'HR']:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnH"] += 1
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnH"] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirstInnH"] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirst3InnH"] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirstInnHRBI"] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirst3InnHRBI"] += 1
-        elif inning <= 3 and not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnBF"] += 1
-            if outcome in ['1B', '2B', '3B', 'HR']:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnH"] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirst3InnH"] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirst3InnHRBI"] += 1
-
-        if not first_hit and outcome in ['1B', '2B', '3B', 'HR']:
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]["bFirstHit"] += 1
-            first_hit = True
-
-        handler = getattr(self, f'handle_{outcome.lower()}')
-        return handler(batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed)
-    
-    def sim_pa_outcome(self, batter, outcome_indicator):
-        valid_outcomes = ['1B', '2B', '3B', 'HR', 'BB', 'HBP', 'OUT']
-        prob_list = [float(batter[outcome_indicator][outcome]) for outcome in valid_outcomes]
-        prob_list = np.array(prob_list) / sum(prob_list)
-        choice = np.random.choice(valid_outcomes, p=prob_list)
-        return choice
+        outcome = self.sim_pa_outcome(batter, game.split)
+        batter_row[OUTCOME_COLUMNS[game.split][outcome]] += 1
+        hit = outcome <= HOME_RUN
+
+        if game.inning <= 3:
+            pitcher_row[STAT_COLUMNS['pFirst3InnBF']] += 1
+            if game.inning == 1:
+                pitcher_row[STAT_COLUMNS['pFirstInnBF']] += 1
+            if hit:
+                pitcher_row[STAT_COLUMNS['pFirst3InnH']] += 1
+                batter_row[STAT_COLUMNS['bFirst3InnH']] += 1
+                batter_row[STAT_COLUMNS['bFirst3InnHRBI']] += 1
+                if game.inning == 1:
+                    pitcher_row[STAT_COLUMNS['pFirstInnH']] += 1
+                    batter_row[STAT_COLUMNS['bFirstInnH']] += 1
+                    batter_row[STAT_COLUMNS['bFirstInnHRBI']] += 1
+
+        if not game.first_hit and hit:
+            batter_row[STAT_COLUMNS['bFirstHit']] += 1
+            game.first_hit = True
+
+        if outcome == OUT:
+            self.resolve_out(game, batter)
+        else:
+            self.advance_runners(game, outcome)
     
-    def sim_stolen_base(self, lead_runner, runners, outs, results_dict, current_pitcher):
+    def sim_pa_outcome(self, batter, split):
+        """Sample an outcome code (index into OUTCOMES) for batter's SP or RP split."""
+        return self.pa_cdf[batter['Index']][split].searchsorted(self.get_random(), side='right')
+
+    def sim_stolen_base(self, game):
+        """Lead runner on first or second may try to steal the next base."""
+        lead_runner = 1 if game.state & 2 else 0
+        runners = game.bases
         runner = runners[lead_runner]
-        if current_pitcher['Name'] == 'bullpen':
-            runner_stats = self.hitters_dict[runner]["RP"]
-        else:
-            runner_stats = self.hitters_dict[runner]["SP"]
-        attempt_denominator = runner_stats['1B'] + runner_stats['BB'] + runner_stats['HBP']
-        success_denominator = runner_stats['SB'] + runner_stats['CS']
-        
-        attempt_ratio = ((runner_stats['SB'] + runner_stats['CS']) / attempt_denominator) * 0.7 if attempt_denominator > 0 else 0
-        success_ratio = runner_stats['SB'] / success_denominator if success_denominator > 0 else 0
+        attempt_ratio, success_ratio = self.steal_rates[runner][game.split]
         
         if self.get_random() < attempt_ratio:
             if self.get_random() < success_ratio:
                 runners[lead_runner + 1], runners[lead_runner] = runner, None
-                results_dict[runner]['bSB'] += 1
+                self.stat_table[runner][STAT_COLUMNS['bSB']] += 1
+                # The runner's occupancy bit moves up one place
+                game.state += 1 << lead_runner
             else:
                 runners[lead_runner] = None
-                results_dict[runner]['bCS'] += 1
-                outs += 1
-                results_dict[(current_pitcher['Name'], current_pitcher['Position'], current_pitcher['Team'])]['pOuts'] += 1
-        
-        return runners, outs
-
-    def handle_bb(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        # Log BB stat
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bBB'] += 1
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pBB'] += 1
-        pitches = self.add_pitches('bb')
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-
-        # Update bases and runners
-        runners = [(batter['Name'], batter['Position'], batter['Team'])] + runners
-        if runners[3] != None:  # Runner on third scores
-            pa_runs += 1
-            results_dict[runners[3]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[3]]['bFirstRun'] += 1
-                first_run = True    
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[3]]['bFirstInnR'] += 1
-                results_dict[runners[3]]['bFirstInnHRBI'] += 1
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[3] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        
-        runners = runners[:3]
-        
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-
-    def handle_hbp(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        # Log hbp stat
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bHBP'] += 1
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pHBP'] += 1
-        pitches = self.add_pitches('hbp')
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-
-        # Update bases and runners
-        runners = [(batter['Name'], batter['Position'], batter['Team'])] + runners
-        if runners[3] != None:  # Runner on third scores
-            pa_runs += 1
-            results_dict[runners[3]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[3]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[3]]['bFirstInnR'] += 1
-                results_dict[runners[3]]['bFirstInnHRBI'] += 1
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[3] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        
-        runners = runners[:3]
-        
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-    
-    def handle_extra_base_advancement(self, batter, pitcher, runners, outs, pa_runs, hit_type, lead_runner, results_dict, inherited_runners, starter_info, half_inning, outcome_indicator, first_inning_complete, first_three_innings_complete, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        if hit_type not in ['1b', '2b']:
-            raise ValueError("hit_type must be either '1B' or '2B'")
+                self.stat_table[runner][STAT_COLUMNS['bCS']] += 1
+                self.stat_table[game.pitcher][STAT_COLUMNS['pOuts']] += 1
+                game.state += 8 - (1 << lead_runner)
+
+    def add_pitch_count(self, game, outcome):
+        """Charge the pitches of a PA ending in outcome to game.pitcher."""
+        pitches = self.add_pitches(outcome, game.pitcher)
+        row = self.stat_table[game.pitcher]
+        row[STAT_COLUMNS['pPC']] += pitches
+        if game.inning <= 3:
+            row[STAT_COLUMNS['pFirst3InnPC']] += pitches
+            if game.inning == 1:
+                row[STAT_COLUMNS['pFirstInnPC']] += pitches
+
+    def credit_run(self, game, runner, rbi):
+        """Score runner, updating the score and every run-related stat.
+
+        Credits the run (and the batter's RBI if rbi) with the first-event and
+        first-inning / first-3-innings splits, and charges it to the pulled
+        starter if runner was inherited, else to game.pitcher.
+        """
+        stat_table = self.stat_table
+        inning = game.inning
+        row = stat_table[runner]
+        row[STAT_COLUMNS['bR']] += 1
+        if not game.first_run:
+            row[STAT_COLUMNS['bFirstRun']] += 1
+            game.first_run = True
+        if inning <= 3:
+            row[STAT_COLUMNS['bFirst3InnR']] += 1
+            row[STAT_COLUMNS['bFirst3InnHRBI']] += 1
+            if inning == 1:
+                row[STAT_COLUMNS['bFirstInnR']] += 1
+                row[STAT_COLUMNS['bFirstInnHRBI']] += 1
+
+        if rbi:
+            row = stat_table[game.batter]
+            row[STAT_COLUMNS['bRBI']] += 1
+            if not game.first_rbi:
+                row[STAT_COLUMNS['bFirstRBI']] += 1
+                game.first_rbi = True
+            if inning <= 3:
+                row[STAT_COLUMNS['bFirst3InnHRBI']] += 1
+                if inning == 1:
+                    row[STAT_COLUMNS['bFirstInnHRBI']] += 1
+
+        row = stat_table[game.starter if runner in game.inherited else game.pitcher]
+        row[STAT_COLUMNS['pR']] += 1
+        if not game.first_run_allowed:
+            row[STAT_COLUMNS['pFirstRunAllowed']] += 1
+            game.first_run_allowed = True
+        if inning <= 3:
+            row[STAT_COLUMNS['pFirst3InnR']] += 1
+            if inning == 1:
+                row[STAT_COLUMNS['pFirstInnR']] += 1
+
+        game.runs[game.half] += 1
+        game.runs_inning += 1
+
+    def credit_home_run(self, game):
+        """Score the batter on a home run.
+
+        Unlike credit_run, this leaves the first run, first RBI and first run
+        allowed flags alone, and always charges game.pitcher.
+        """
+        inning = game.inning
+        row = self.stat_table[game.batter]
+        row[STAT_COLUMNS['bR']] += 1
+        row[STAT_COLUMNS['bRBI']] += 1
+        if not game.first_hr:
+            row[STAT_COLUMNS['bFirstHR']] += 1
+            game.first_hr = True
+        if inning <= 3:
+            row[STAT_COLUMNS['bFirst3InnR']] += 1
+            row[STAT_COLUMNS['bFirst3InnHRBI']] += 1
+            if inning == 1:
+                row[STAT_COLUMNS['bFirstInnR']] += 1
+                row[STAT_COLUMNS['bFirstInnHRBI']] += 1
+
+        row = self.stat_table[game.pitcher]
+        row[STAT_COLUMNS['pR']] += 1
+        if inning <= 3:
+            row[STAT_COLUMNS['pFirst3InnR']] += 1
+            if inning == 1:
+                row[STAT_COLUMNS['pFirstInnR']] += 1
+
+        game.runs[game.half] += 1
+        game.runs_inning += 1
+
+    def advance_runners(self, game, outcome):
+        """Resolve a hit or free pass from ADVANCE_TABLE."""
+        batter_stat, pitcher_stat, pitch_kind = PLAY_STATS[outcome]
+        self.stat_table[game.batter][STAT_COLUMNS[batter_stat]] += 1
+        self.stat_table[game.pitcher][STAT_COLUMNS[pitcher_stat]] += 1
+        if outcome == HOME_RUN:
+            self.credit_home_run(game)
+        self.add_pitch_count(game, pitch_kind)
+
+        sources, scorers, occupied, lead_runner = ADVANCE_TABLE[outcome][game.state & 7]
+        runners = game.bases + [game.batter, None]
+        for base in scorers:
+            self.credit_run(game, runners[base], True)
+        game.bases = [runners[source] for source in sources]
+        game.state += occupied - (game.state & 7)
+
+        if lead_runner != EMPTY:
+            self.extra_base_advancement(game, outcome, lead_runner)
+
+    def extra_base_advancement(self, game, outcome, lead_runner):
+        """Lead runner may try for an extra base after a single or double (EXTRA_BASE)."""
+        runner = game.bases[lead_runner]
+        attempt_ratio, success_ratio = self.advance_rates[runner][game.split]
 
-        runner = runners[lead_runner]
-        runner_stats = self.hitters_dict[runner][outcome_indicator]
-        attempt_denominator = runner_stats['1B'] + runner_stats['BB'] + runner_stats['HBP']
-        success_denominator = runner_stats['SB'] + runner_stats['CS']
-        
-        attempt_ratio = ((runner_stats['SB'] + runner_stats['CS']) / attempt_denominator) * 1.2 if attempt_denominator > 0 else 0
-        success_ratio = runner_stats['SB'] * 1.3 / success_denominator if success_denominator > 0 else 0
-        
-        if self.get_random() < (attempt_ratio):
-            # makes attempt to advance a base
+        if self.get_random() < attempt_ratio:
+            safe, scores, thrown_out = EXTRA_BASE[(outcome, lead_runner)]
+            runners = game.bases + [game.batter, None]
+            outs = game.state >> 3
             if self.get_random() < success_ratio:
-                # successfully advances a base
-                if lead_runner == 2:
-                    pa_runs += 1
-                    results_dict[runner]['bR'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                    if not first_run:
-                        results_dict[runner]['bFirstRun'] += 1
-                        first_run = True
-                    if not first_rbi:
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                        first_rbi = True
-                    if not first_inning_complete:
-                        results_dict[runner]['bFirstInnR'] += 1
-                        results_dict[runner]['bFirstInnHRBI'] += 1
-                        results_dict[runner]['bFirst3InnR'] += 1
-                        results_dict[runner]['bFirst3InnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[runner]['bFirst3InnR'] += 1
-                        results_dict[runner]['bFirst3InnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                    if runner in inherited_runners:
-                        results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    else:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    if hit_type == '1b':
-                        runners[2], runners[1] = runners[1], None
-                    else:
-                        runners[2] = None
-                else:
-                    runners[2], runners[1] = runners[1], None
-            else:
-                # lead runner is thrown out
-                if lead_runner == 1:
-                    runners[1] = None
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                    outs += 1
-                else:
-                    runners[2], runners[1] = runners[1], None
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                    outs += 1
-        else:
-            # fails to make and attempt to advance a base
-            pass
-
-        return runners, outs, pa_runs, first_run, first_rbi, first_run_allowed
-
-    def handle_1b(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        # Log 1B stat
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['b1B'] += 1
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['p1B'] += 1
-        pitches = self.add_pitches('hit')
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-
-        # Update bases and runners
-        runners = [(batter['Name'], batter['Position'], batter['Team'])] + runners
-        if runners[3] != None:  # Runner on third scores
-            pa_runs += 1
-            results_dict[runners[3]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[3]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[3]]['bFirstInnR'] += 1
-                results_dict[runners[3]]['bFirstInnHRBI'] += 1
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[3] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        
-        runners = runners[:3]
-
-        if runners[2] != None:
-            lead_runner = 2
-            runners, outs, pa_runs, first_run, first_rbi, first_run_allowed = self.handle_extra_base_advancement(batter, pitcher, runners, outs, pa_runs, "1b", lead_runner, results_dict, inherited_runners, starter_info, half_inning, outcome_indicator, first_inning_complete, first_three_innings_complete, first_hit, first_rbi, first_run, first_hr, first_run_allowed)
-        elif runners[1] != None: 
-            lead_runner = 1
-            runners, outs, pa_runs, first_run, first_rbi, first_run_allowed = self.handle_extra_base_advancement(batter, pitcher, runners, outs, pa_runs, "1b", lead_runner, results_dict, inherited_runners, starter_info, half_inning, outcome_indicator, first_inning_complete, first_three_innings_complete, first_hit, first_rbi, first_run, first_hr, first_run_allowed)
-        else: pass
-        
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-    
-    def handle_2b(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        # Log 2B stat
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['b2B'] += 1
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['p2B'] += 1
-        pitches = self.add_pitches('hit')
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-
-        # Update bases and runners
-        runners = [None, (batter['Name'], batter['Position'], batter['Team'])] + runners
-        if runners[3] != None:  # Runner on second scores
-            pa_runs += 1
-            results_dict[runners[3]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[3]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[3]]['bFirstInnR'] += 1
-                results_dict[runners[3]]['bFirstInnHRBI'] += 1
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[3] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
+                if scores:
+                    self.credit_run(game, runner, True)
+                game.bases = [runners[source] for source in safe]
             else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        
-        if runners[4] != None:  # Runner on third scores
-            pa_runs += 1
-            results_dict[runners[4]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[4]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[4]]['bFirstInnR'] += 1
-                results_dict[runners[4]]['bFirstInnHRBI'] += 1
-                results_dict[runners[4]]['bFirst3InnR'] += 1
-                results_dict[runners[4]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[4]]['bFirst3InnR'] += 1
-                results_dict[runners[4]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[4] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-
-        runners = runners[:3]
-
-        if runners[2] != None: 
-            lead_runner = 2
-            runners, outs, pa_runs, first_run, first_rbi, first_run_allowed = self.handle_extra_base_advancement(batter, pitcher, runners, outs, pa_runs, "2b", lead_runner, results_dict, inherited_runners, starter_info, half_inning, outcome_indicator, first_inning_complete, first_three_innings_complete, first_hit, first_rbi, first_run, first_hr, first_run_allowed)
-        else:
-            pass
-        
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-    
-    def handle_3b(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['b3B'] += 1
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['p3B'] += 1
-        pitches = self.add_pitches('hit')
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-
-        # Update bases and runners
-        runners = [None, None, (batter['Name'], batter['Position'], batter['Team'])] + runners
-        if runners[3] != None:  # Runner on first scores
-            pa_runs += 1
-            results_dict[runners[3]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[3]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[3]]['bFirstInnR'] += 1
-                results_dict[runners[3]]['bFirstInnHRBI'] += 1
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[3] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        
-        if runners[4] != None:  # Runner on second scores
-            pa_runs += 1
-            results_dict[runners[4]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[4]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[4]]['bFirstInnR'] += 1
-                results_dict[runners[4]]['bFirstInnHRBI'] += 1
-                results_dict[runners[4]]['bFirst3InnR'] += 1
-                results_dict[runners[4]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[4]]['bFirst3InnR'] += 1
-                results_dict[runners[4]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[4] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-
-        if runners[5] != None:  # Runner on third scores
-            pa_runs += 1
-            results_dict[runners[5]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[5]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[5]]['bFirstInnR'] += 1
-                results_dict[runners[5]]['bFirstInnHRBI'] += 1
-                results_dict[runners[5]]['bFirst3InnR'] += 1
-                results_dict[runners[5]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[5]]['bFirst3InnR'] += 1
-                results_dict[runners[5]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[5] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-
-        runners = runners[:3]
-
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-    
-    def handle_hr(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
-        # Log HR stat
-        pa_runs += 1
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bHR'] += 1
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bR'] += 1
-        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-
-        if not first_hr:
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstHR'] += 1
-            first_hr = True
-        if not first_inning_complete:
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-        elif not first_three_innings_complete:
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pHR'] += 1
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-
-        pitches = self.add_pitches('hit')
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-        if not first_inning_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-        elif not first_three_innings_complete:
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-
-        # Update bases and runners
-        runners = [None, None, None] + runners
-        if runners[3] != None:  # Runner on first scores
-            pa_runs += 1
-            results_dict[runners[3]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[3]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[3]]['bFirstInnR'] += 1
-                results_dict[runners[3]]['bFirstInnHRBI'] += 1
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[3]]['bFirst3InnR'] += 1
-                results_dict[runners[3]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[3] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-        
-        if runners[4] != None:  # Runner on second scores
-            pa_runs += 1
-            results_dict[runners[4]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[4]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[4]]['bFirstInnR'] += 1
-                results_dict[runners[4]]['bFirstInnHRBI'] += 1
-                results_dict[runners[4]]['bFirst3InnR'] += 1
-                results_dict[runners[4]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[4]]['bFirst3InnR'] += 1
-                results_dict[runners[4]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[4] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-
-        if runners[5] != None:  # Runner on third scores
-            pa_runs += 1
-            results_dict[runners[5]]['bR'] += 1
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-            if not first_run:
-                results_dict[runners[5]]['bFirstRun'] += 1
-                first_run = True
-            if not first_rbi:
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                first_rbi = True
-            if not first_inning_complete:
-                results_dict[runners[5]]['bFirstInnR'] += 1
-                results_dict[runners[5]]['bFirstInnHRBI'] += 1
-                results_dict[runners[5]]['bFirst3InnR'] += 1
-                results_dict[runners[5]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            elif not first_three_innings_complete:
-                results_dict[runners[5]]['bFirst3InnR'] += 1
-                results_dict[runners[5]]['bFirst3InnHRBI'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-            if runners[5] in inherited_runners:
-                results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-            else:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                if not first_run_allowed:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                    first_run_allowed = True
-                if not first_inning_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                elif not first_three_innings_complete:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-
-        runners = runners[:3]
-
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-    
-    def handle_out(self, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, outcome_indicator, inning, first_inning_complete, first_three_innings_complete, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed):
+                game.bases = [runners[source] for source in thrown_out]
+                self.stat_table[game.pitcher][STAT_COLUMNS['pOuts']] += 1
+                outs += 1
+            game.state = base_out_state(game.bases, outs)
+
+    def resolve_out(self, game, batter):
+        stat_table = self.stat_table
+        pitcher_row = stat_table[game.pitcher]
         # Log Out stat for pitcher
-        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
+        pitcher_row[STAT_COLUMNS['pOuts']] += 1
+        game.state += 8
 
         # Sim to see if out was a strikeout
-        batter_k_per_out = batter[outcome_indicator]['K'] / batter[outcome_indicator]['OUT']
-        k = self.get_random()
-        if k <= batter_k_per_out:
+        if self.get_random() <= self.k_per_out[batter['Index']][game.split]:
             # Log K stat
-            results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bK'] += 1
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pK'] += 1
-            if not first_k:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstK"] += 1
-                first_k = True
-            if not first_inning_complete:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnK"] += 1
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnK"] += 1
-            elif not first_three_innings_complete:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnK"] += 1
-
-            pitches = self.add_pitches('k')
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-            if not first_inning_complete:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-            elif not first_three_innings_complete:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-            out_is_k = True
-        else:
-            pitches = self.add_pitches('out')
-            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pPC'] += pitches
-            if not first_inning_complete:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnPC"] += pitches
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-            elif not first_three_innings_complete:
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnPC"] += pitches
-            out_is_k = False
-
-        outs += 1
-
-        # If out was last out or a strikeout, no need to handle baserunning
-        if outs == 3 or out_is_k:
-            return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-
-        base_state = [int(runners[i] is not None) for i in range(3)]
-        # Handle ball in play out
-        if sum(base_state) > 0:
-            r = self.get_random()
-            runners, outs, pa_runs, first_run, first_rbi, first_run_allowed = self.handle_ball_in_play_out(r, base_state, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, first_inning_complete, first_three_innings_complete, first_run_allowed, first_run, first_rbi)
-
-        return runners, outs, pa_runs, first_k, first_hit, first_rbi, first_run, first_hr, first_run_allowed
-
-    def handle_ball_in_play_out(self, r, base_state, batter, pitcher, runners, outs, results_dict, pa_runs, inherited_runners, starter_info, half_inning, first_inning_complete, first_three_innings_complete, first_run_allowed, first_run, first_rbi):
-        
-        if base_state == [0, 0, 1]:  # Runner on third
-            if r < 0.6:
-                if self.get_random() < 0.93:
-                    # Successful sac fly
-                    pa_runs += 1
-                    results_dict[runners[2]]['bR'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                    if not first_run:
-                        results_dict[runners[2]]['bFirstRun'] += 1
-                        first_run = True
-                    if not first_rbi:
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                        first_rbi = True
-                    if not first_inning_complete:
-                        results_dict[runners[2]]['bFirstInnR'] += 1
-                        results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                    if runners[2] in inherited_runners:
-                        results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    else:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                else:
-                    # Runner thrown out at home
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                    outs += 1
-                runners = [None, None, None]
-            elif r >= 0.96:
-                # Ground out, fielder's choice
-                runners = [(batter['Name'], batter['Position'], batter['Team']), None, None]
-        
-        elif base_state == [0, 1, 0]:  # Runner on second
-            if r < 0.46:
-                # Runner advances to third
-                runners[2], runners[1] = runners[1], None
-            elif r >= 0.98:
-                # Ground out, fielder's choice
-                runners = [(batter['Name'], batter['Position'], batter['Team']), None, None]
-        
-        elif base_state == [0, 1, 1]:  # Runners on second and third
-            if r < 0.5:
-                # Sac fly, run scores, runner advances
-                pa_runs += 1
-                results_dict[runners[2]]['bR'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                if not first_run:
-                    results_dict[runners[2]]['bFirstRun'] += 1
-                    first_run = True
-                if not first_rbi:
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                    first_rbi = True
-                if not first_inning_complete:
-                    results_dict[runners[2]]['bFirstInnR'] += 1
-                    results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                elif not first_three_innings_complete:
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                if runners[2] in inherited_runners:
-                    results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners = [None, None, runners[1]]
-            elif r < 0.6:
-                # Sac fly, run scores, no advancement
-                pa_runs += 1
-                results_dict[runners[2]]['bR'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                if not first_run:
-                    results_dict[runners[2]]['bFirstRun'] += 1
-                    first_run = True
-                if not first_rbi:
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                    first_rbi = True
-                if not first_inning_complete:
-                    results_dict[runners[2]]['bFirstInnR'] += 1
-                    results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                elif not first_three_innings_complete:
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                if runners[2] in inherited_runners:
-                    results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners[2] = None
-            elif r >= 0.98:
-                # Ground out, fielder's choice, out at home
-                runners = [(batter['Name'], batter['Position'], batter['Team']), None, runners[1]]
-
-        elif base_state == [1, 0, 0]:  # Runner on first
-            if r < 0.08:
-                # Double play
-                outs += 1
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                runners = [None, None, None]
-            elif r < 0.36:
-                # Fielder's choice, runner advances
-                runners = [None, runners[0], None]
-        
-        elif base_state == [1, 0, 1]:  # Runners on first and third
-            if r < 0.07:
-                # Double play, run may score
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                outs += 1
-                if outs < 3:
-                    pa_runs += 1
-                    results_dict[runners[2]]['bR'] += 1
-                    if not first_run:
-                        results_dict[runners[2]]['bFirstRun'] += 1
-                        first_run = True
-                    if not first_inning_complete:
-                        results_dict[runners[2]]['bFirstInnR'] += 1
-                        results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    if runners[2] in inherited_runners:
-                        results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    else:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners = [None, None, None]
-            elif r < 0.26:
-                # Out at first, run scores, runner advances
-                pa_runs += 1
-                results_dict[runners[2]]['bR'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                if not first_run:
-                    results_dict[runners[2]]['bFirstRun'] += 1
-                    first_run = True
-                if not first_rbi:
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                    first_rbi = True
-                if not first_inning_complete:
-                    results_dict[runners[2]]['bFirstInnR'] += 1
-                    results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                elif not first_three_innings_complete:
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                if runners[2] in inherited_runners:
-                    results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners = [None, runners[0], None]
-            elif r < 0.31:
-                # Advances to second, no score
-                runners = [None, runners[0], runners[2]]
-            elif r < 0.86:
-                # Sac fly, run scores
-                pa_runs += 1
-                results_dict[runners[2]]['bR'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                if not first_run:
-                    results_dict[runners[2]]['bFirstRun'] += 1
-                    first_run = True
-                if not first_rbi:
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                    first_rbi = True
-                if not first_inning_complete:
-                    results_dict[runners[2]]['bFirstInnR'] += 1
-                    results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                elif not first_three_innings_complete:
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                if runners[2] in inherited_runners:
-                    results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners[2] = None
-        
-        elif base_state == [1, 1, 0]:  # Runners on first and second
-            if r < 0.08:
-                # Double play, runner advances to third
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                outs += 1
-                runners = [None, None, runners[1]]
-            elif r < 0.3:
-                # Out at first, both runners advance
-                runners = [None, runners[0], runners[1]]
-            elif r < 0.54:
-                # Runner advances to third
-                runners[2] = runners[1]
-                runners[1] = None
-        
-        elif base_state == [1, 1, 1]:  # Bases loaded
-            if r < 0.05:
-                # Double play, run scores
-                results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                outs += 1
-                if outs < 3:
-                    pa_runs += 1
-                    results_dict[runners[2]]['bR'] += 1
-                    if not first_run:
-                        results_dict[runners[2]]['bFirstRun'] += 1
-                        first_run = True
-                    if not first_inning_complete:
-                        results_dict[runners[2]]['bFirstInnR'] += 1
-                        results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    if runners[2] in inherited_runners:
-                        results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    else:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    runners = [None, None, runners[1]]
-                else:
-                    runners = [None, None, None]
-            elif r < 0.17:
-                # Out at first, run may score
-                runners = [None, runners[0], runners[1]]
-                if self.get_random() < 0.95:
-                    pa_runs += 1
-                    results_dict[runners[2]]['bR'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                    if not first_run:
-                        results_dict[runners[2]]['bFirstRun'] += 1
-                        first_run = True
-                    if not first_rbi:
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                        first_rbi = True
-                    if not first_inning_complete:
-                        results_dict[runners[2]]['bFirstInnR'] += 1
-                        results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[runners[2]]['bFirst3InnR'] += 1
-                        results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                        results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                    if runners[2] in inherited_runners:
-                        results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    else:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                        if not first_run_allowed:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                            first_run_allowed = True
-                        if not first_inning_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                        elif not first_three_innings_complete:
-                            results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pOuts'] += 1
-                    outs += 1  # Double play at home
-            elif r < 0.5:
-                # Sac, run scores, runner advances to third
-                pa_runs += 1
-                results_dict[runners[2]]['bR'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                if not first_run:
-                    results_dict[runners[2]]['bFirstRun'] += 1
-                    first_run = True
-                if not first_rbi:
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                    first_rbi = True
-                if not first_inning_complete:
-                    results_dict[runners[2]]['bFirstInnR'] += 1
-                    results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                elif not first_three_innings_complete:
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                if runners[2] in inherited_runners:
-                    results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners = [runners[0], None, runners[1]]
-            elif r < 0.72:
-                # Sac, run scores, no advancement
-                pa_runs += 1
-                results_dict[runners[2]]['bR'] += 1
-                results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bRBI'] += 1
-                if not first_run:
-                    results_dict[runners[2]]['bFirstRun'] += 1
-                    first_run = True
-                if not first_rbi:
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstRBI'] += 1
-                    first_rbi = True
-                if not first_inning_complete:
-                    results_dict[runners[2]]['bFirstInnR'] += 1
-                    results_dict[runners[2]]['bFirstInnHRBI'] += 1
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirstInnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                elif not first_three_innings_complete:
-                    results_dict[runners[2]]['bFirst3InnR'] += 1
-                    results_dict[runners[2]]['bFirst3InnHRBI'] += 1
-                    results_dict[(batter['Name'], batter['Position'], batter['Team'])]['bFirst3InnHRBI'] += 1
-                if runners[2] in inherited_runners:
-                    results_dict[starter_info[1 - half_inning]]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[starter_info[1 - half_inning]]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirstInnR"] += 1
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[starter_info[1 - half_inning]]["pFirst3InnR"] += 1
-                else:
-                    results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pR'] += 1
-                    if not first_run_allowed:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]['pFirstRunAllowed'] += 1
-                        first_run_allowed = True
-                    if not first_inning_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirstInnR"] += 1
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                    elif not first_three_innings_complete:
-                        results_dict[(pitcher['Name'], pitcher['Position'], pitcher['Team'])]["pFirst3InnR"] += 1
-                runners[2] = None
-        
-        return runners, outs, pa_runs, first_run, first_rbi, first_run_allowed
+            stat_table[game.batter][STAT_COLUMNS['bK']] += 1
+            pitcher_row[STAT_COLUMNS['pK']] += 1
+            if not game.first_k:
+                pitcher_row[STAT_COLUMNS['pFirstK']] += 1
+                game.first_k = True
+            if game.inning <= 3:
+                pitcher_row[STAT_COLUMNS['pFirst3InnK']] += 1
+                if game.inning == 1:
+                    pitcher_row[STAT_COLUMNS['pFirstInnK']] += 1
+            self.add_pitch_count(game, 'k')
+            return
+
+        self.add_pitch_count(game, 'out')
+        # Runners only move on a ball in play that doesn't end the inning
+        if game.state < THREE_OUTS and game.state & 7:
+            self.resolve_ball_in_play(game)
+
+    def resolve_ball_in_play(self, game):
+        """Move runners on a ball-in-play out from BALL_IN_PLAY_TABLE."""
+        r = self.get_random()
+        for bound, sources, scorer, rbi, outs_added, next_state in BALL_IN_PLAY_TABLE[game.state]:
+            if r < bound:
+                break
+
+        if outs_added:
+            self.stat_table[game.pitcher][STAT_COLUMNS['pOuts']] += outs_added
+        runners = game.bases + [game.batter, None]
+        if scorer != EMPTY:
+            self.credit_run(game, runners[scorer], rbi)
+        game.bases = [runners[source] for source in sources]
+        game.state = next_state
+
+    def compare_engines(self, num_sims=2000, games=None):
+        """Check the vectorized engine against the scalar path.
+
+        Runs num_sims games of each matchup through both engines and compares
+        every player's per-stat mean with a two-sample z-score.
+
+        Returns:
+            DataFrame with one row per player and stat, sorted by |z|
+        """
+        rows = []
+        for away_team, home_team in games or self.games:
+            scalar = [self.simulate_game(away_team, home_team, i) for i in range(num_sims)]
+            vectorized = VectorizedGameEngine(self, away_team, home_team, rng=self.rng).run(num_sims)
+            for group, key in (('hitters', 'hitter_results'), ('pitchers', 'pitcher_results')):
+                scalar_df = pd.DataFrame([row for result in scalar for row in result[key]])
+                block = vectorized[group]
+                for i, player in enumerate(block['player']):
+                    player_df = scalar_df[scalar_df['player'] == player]
+                    for stat, values in block['stats'].items():
+                        if stat == 'pERA':
+                            continue
+                        a = player_df[stat].astype(float).to_numpy()
+                        b = values[i].astype(float)
+                        se = np.sqrt(a.var(ddof=1) / len(a) + b.var(ddof=1) / len(b))
+                        diff = b.mean() - a.mean()
+                        rows.append({
+                            'player': player,
+                            'stat': stat,
+                            'scalar_mean': a.mean(),
+                            'vectorized_mean': b.mean(),
+                            'z': diff / se if se > 0 else 0.0
+                        })
+        comparison = pd.DataFrame(rows)
+        return comparison.reindex(comparison['z'].abs().sort_values(ascending=False).index)
 
     def process_results(self, h_results_list, p_results_list, game_results_list):
         cols = ['player', 'team', 'PA', 'H', '1B', '2B', '3B', 'HR', 'TB', 'R', 'RBI', 'HRRBI', 'SB', 'CS', 'BB', 'K', 'HBP', 'UD', 'sim_no']
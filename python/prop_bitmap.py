@@ -1,4 +1,4 @@
-from typing import Dict, List
+from typing import Dict, List, Sequence, Tuple
 import math
 from bitarray import bitarray
 import zlib
@@ -10,15 +10,182 @@ import gzip
 import numpy as np
 from redis_helper import RedisHelper
 
+# Comparison of a prop's stat with its threshold
+COMPARISONS = {'>=': np.greater_equal, '<=': np.less_equal, '==': np.equal}
+# Most booleans threshold_bitmaps holds at once, about 64 MB
+MAX_BATCH_BOOLS = 1 << 26
+# gzip level of published bitmaps: level 9 takes several times as long on
+# sparse bitmaps for a few percent smaller output
+GZIP_LEVEL = 6
+# How published props are stored: a bitmap per catalog threshold, or per
+# player stat a uint8 level array or its bit planes, any line read from either
+STORAGE_MODES = ('bitmaps', 'levels', 'planes')
+# Highest level a uint8 level array holds above its offset
+MAX_LEVEL = 255
+# Set bits of each byte value, for counting packed bitmaps
+BYTE_POPCOUNT = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(axis=1)
+
+
+def stat_levels(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """uint8 level arrays of a players x sims stat matrix.
+
+    Each player's levels count up from their lowest value, the offset, so
+    stats that go negative, like pitcher fantasy points, fit. Values more
+    than MAX_LEVEL above the offset are held at MAX_LEVEL.
+
+    Returns:
+        Tuple of the players x sims levels and each player's offset
+    """
+    values = np.asarray(values)
+    offsets = values.min(axis=1) if values.shape[1] else np.zeros(len(values), dtype=values.dtype)
+    levels = np.minimum(values - offsets[:, None], MAX_LEVEL).astype(np.uint8)
+    return levels, offsets
+
+
+def level_hits(levels: np.ndarray, offset: int, comparison: str, threshold: float) -> np.ndarray:
+    """Boolean array over the sims of a stat, stored as levels, compared with a threshold."""
+    return COMPARISONS[comparison](levels.astype(np.int64) + offset, threshold)
+
+
+def level_planes(levels: np.ndarray) -> np.ndarray:
+    """Bit planes of a uint8 level array: planes x bytes, plane j packing bit j of every sim's level.
+
+    Planes are packed like bitmaps, bit i % 8 of byte i // 8 for sim i,
+    and go up to the highest set bit of the levels, so a stat that never
+    leaves its offset has none.
+    """
+    levels = np.asarray(levels, dtype=np.uint8)
+    num_planes = int(levels.max(initial=0)).bit_length()
+    bits = np.unpackbits(levels[:, None], axis=1, bitorder='little')[:, :num_planes]
+    return np.packbits(bits.T, axis=1, bitorder='little')
+
+
+def planes_at_least(planes: np.ndarray, level: int) -> np.ndarray:
+    """Packed bitmap of the sims whose level, stored as bit planes, is at least level.
+
+    Compares a plane at a time from the highest, keeping the sims already
+    above level and those equal to it so far, with bitwise logic over whole
+    words; no sim's level is unpacked.
+    """
+    num_planes, num_bytes = planes.shape
+    if level <= 0:
+        return np.full(num_bytes, 0xFF, dtype=np.uint8)
+    if level >= 1 << num_planes:
+        return np.zeros(num_bytes, dtype=np.uint8)
+    words = np.ascontiguousarray(planes)
+    if num_bytes % 8 == 0:
+        words = words.view(np.uint64)
+    greater = np.zeros_like(words[0])
+    equal = ~greater
+    for j in range(num_planes - 1, -1, -1):
+        if level >> j & 1:
+            equal &= words[j]
+        else:
+            greater |= equal & words[j]
+            equal &= ~words[j]
+    return (greater | equal).view(np.uint8)
+
+
+def plane_hits(planes: np.ndarray, offset: int, comparison: str, threshold: int) -> np.ndarray:
+    """Packed bitmap of a stat, stored as bit planes, compared with a threshold."""
+    level = threshold - offset
+    if comparison == '<=':
+        return ~planes_at_least(planes, level + 1)
+    if comparison == '==':
+        return planes_at_least(planes, level) & ~planes_at_least(planes, level + 1)
+    return planes_at_least(planes, level)
+
+
+def plane_levels(planes: np.ndarray, num_sims: int) -> np.ndarray:
+    """uint8 level array over the sims of its bit planes."""
+    levels = np.zeros(num_sims, dtype=np.uint8)
+    for j, plane in enumerate(planes):
+        levels |= np.unpackbits(plane, bitorder='little')[:num_sims] << j
+    return levels
+
+
+def threshold_counts(levels: np.ndarray, offset: int, thresholds: Sequence[Tuple[str, int]],
+                     weights: np.ndarray = None) -> List[float]:
+    """Sims, or their total weight, hitting each (comparison, threshold) of a stat stored as levels.
+
+    One histogram of the levels answers every threshold.
+    """
+    histogram = np.bincount(levels, weights=weights, minlength=MAX_LEVEL + 1)
+    at_most = np.cumsum(histogram)
+    counts = []
+    for comparison, threshold in thresholds:
+        level = threshold - offset
+        if comparison == '<=':
+            count = at_most[min(level, MAX_LEVEL)] if level >= 0 else 0
+        elif comparison == '==':
+            count = histogram[level] if 0 <= level <= MAX_LEVEL else 0
+        else:
+            count = at_most[-1] - (at_most[min(level, MAX_LEVEL + 1) - 1] if level > 0 else 0)
+        counts.append(count.item() if isinstance(count, np.generic) else count)
+    return counts
+
+
+def threshold_bitmaps(values: np.ndarray, lines: Sequence[Tuple[str, int]], weights: np.ndarray = None,
+                      prior: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Bitmaps and counts of every threshold prop of one stat for a group of players.
+
+    Compares the whole players x sims matrix with all thresholds at once
+    and packs the results with np.packbits, batching players to bound
+    memory. The bitmaps are packed like add_prop's, bit i % 8 of byte
+    i // 8 for sim i.
+
+    Args:
+        values: players x sims integer matrix of the stat
+        lines: (comparison, threshold) of each prop, comparison a COMPARISONS key
+        weights: Optional players x sims per-sim weights; counts are then
+            the props' total weights
+        prior: Optional players x props x sims booleans of published sims
+            to put before the new ones
+
+    Returns:
+        Tuple of the players x props x bytes packed bitmaps and the
+        players x props counts
+    """
+    values = np.asarray(values)
+    num_players, num_sims = values.shape
+    total_sims = num_sims + (0 if prior is None else prior.shape[2])
+    packed = np.empty((num_players, len(lines), (total_sims + 7) // 8), dtype=np.uint8)
+    counts = np.empty((num_players, len(lines)), dtype=np.int64 if weights is None else np.float64)
+    batch = max(1, MAX_BATCH_BOOLS // max(1, len(lines) * total_sims))
+    for start in range(0, num_players, batch):
+        stop = min(start + batch, num_players)
+        hits = np.empty((stop - start, len(lines), num_sims), dtype=bool)
+        for i, (comparison, threshold) in enumerate(lines):
+            COMPARISONS[comparison](values[start:stop], threshold, out=hits[:, i])
+        if prior is not None:
+            hits = np.concatenate([prior[start:stop], hits], axis=2)
+        packed[start:stop] = np.packbits(hits, axis=2, bitorder='little')
+        if weights is None:
+            counts[start:stop] = np.count_nonzero(hits, axis=2)
+        else:
+            counts[start:stop] = np.einsum('pls,ps->pl', hits, weights[start:stop])
+    return packed, counts
+
+
 class PropBitmap:
-    def __init__(self, num_sims: int):
+    def __init__(self, num_sims: int, weights: List[float] = None):
         """Initialize bitmap storage for props.
         
         Args:
             num_sims: Number of simulations run
+            weights: Optional per-sim likelihood weights of an
+                importance-sampled run; probabilities are then weighted means
         """
         self.num_sims = num_sims
-        self.props: Dict[str, List[int]] = {}
+        self.weights = None if weights is None else np.asarray(weights, dtype=np.float64)
+        if self.weights is not None and len(self.weights) != num_sims:
+            raise ValueError(f"Expected {num_sims} weights, got {len(self.weights)}")
+        # Gzipped bitmap of each prop, as bytes or, loaded from JSON, integers
+        self.props: Dict[str, bytes] = {}
+        # (offset, uint8 levels over the sims) of each '<player>_<stat>', in levels storage
+        self.levels: Dict[str, Tuple[int, np.ndarray]] = {}
+        # (offset, planes x bytes bit planes) of each '<player>_<stat>', in planes storage
+        self.planes: Dict[str, Tuple[int, np.ndarray]] = {}
         self.redis = RedisHelper.get_instance()
         
         # Initialize Redis connection
@@ -51,11 +218,112 @@ class PropBitmap:
             if result:
                 binary_data[i // 8] |= 1 << (i % 8)
         
-        # Compress the data
-        compressed = gzip.compress(bytes(binary_data))
-        # Store as list of integers for JSON serialization
-        self.props[prop_name] = [b for b in compressed]
-        
+        # Compress the data; to_json turns it into integers for JSON
+        self.props[prop_name] = gzip.compress(bytes(binary_data), compresslevel=GZIP_LEVEL)
+
+    def add_packed(self, prop_name: str, packed: np.ndarray) -> bytes:
+        """Add a prop from its packed bitmap, as made by threshold_bitmaps.
+
+        Args:
+            prop_name: Name of the prop
+            packed: uint8 array of the results, bit i % 8 of byte i // 8 for sim i
+
+        Returns:
+            The gzipped bitmap as stored, for publishing without encoding it again
+        """
+        if len(packed) != (self.num_sims + 7) // 8:
+            raise ValueError(f"Expected {(self.num_sims + 7) // 8} bytes, got {len(packed)}")
+        compressed = gzip.compress(np.ascontiguousarray(packed, dtype=np.uint8).tobytes(), compresslevel=GZIP_LEVEL)
+        self.props[prop_name] = compressed
+        return compressed
+        
+    def add_levels(self, name: str, levels: np.ndarray, offset: int) -> bytes:
+        """Add a player stat as a uint8 level array, as made by stat_levels.
+
+        Args:
+            name: '<player>_<stat>', e.g. "trout_total_bases"
+            levels: uint8 levels over the sims
+            offset: Stat value of level 0
+
+        Returns:
+            The gzipped levels, for publishing without encoding them again
+        """
+        if len(levels) != self.num_sims:
+            raise ValueError(f"Expected {self.num_sims} levels, got {len(levels)}")
+        self.levels[name] = (int(offset), np.asarray(levels, dtype=np.uint8))
+        return gzip.compress(self.levels[name][1].tobytes(), compresslevel=GZIP_LEVEL)
+
+    def add_planes(self, name: str, levels: np.ndarray, offset: int) -> bytes:
+        """Add a player stat as the bit planes of a uint8 level array, as made by stat_levels.
+
+        Args:
+            name: '<player>_<stat>', e.g. "trout_total_bases"
+            levels: uint8 levels over the sims
+            offset: Stat value of level 0
+
+        Returns:
+            The gzipped planes, one after another, for publishing without
+            encoding them again
+        """
+        if len(levels) != self.num_sims:
+            raise ValueError(f"Expected {self.num_sims} levels, got {len(levels)}")
+        self.planes[name] = (int(offset), level_planes(levels))
+        return gzip.compress(self.planes[name][1].tobytes(), compresslevel=GZIP_LEVEL)
+
+    def line_bitmap(self, name: str, line: float, under: bool = False) -> np.ndarray:
+        """Packed bitmap of a player stat going over, or with under missing, any line.
+
+        Lines are read like props.php reads them, an over of x being the
+        stat reaching ceil(x), so half-point and alternate lines work.
+        Bitmaps of several lines AND into a parlay's.
+
+        Args:
+            name: '<player>_<stat>' of a stat stored with add_levels or add_planes
+            line: Line, e.g. 1.5
+        """
+        if name in self.planes:
+            offset, planes = self.planes[name]
+            packed = plane_hits(planes, offset, '>=', math.ceil(line))
+        elif name in self.levels:
+            offset, levels = self.levels[name]
+            packed = np.packbits(level_hits(levels, offset, '>=', math.ceil(line)), bitorder='little')
+        else:
+            raise KeyError(f"No stat named {name}")
+        return ~packed if under else packed
+
+    def get_line_prob(self, name: str, line: float, under: bool = False) -> float:
+        """Probability of a player stat going over, or with under missing, any line.
+
+        Args:
+            name: '<player>_<stat>' of a stat stored with add_levels or add_planes
+            line: Line, e.g. 1.5
+        """
+        if name not in self.levels and name not in self.planes:
+            return None
+        return self._packed_probability(self.line_bitmap(name, line, under))
+
+    def get_parlay_prob(self, lines: Sequence[Tuple[str, float, bool]]) -> float:
+        """Probability of every line of a parlay hitting.
+
+        Args:
+            lines: ('<player>_<stat>', line, under) of each leg
+        """
+        packed = self.line_bitmap(*lines[0])
+        for line in lines[1:]:
+            packed = packed & self.line_bitmap(*line)
+        return self._packed_probability(packed)
+
+    def _packed_probability(self, packed: np.ndarray) -> float:
+        """_probability of a packed bitmap, counting its bits directly when unweighted."""
+        if self.weights is None:
+            # Bits past the last sim are cleared before counting
+            tail = self.num_sims % 8
+            if tail:
+                packed = packed.copy()
+                packed[-1] &= (1 << tail) - 1
+            return int(BYTE_POPCOUNT[packed].sum()) / self.num_sims
+        return self._probability(np.unpackbits(packed, bitorder='little')[:self.num_sims].astype(bool))
+
     def get_prob(self, prop_name: str) -> float:
         """Get probability of a prop hitting.
         
@@ -68,17 +336,18 @@ class PropBitmap:
         if prop_name not in self.props:
             return None
         
-        # Decompress the data
-        compressed = bytes(self.props[prop_name])
-        binary_data = gzip.decompress(compressed)
-        
-        # Count the ones
-        count = 0
-        for i in range(self.num_sims):
-            if binary_data[i // 8] & (1 << (i % 8)):
-                count += 1
-        
-        return count / self.num_sims
+        return self._probability(self._bits(prop_name))
+
+    def _bits(self, prop_name: str) -> np.ndarray:
+        """Decompress a prop's bitmap into a boolean array over the sims."""
+        binary_data = np.frombuffer(gzip.decompress(bytes(self.props[prop_name])), dtype=np.uint8)
+        return np.unpackbits(binary_data, bitorder='little')[:self.num_sims].astype(bool)
+
+    def _probability(self, hits: np.ndarray) -> float:
+        """Share of sims where hits is set, weighted when the run carries weights."""
+        if self.weights is None:
+            return np.count_nonzero(hits) / self.num_sims
+        return float(self.weights[hits].sum() / self.num_sims)
         
     def get_joint_prob(self, prop1: str, prop2: str) -> float:
         """Get probability of both props hitting.
@@ -93,9 +362,7 @@ class PropBitmap:
         if prop1 not in self.props or prop2 not in self.props:
             raise KeyError("Props not found")
             
-        # Bitwise AND is very efficient with bitarray
-        joint_bits = self.props[prop1] & self.props[prop2]
-        return joint_bits.count(1) / self.num_sims
+        return self._probability(self._bits(prop1) & self._bits(prop2))
         
     def get_correlation(self, prop1: str, prop2: str) -> float:
         """Calculate correlation between two props.
@@ -139,10 +406,13 @@ class PropBitmap:
         Returns:
             Dictionary containing compressed props data
         """
-        return {
+        data = {
             'num_sims': self.num_sims,
-            'props': self.props
+            'props': {name: list(bits) for name, bits in self.props.items()}
         }
+        if self.weights is not None:
+            data['weights'] = self.weights.tolist()
+        return data
     
     @classmethod
     def from_json(cls, data: Dict) -> 'PropBitmap':
@@ -157,7 +427,7 @@ class PropBitmap:
         if isinstance(data, str):
             data = json.loads(data)
         
-        instance = cls(data['num_sims'])
+        instance = cls(data['num_sims'], data.get('weights'))
         instance.props = data['props']
         return instance
 
@@ -253,6 +523,8 @@ class PropBitmap:
             'num_sims': self.num_sims,
             'timestamp': timestamp
         }
+        if self.weights is not None:
+            metadata['weights'] = self.weights.tolist()
         self.redis_client.set(meta_key, json.dumps(metadata), ex=86400)  # 24 hour TTL
         
         # Store each prop's bitmap with compression
@@ -297,7 +569,7 @@ class PropBitmap:
             raise KeyError("No simulation data found in Redis")
             
         metadata = json.loads(meta_data)
-        instance = cls(metadata['num_sims'])
+        instance = cls(metadata['num_sims'], metadata.get('weights'))
         instance.redis_client = redis_client
         
         # Load all props with the unique prefix
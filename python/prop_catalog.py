@@ -0,0 +1,102 @@
+"""The catalog of published props, read from prop_catalog.json.
+
+prop_catalog.json lists, for 'batters' and 'pitchers', every stat props
+are published for:
+
+- stat: Underdog stat_name, and the key of the stat in pickem_all_player_stats
+- column: Simulator stat column the props threshold
+- thresholds: Threshold of each prop
+- comparison: How the column is compared with a threshold, '>=' unless given
+- at_most: Thresholds compared with '<=' instead, the lowest lines read as unders
+- key: Bitmap key of a prop, formatted with {stat} and {threshold};
+  '{stat}_{threshold}_plus' unless given
+
+The same file is read by the PHP pages, so a stat or threshold added
+there is published, priced and parlayed without code changes.
+"""
+import json
+import os
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Tuple
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'prop_catalog.json')
+
+
+@dataclass(frozen=True)
+class CatalogStat:
+    """The published props of one stat."""
+    stat: str
+    column: str
+    # (comparison, threshold) of each prop
+    lines: Tuple[Tuple[str, int], ...]
+    key: str = '{stat}_{threshold}_plus'
+
+    def prop_key(self, threshold):
+        """Bitmap key of the prop at a threshold, e.g. 'hits_2_plus'."""
+        return self.key.format(stat=self.stat, threshold=threshold)
+
+    @property
+    def keys(self):
+        """Bitmap key of each prop, in the order of lines."""
+        return [self.prop_key(threshold) for _, threshold in self.lines]
+
+
+@lru_cache(maxsize=None)
+def load_catalog(path=CATALOG_PATH):
+    """{'batters': [CatalogStat], 'pitchers': [CatalogStat]} of a catalog file."""
+    with open(path) as f:
+        data = json.load(f)
+    catalog = {}
+    for group, entries in data.items():
+        catalog[group] = [
+            CatalogStat(
+                stat=entry['stat'],
+                column=entry['column'],
+                lines=tuple(('<=' if threshold in entry.get('at_most', ()) else entry.get('comparison', '>='),
+                             threshold) for threshold in entry['thresholds']),
+                key=entry.get('key', CatalogStat.key)
+            )
+            for entry in entries
+        ]
+    return catalog
+
+
+def find_stat(stat_name, group=None):
+    """CatalogStat of an Underdog stat_name, from group if given, else batters first.
+
+    Raises:
+        KeyError: When no published prop has the stat
+    """
+    catalog = load_catalog()
+    for name in ([group] if group else ['batters', 'pitchers']):
+        for stat in catalog[name]:
+            if stat.stat == stat_name:
+                return stat
+    raise KeyError(f"No published props for {stat_name}")
+
+
+def find_prop(prop, group=None):
+    """(CatalogStat, comparison, threshold) of a bitmap prop key.
+
+    Catalog keys read as the catalog defines them, and '<stat>_<k>_plus'
+    at any other threshold k as the stat reaching k, the alternate lines
+    level storage answers.
+
+    Args:
+        prop: Bitmap prop key, e.g. 'hits_2_plus' or 'first_hit'
+        group: 'batters' or 'pitchers', where stat names are shared
+
+    Raises:
+        KeyError: When the key is of no catalog stat
+    """
+    catalog = load_catalog()
+    for name in ([group] if group else ['batters', 'pitchers']):
+        for stat in catalog[name]:
+            for comparison, threshold in stat.lines:
+                if stat.prop_key(threshold) == prop:
+                    return stat, comparison, threshold
+    stat_name, _, threshold = prop.removesuffix('_plus').rpartition('_')
+    if not prop.endswith('_plus') or not threshold.lstrip('-').isdigit():
+        raise KeyError(f"No published prop {prop}")
+    return find_stat(stat_name, group), '>=', int(threshold)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+import argparse
+import gzip
+import json
+import logging
+
+import numpy as np
+
+from importance import Tilt
+from prop_bitmap import level_hits, plane_hits
+from prop_catalog import find_prop, load_catalog
+from redis_helper import RedisHelper
+from sim_results import player_key
+
+logger = logging.getLogger(__name__)
+
+
+class Reweighter:
+    """Reprice a published run's props under tweaked PA outcome probabilities.
+
+    The probability of a sim's PA outcomes depends on a hitter's outcome
+    probabilities only through the hitter's count of each outcome per split,
+    which SimulationHandler publishes with the props of runs made with
+    outcome_counts. Weighting every sim by the likelihood ratio
+    prod (q / p) ** count of the tweaked probabilities q to the simulated
+    ones p reprices every prop and parlay of the slate as if it had been
+    simulated with the tweak, without simulating again.
+
+    Reweighting only holds up while the tweaked probabilities stay close to
+    the simulated ones: the further they move, the more the weight piles on
+    a few sims. effective_sims measures that, and a warning is logged when
+    it falls below MIN_EFFECTIVE_SHARE of the sims.
+    """
+    # Share of the sims the effective sample size must keep for the
+    # reweighted probabilities to be trusted
+    MIN_EFFECTIVE_SHARE = 0.25
+
+    def __init__(self, tweaks, redis=None):
+        """
+        Args:
+            tweaks: importance.Tilts whose factors scale the published
+                outcome probabilities of their hitters, e.g. Tilt(name,
+                {'HR': 1.05}) for 5% more home runs
+            redis: RedisHelper to read the published run from
+        """
+        self.redis = redis or RedisHelper.get_instance()
+        metadata = self.redis.get('pickem_simulation_metadata')
+        if not metadata:
+            raise RuntimeError('No published simulation to reweight')
+        if not metadata.get('outcome_counts', True):
+            raise RuntimeError('The published simulation has no outcome counts; run it with --outcome-counts '
+                               'to reweight it')
+        self.num_sims = metadata['num_sims']
+        self.bitmaps = {}
+        self.levels = {}
+
+        log_weights = np.zeros(self.num_sims)
+        for tweak in tweaks:
+            counts, probs = self.load_outcome_counts(player_key(tweak.player))
+            _, log_ratio = tweak.tables(np.cumsum(probs, axis=1))
+            # log_ratio is log p - log q for each (split, outcome)
+            log_weights -= np.einsum('so,son->n', log_ratio, counts)
+        self.weights = np.exp(log_weights - log_weights.max())
+        if metadata.get('weighted'):
+            self.weights *= np.asarray(self.redis.get('pickem_sim_weights'), dtype=np.float64)
+
+        self.effective_sims = float(self.weights.sum() ** 2 / (self.weights ** 2).sum())
+        self.reliable = self.effective_sims >= self.MIN_EFFECTIVE_SHARE * self.num_sims
+        if not self.reliable:
+            logger.warning(f"Tweak leaves an effective sample of {self.effective_sims:.0f} of {self.num_sims} "
+                           f"sims; re-simulate for reliable probabilities")
+
+    def load_outcome_counts(self, player_name):
+        """A hitter's published (SP/RP, outcome, sims) outcome counts and outcome probabilities."""
+        data = self.redis.get(f'pickem_player_outcomes_{player_name}')
+        if not data or data.get('probs') is None:
+            raise KeyError(f"No published outcome counts for {player_name}")
+        if data['shape'][2] != self.num_sims:
+            raise RuntimeError(f"Outcome counts for {player_name} do not match the published run")
+        counts = np.frombuffer(gzip.decompress(bytes(data['counts'])), dtype=np.uint8).reshape(data['shape'])
+        return counts.astype(np.float64), np.asarray(data['probs'], dtype=np.float64)
+
+    def bits(self, player_name, prop):
+        """Boolean array over the sims of whether a player's published prop hit.
+
+        Runs published in level storage answer any '<stat>_<k>_plus' key,
+        not only the catalog's.
+
+        Args:
+            player_name: Player name, in any form player_key accepts
+            prop: Bitmap prop key, e.g. 'home_runs_1_plus' or 'first_hit'
+        """
+        player_name = player_key(player_name)
+        if player_name not in self.bitmaps:
+            self.bitmaps[player_name] = self.redis.get_player_bitmap(player_name) or {}
+        if prop not in self.bitmaps[player_name]:
+            return self.level_bits(player_name, prop)
+        packed = np.frombuffer(gzip.decompress(bytes(self.bitmaps[player_name][prop])), dtype=np.uint8)
+        return np.unpackbits(packed, bitorder='little')[:self.num_sims].astype(bool)
+
+    def published_levels(self, player_name):
+        """A player's published level arrays or bit planes, or an empty dict."""
+        if player_name not in self.levels:
+            self.levels[player_name] = (self.redis.get(f'pickem_player_levels_{player_name}')
+                                        or self.redis.get(f'pickem_player_planes_{player_name}') or {})
+        return self.levels[player_name]
+
+    def level_bits(self, player_name, prop):
+        """bits of a prop read from the player's published level arrays or bit planes."""
+        published = self.published_levels(player_name)
+        if not published:
+            raise KeyError(f"No published prop {prop} for {player_name}")
+        stat, comparison, threshold = find_prop(prop, published['group'])
+        if stat.stat not in published['stats']:
+            raise KeyError(f"No published prop {prop} for {player_name}")
+        data = published['stats'][stat.stat]
+        if 'planes' in data:
+            planes = np.frombuffer(gzip.decompress(bytes(data['planes'])), dtype=np.uint8)
+            planes = planes.reshape(data['num_planes'], (published['num_sims'] + 7) // 8)
+            packed = plane_hits(planes, data['offset'], comparison, threshold)
+            return np.unpackbits(packed, bitorder='little')[:self.num_sims].astype(bool)
+        levels = np.frombuffer(gzip.decompress(bytes(data['levels'])), dtype=np.uint8)[:self.num_sims]
+        return level_hits(levels, data['offset'], comparison, threshold)
+
+    def probability(self, player_name, prop, under=False):
+        """Reweighted probability of one prop, or of missing it with under."""
+        return self.joint_probability([(player_name, prop, under)])
+
+    def joint_probability(self, legs):
+        """Reweighted probability that every leg of a parlay hits.
+
+        Args:
+            legs: (player name, bitmap prop key, under) tuples
+        """
+        hits = np.ones(self.num_sims, dtype=bool)
+        for player_name, prop, under in legs:
+            hits &= ~self.bits(player_name, prop) if under else self.bits(player_name, prop)
+        return float(self.weights[hits].sum() / self.weights.sum())
+
+    def player_probabilities(self, player_name):
+        """Reweighted probability of each of a player's published props, by bitmap prop key."""
+        player_name = player_key(player_name)
+        self.bitmaps.setdefault(player_name, self.redis.get_player_bitmap(player_name) or {})
+        props = list(self.bitmaps[player_name])
+        if not props:
+            published = self.published_levels(player_name)
+            props = [key for stat in load_catalog().get(published.get('group'), [])
+                     if stat.stat in published['stats'] for key in stat.keys]
+        return {prop: self.probability(player_name, prop) for prop in props}
+
+
+def parse_tweak(text):
+    """Tilt from "player:OUTCOME=factor,..." as given on the command line."""
+    player, _, factors = text.rpartition(':')
+    return Tilt(player, {outcome: float(factor) for outcome, factor in
+                         (item.split('=') for item in factors.split(','))})
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Reprice published props under tweaked outcome probabilities')
+    parser.add_argument('--tweak', action='append', required=True, type=parse_tweak,
+                        help='Hitter and outcome factors, e.g. "aaron_judge:HR=1.05"; repeatable')
+    parser.add_argument('--leg', action='append', default=[],
+                        help='Parlay leg as player:prop_key, or player:prop_key:under; repeatable')
+    args = parser.parse_args()
+
+    try:
+        reweighter = Reweighter(args.tweak)
+        legs = []
+        for leg in args.leg:
+            parts = leg.split(':')
+            legs.append((parts[0], parts[1], len(parts) > 2 and parts[2] == 'under'))
+        result = {
+            'success': True,
+            'effective_sims': reweighter.effective_sims,
+            'reliable': reweighter.reliable,
+            'legs': [reweighter.probability(*leg) for leg in legs]
+        }
+        if len(legs) > 1:
+            result['joint_probability'] = reweighter.joint_probability(legs)
+    except Exception as e:
+        result = {'success': False, 'error': str(e)}
+    print(json.dumps(result))
@@ -1,5 +1,6 @@
 import sys
 import os
+import argparse
 import logging
 import csv
 import traceback
@@ -41,16 +42,62 @@ except ImportError:
         logger.error(f"Import error: {traceback.format_exc()}")
         logger.error(f"sys.path: {sys.path}")
         sys.exit(1)
+from importance import Tilt
+from mlb_slate_simulator import MLB_Game_Simulator
+from prop_bitmap import STORAGE_MODES
 
 if __name__ == "__main__":
     try:
+        parser = argparse.ArgumentParser(description='Run the slate simulation and publish props to Redis')
+        parser.add_argument('hitter_file', help='Hitter projections CSV')
+        parser.add_argument('pitcher_file', help='Pitcher projections CSV')
+        parser.add_argument('num_sims', type=int, help='Sims per game, or the cap with --target-se')
+        parser.add_argument('seed', type=int, nargs='?', default=None, help='RNG seed')
+        parser.add_argument('--engine', choices=MLB_Game_Simulator.ENGINES, default=None,
+                            help='Simulation engine; both give the same prop distributions and vectorized, the default '
+                                 'unless --antithetic, is much faster')
+        parser.add_argument('--target-se', type=float, default=None,
+                            help='Stop once every prop standard error is at or below this')
+        parser.add_argument('--props-file', default=None,
+                            help='Scraped underdog_props.json whose lines the target applies to')
+        parser.add_argument('--time-budget', type=float, default=None,
+                            help='Wall-clock seconds for the run; publishes the sims completed in time')
+        parser.add_argument('--extend', action='store_true',
+                            help='Grow the published run of the same slate to num_sims instead of starting over')
+        parser.add_argument('--live-states', default=None,
+                            help='JSON of in-progress game states keyed by AWAY@HOME to simulate the rest of')
+        parser.add_argument('--antithetic', action='store_true',
+                            help='Play sims in antithetic pairs to cut prop standard errors')
+        parser.add_argument('--crn', action='store_true',
+                            help='Give every sim its own seed stream, so same-seed variants of a slate compare sim for sim')
+        parser.add_argument('--tilt', action='append', default=[], metavar='PLAYER',
+                            help='Importance-sample a hitter toward extra-base hits for tail props; repeatable')
+        parser.add_argument('--storage', choices=STORAGE_MODES, default='bitmaps',
+                            help='Publish a bitmap per prop threshold, or a level array per player stat, '
+                                 'or its bit planes, that any line is read from')
+        parser.add_argument('--outcome-counts', action='store_true',
+                            help="Publish hitters' PA outcome counts so reweight.py can reprice the run")
+        args = parser.parse_args()
+        if args.antithetic and args.engine == 'vectorized':
+            parser.error('--antithetic needs the scalar engine')
+
         # Get absolute paths for input files
-        hitter_file = os.path.abspath(sys.argv[1])
-        pitcher_file = os.path.abspath(sys.argv[2])
-        num_sims = int(sys.argv[3])
+        hitter_file = os.path.abspath(args.hitter_file)
+        pitcher_file = os.path.abspath(args.pitcher_file)
+        num_sims = args.num_sims
+        seed = args.seed
         
         logger.info(f"Input files - Hitter: {hitter_file}, Pitcher: {pitcher_file}")
         logger.info(f"Number of simulations: {num_sims}")
+        logger.info(f"Seed: {seed}")
+        logger.info(f"Target standard error: {args.target_se}")
+        logger.info(f"Time budget: {args.time_budget}")
+        logger.info(f"Extend published run: {args.extend}")
+        logger.info(f"Live game states: {args.live_states}")
+        logger.info(f"Antithetic: {args.antithetic}, common random numbers: {args.crn}")
+        logger.info(f"Tilted hitters: {args.tilt}")
+        logger.info(f"Storage: {args.storage}")
+        logger.info(f"Outcome counts: {args.outcome_counts}")
         
         # Validate file paths
         if not os.path.exists(hitter_file):
@@ -60,11 +107,17 @@ if __name__ == "__main__":
         
         logger.info(f"Starting simulation with: {hitter_file}, {pitcher_file}, {num_sims}")
         
-        handler = SimulationHandler(hitter_file, pitcher_file, num_sims)
-        logger.info("Created SimulationHandler instance")
+        handler = SimulationHandler(hitter_file, pitcher_file, num_sims, engine=args.engine, seed=seed,
+                                    target_se=args.target_se, props_file=args.props_file,
+                                    time_budget=args.time_budget, extend=args.extend,
+                                    live_states_file=args.live_states, antithetic=args.antithetic,
+                                    common_random_numbers=args.crn, tilts=[Tilt(player) for player in args.tilt],
+                                    storage=args.storage, outcome_counts=args.outcome_counts)
+        logger.info(f"Created SimulationHandler instance, engine {handler.engine}")
         
         batter_sims, pitcher_sims = handler.run_simulation()
-        logger.info("Simulation completed successfully")
+        logger.info(f"Simulation completed successfully (seed {handler.seed}, {handler.achieved_sims} sims, "
+                    f"worst standard error {handler.worst_se}, effective sims {handler.effective_sims})")
         
         results = handler.process_results(batter_sims, pitcher_sims)
         logger.info("Results processed successfully")
@@ -0,0 +1,42 @@
+from dataclasses import dataclass, field
+
+from base_out import SP, RP
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """A what-if applied to the innings after a checkpoint.
+
+    Settings are keyed by team abbreviation; teams left out play as the model
+    normally does. The model has no per-reliever rates, since hitters face a
+    team's whole relief corps through their RP split, so a bullpen swap is
+    expressed as the split the team's relievers pitch to.
+
+    Attributes:
+        name: Label of the branch's results
+        pull_after: Team -> inning after which its starter is pulled
+        bullpen_split: Team -> SP or RP, the hitter split its relievers
+            pitch to; SP makes the bullpen as tough as the starter
+        pinch_hit_rate: Multiplier on each hitter's PH chance of being
+            pinch hit for against relievers; 0 never pinch hits
+    """
+    name: str
+    pull_after: dict = field(default_factory=dict)
+    bullpen_split: dict = field(default_factory=dict)
+    pinch_hit_rate: float = 1.0
+
+    def __post_init__(self):
+        if any(split not in (SP, RP) for split in self.bullpen_split.values()):
+            raise ValueError(f"Bullpen splits must be SP ({SP}) or RP ({RP}), got {self.bullpen_split}")
+        if self.pinch_hit_rate < 0:
+            raise ValueError(f"Pinch hit rate must not be negative, got {self.pinch_hit_rate}")
+
+    def settings(self, teams):
+        """([pull_after], [bullpen split], pinch_hit_rate) for the [away, home] teams."""
+        return ([self.pull_after.get(team) for team in teams],
+                [self.bullpen_split.get(team, RP) for team in teams],
+                self.pinch_hit_rate)
+
+
+# Branch that continues every checkpoint as the model normally would
+BASELINE = Scenario('baseline')
@@ -0,0 +1,367 @@
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from prop_catalog import load_catalog
+
+# Per-player labels carried alongside the stat columns of a result group
+LABELS = ('player', 'team', 'opp', 'pos')
+
+# Underdog stat_name of each published prop -> the stat column it thresholds,
+# from the prop catalog SimulationHandler.process_results publishes
+PROP_STATS = {
+    group: {stat.stat: stat.column for stat in load_catalog()[catalog_group]}
+    for group, catalog_group in (('hitters', 'batters'), ('pitchers', 'pitchers'))
+}
+
+
+class _SharedArray(np.ndarray):
+    """ndarray whose .memory keeps the SharedMemory block it views mapped.
+
+    Views taken from it hold it as their base, so the block is only closed
+    once the last view is gone.
+    """
+
+
+class SharedResults:
+    """Stat buffers in shared memory that pool workers fill in place.
+
+    Each group ('hitters', 'pitchers') is one int16 array shaped
+    stats x players x sims, with the slate's players laid out game by game.
+    The parent creates the buffers; workers attach to them by name through
+    spec() and write their blocks of sims directly, so no stat arrays are
+    pickled back to the parent.
+
+    Weighted results, from runs with importance-sampling tilts, also get a
+    float64 players x sims buffer per group for each sim's likelihood
+    ratio, keyed '<group>_weights'.
+    """
+
+    def __init__(self, players, stats, num_sims, spec=None, weighted=False):
+        """
+        Args:
+            players: Dict of group -> list of player label dicts (LABELS keys)
+            stats: Dict of group -> list of stat columns held in the buffer
+            num_sims: Number of sims per player
+            spec: Buffer names from spec() when attaching from a worker
+            weighted: Whether to hold per-sim weights alongside the stats
+        """
+        self.players = players
+        self.stats = stats
+        self.num_sims = num_sims
+        self.weighted = weighted
+        self.memory = {}
+        self.arrays = {}
+        buffers = [(group, (len(stats[group]), len(players[group]), num_sims), np.int16)
+                   for group in ('hitters', 'pitchers')]
+        if weighted:
+            buffers += [(f"{group}_weights", (len(players[group]), num_sims), np.float64)
+                        for group in ('hitters', 'pitchers')]
+        for name, shape, dtype in buffers:
+            if spec is None:
+                size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                memory = shared_memory.SharedMemory(create=True, size=size)
+            else:
+                memory = shared_memory.SharedMemory(name=spec[name])
+            self.memory[name] = memory
+            self.arrays[name] = np.ndarray(shape, dtype=dtype, buffer=memory.buf).view(_SharedArray)
+            self.arrays[name].memory = memory
+            if spec is None:
+                self.arrays[name].fill(0)
+        self.columns = {group: {stat: i for i, stat in enumerate(stats[group])} for group in stats}
+
+    def spec(self):
+        return {name: memory.name for name, memory in self.memory.items()}
+
+    def write(self, group, rows, stats, start, stop, weights=None):
+        """Copy a block's players x sims stat arrays, and weights if
+        weighted, into sims [start, stop) of rows."""
+        array = self.arrays[group]
+        for stat, col in self.columns[group].items():
+            array[col, rows, start:stop] = stats[stat]
+        if weights is not None:
+            self.arrays[f"{group}_weights"][rows, start:stop] = weights
+
+    def read(self, group, rows):
+        """Copy of the stats x players x sims slab of rows, e.g. to cache one game."""
+        return np.array(self.arrays[group][:, rows])
+
+    def fill(self, group, rows, values):
+        """Write a stats x players x sims slab from read() back into rows."""
+        self.arrays[group][:, rows] = values
+
+    def results(self):
+        """Columnar result groups whose stat arrays are views of the shared buffers."""
+        results = {}
+        for group in ('hitters', 'pitchers'):
+            block = {label: [player[label] for player in self.players[group]] for label in LABELS}
+            block['stats'] = {stat: np.asarray(self.arrays[group][col]) for stat, col in self.columns[group].items()}
+            if self.weighted:
+                # asarray of the whole array would drop the _SharedArray base
+                # that keeps the block mapped; a slice of it keeps it
+                block['weights'] = np.asarray(self.arrays[f"{group}_weights"][:])
+            results[group] = block
+        return results
+
+    def unlink(self):
+        """Remove the buffers' names; mappings stay valid while arrays use them."""
+        for memory in self.memory.values():
+            memory.unlink()
+
+
+def add_rate_stats(pitchers):
+    """Add the float pIP and pERA columns to a pitcher group from its counts."""
+    stats = pitchers['stats']
+    outs = stats['pOuts']
+    stats['pIP'] = np.round(outs / 3, 2)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stats['pERA'] = np.where(outs > 0, np.round((9 / (outs / 3)) * stats['pR'], 2), np.inf)
+    return pitchers
+
+
+def add_derived_stats(results):
+    """Add the stats computed from a game's counts once it ends.
+
+    Covers hits, total bases and fantasy points for hitters, and quality
+    starts, wins, hits allowed, fantasy points and the rate stats for
+    starters, matching MLB_Game_Simulator.simulate_game.
+    """
+    stats = results['hitters']['stats']
+    stats['bH'] = stats['b1B'] + stats['b2B'] + stats['b3B'] + stats['bHR']
+    stats['bHRRBI'] = stats['bH'] + stats['bR'] + stats['bRBI']
+    stats['bTB'] = stats['b1B'] + 2 * stats['b2B'] + 3 * stats['b3B'] + 4 * stats['bHR']
+    stats['bUD'] = (stats['b1B'] * 3 + stats['b2B'] * 6 + stats['b3B'] * 8 + stats['bHR'] * 10
+                    + stats['bR'] * 2 + stats['bRBI'] * 2 + stats['bBB'] * 3 + stats['bHBP'] * 3
+                    + stats['bSB'] * 4)
+
+    pitchers = results['pitchers']
+    stats = pitchers['stats']
+    outs = stats['pOuts']
+    add_rate_stats(pitchers)
+    stats['pQS'] = ((outs >= 18) & (stats['pR'] <= 3)).astype(np.int16)
+    stats['pW'] = stats['In_Line_For_Win'].copy()
+    stats['pH'] = stats['p1B'] + stats['p2B'] + stats['p3B'] + stats['pHR']
+    stats['pUD'] = stats['pW'] * 5 + stats['pQS'] * 5 + stats['pK'] * 3 + outs - stats['pR'] * 3
+    return results
+
+
+def columnar_to_rows(results, sim_offset=0):
+    """Expand columnar results into the per-player, per-sim dicts
+    produced by MLB_Game_Simulator.simulate_game.
+
+    Args:
+        results: Columnar results, e.g. from VectorizedGameEngine.run
+        sim_offset: Sim number assigned to the first simulated game
+
+    Returns:
+        Tuple of (hitter_results, pitcher_results) lists
+    """
+    rows = []
+    for group in ('hitters', 'pitchers'):
+        block = results[group]
+        columns = {stat: values.tolist() for stat, values in block['stats'].items()}
+        group_rows = []
+        for i, player in enumerate(block['player']):
+            labels = {label: block[label][i] for label in LABELS}
+            player_columns = [(stat, values[i]) for stat, values in columns.items()]
+            num_sims = len(player_columns[0][1])
+            for sim in range(num_sims):
+                row = {stat: values[sim] for stat, values in player_columns}
+                row.update(labels)
+                row['sim_no'] = sim_offset + sim
+                group_rows.append(row)
+        rows.append(group_rows)
+    return rows[0], rows[1]
+
+
+def columnar_to_player_sims(block):
+    """Expand one columnar result group into per-sim stat dicts for each player.
+
+    Args:
+        block: 'hitters' or 'pitchers' group of columnar results
+
+    Returns:
+        Dict mapping player name to a list of stat dicts ordered by sim
+    """
+    columns = {stat: values.tolist() for stat, values in block['stats'].items()}
+    player_sims = {}
+    for i, player in enumerate(block['player']):
+        player_columns = [values[i] for values in columns.values()]
+        player_sims[player] = [dict(zip(columns, sim_values)) for sim_values in zip(*player_columns)]
+    return player_sims
+
+
+def player_sims_to_columnar(player_sims):
+    """Collect per-sim stat dicts back into a columnar result group.
+
+    The inverse of columnar_to_player_sims, also taking rows of the form
+    MLB_Game_Simulator.simulate_game produces.
+
+    Args:
+        player_sims: Dict mapping player name to a list of stat dicts
+            ordered by sim or a dict of them by sim number, or a list of
+            rows carrying 'player' and 'sim_no'
+
+    Returns:
+        Group with 'player' and players x sims 'stats' arrays
+    """
+    if isinstance(player_sims, list):
+        grouped = {}
+        for row in player_sims:
+            grouped.setdefault(row['player'], {})[row['sim_no']] = row
+        player_sims = grouped
+    players = list(player_sims)
+    ordered = [sims if isinstance(sims, list) else [sims[i] for i in sorted(sims)]
+               for sims in player_sims.values()]
+    stats = [stat for stat, value in ordered[0][0].items()
+             if stat not in LABELS and stat != 'sim_no' and isinstance(value, (int, float, np.number))]
+    return {'player': players,
+            'stats': {stat: np.array([[sim[stat] for sim in sims] for sims in ordered]) for stat in stats}}
+
+
+def concat_results(parts):
+    """Join columnar results of the same players run in pieces along the sims axis."""
+    results = {}
+    for group in ('hitters', 'pitchers'):
+        block = {label: parts[0][group][label] for label in LABELS}
+        block['stats'] = {stat: np.concatenate([part[group]['stats'][stat] for part in parts], axis=1)
+                          for stat in parts[0][group]['stats']}
+        if 'weights' in parts[0][group]:
+            block['weights'] = np.concatenate([part[group]['weights'] for part in parts], axis=1)
+        results[group] = block
+    return results
+
+
+def player_key(name):
+    """Player name as it appears in prop names and the Redis keys.
+
+    Hyphens become '#' as when projections are loaded, so scraped names
+    match the simulator's.
+    """
+    return str(name).replace('-', '#').replace(' ', '_').lower()
+
+
+def prop_hits(results, lines=None):
+    """Yield the per-sim hit indicators of the props a run is judged on.
+
+    Without lines every "stat >= k" threshold of the PROP_STATS columns
+    counts. p(1-p) peaks at the threshold where the hit rate crosses one
+    half, so only the thresholds either side of each player's median are
+    yielded. With lines only the listed thresholds are.
+
+    Args:
+        results: Columnar results
+        lines: Optional dict of (player_key, stat_name) -> set of thresholds,
+            e.g. the ceiled stat_value of each scraped Underdog line
+
+    Yields:
+        Tuple of a boolean array over the sims of whether the prop hit and
+        the player's per-sim weights, None for unweighted results
+    """
+    for group, prop_stats in PROP_STATS.items():
+        block = results[group]
+        num_sims = next(iter(block['stats'].values())).shape[1]
+        if not num_sims:
+            continue
+        keys = [player_key(player) for player in block['player']]
+        weights = block.get('weights')
+        for stat_name, stat in prop_stats.items():
+            values = block['stats'][stat]
+            if lines is None:
+                median = np.floor(np.median(values, axis=1)).astype(np.int64)
+                thresholds = [(i, k) for i in range(len(keys)) for k in {max(median[i], 1), median[i] + 1}]
+            else:
+                thresholds = [(i, k) for i, key in enumerate(keys) for k in lines.get((key, stat_name), ())]
+            for i, k in thresholds:
+                yield values[i] >= k, None if weights is None else weights[i]
+
+
+def hit_rate_error(hits, pairs=False, weights=None):
+    """Hit rate of a prop and its standard error.
+
+    Independent sims give sqrt(p(1-p)/n). Antithetic sims are only
+    independent pair to pair, so with pairs the error comes from the spread
+    of the pair means; an odd last sim is left out of it. Weighted sims
+    estimate the rate as the mean of weight * hit, with the standard error
+    of that mean.
+
+    Returns:
+        Tuple of (hit rate, standard error)
+    """
+    num_sims = len(hits)
+    if weights is not None:
+        weighted = np.where(hits, weights, 0.0)
+        error = weighted.std(ddof=1) / np.sqrt(num_sims) if num_sims > 1 else 0.0
+        return float(weighted.mean()), float(error)
+    p = np.count_nonzero(hits) / num_sims
+    if pairs and num_sims >= 4:
+        pair_means = hits[:num_sims - num_sims % 2].reshape(-1, 2).mean(axis=1)
+        return p, float(np.sqrt(pair_means.var(ddof=1) / len(pair_means)))
+    return p, float(np.sqrt(p * (1 - p) / num_sims))
+
+
+def worst_standard_error(results, lines=None, pairs=False):
+    """Largest standard error of any prop's hit rate, over the props of prop_hits.
+
+    Args:
+        results: Columnar results
+        lines: Optional thresholds to judge, as for prop_hits
+        pairs: Whether sims were played in antithetic pairs
+
+    Returns:
+        Tuple of (worst standard error, number of props covered)
+    """
+    worst = 0.0
+    covered = 0
+    for hits, weights in prop_hits(results, lines):
+        worst = max(worst, hit_rate_error(hits, pairs, weights)[1])
+        covered += 1
+    return float(worst), covered
+
+
+def effective_sims(results, lines=None, pairs=False):
+    """Number of independent sims the run's prop hit rates are worth.
+
+    Pooled over the props of prop_hits as sum p(1-p) / sum SE^2, so it is
+    the sim count for independent sims and more than it when variance
+    reduction shrank the errors. Probability code can use it in place of
+    the sim count in sqrt(p(1-p)/n).
+
+    Returns:
+        Effective sample size, or None with no props to judge
+    """
+    spread = 0.0
+    variance = 0.0
+    num_sims = None
+    for hits, weights in prop_hits(results, lines):
+        p, error = hit_rate_error(hits, pairs, weights)
+        spread += p * (1 - p)
+        variance += error ** 2
+        num_sims = len(hits)
+    if num_sims is None:
+        return None
+    if not variance:
+        return float(num_sims)
+    return spread / variance
+
+
+def slate_weights(results):
+    """Per-sim weights of the whole slate, the product of every game's.
+
+    Sim i of every game is combined into slate sim i, so the product
+    reweights any parlay, whichever games its legs come from.
+
+    Returns:
+        Array of num_sims weights, or None for unweighted results
+    """
+    weights = None
+    games = set()
+    for block in results.values():
+        if 'weights' not in block:
+            return None
+        for i, (team, opp) in enumerate(zip(block['team'], block['opp'])):
+            game = frozenset((team, opp))
+            if game not in games:
+                games.add(game)
+                weights = block['weights'][i] if weights is None else weights * block['weights'][i]
+    return weights
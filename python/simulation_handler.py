@@ -1,12 +1,23 @@
 import os
 import pandas as pd
 import logging
+import multiprocessing as mp
+import threading
 import time
 import sys
 import json
-from prop_bitmap import PropBitmap
+from prop_bitmap import (GZIP_LEVEL, STORAGE_MODES, PropBitmap, plane_levels, stat_levels, threshold_bitmaps,
+                         threshold_counts)
+from prop_catalog import load_catalog
 from redis_helper import RedisHelper
+from sim_results import (concat_results, effective_sims, player_key, player_sims_to_columnar, slate_weights,
+                         worst_standard_error)
+from slate_cache import SlateCache
+from game_cache import GameResultCache
+from live_state import load_live_states
 import gzip
+import math
+import numpy as np
 
 # Try different import strategies for MLB_Game_Simulator
 try:
@@ -19,9 +30,65 @@ except ImportError:
     except ImportError:
         # Try to import with python prefix
         from python.mlb_slate_simulator import MLB_Game_Simulator
+from markov_chain import MarkovChainCalculator
+
+
+def _preliminary_player_stats(sim, sender):
+    """Send the Markov chain's hitter props of a simulator, or the error computing them."""
+    try:
+        sender.send(MarkovChainCalculator(sim).player_stats())
+    except Exception as e:
+        sender.send(e)
+    finally:
+        sender.close()
+
 
 class SimulationHandler:
-    def __init__(self, hitter_file, pitcher_file, num_sims):
+    # Sims in the first round of a precision-target run, before the
+    # standard error is first measured
+    MIN_PRECISION_SIMS = 1000
+    # Seconds of time_budget left for process_results per player per sim,
+    # about twice what it measures on a local slate to cover Redis round
+    # trips, with a floor for small runs and a cap so sims still get time
+    PUBLISH_SECONDS_PER_PLAYER_SIM = 5e-6
+    MIN_PUBLISH_SECONDS = 5.0
+    MAX_PUBLISH_SHARE = 0.5
+
+    def __init__(self, hitter_file, pitcher_file, num_sims, engine=None, seed=None, target_se=None, props_file=None,
+                 time_budget=None, extend=False, live_states_file=None, antithetic=False, common_random_numbers=False,
+                 tilts=(), storage='bitmaps', outcome_counts=False):
+        """
+        Args:
+            hitter_file: Path to hitter projections
+            pitcher_file: Path to pitcher projections
+            num_sims: Sims per game, or the most to run when target_se is set
+            engine: Simulation engine, 'scalar' or 'vectorized'; when None,
+                vectorized, or scalar for an antithetic run
+            seed: Seed for the run, fresh entropy when None
+            target_se: Stop adding sims once every prop's standard error is at
+                or below this
+            props_file: Scraped underdog_props.json; with target_se, only its
+                lines need to reach the target
+            time_budget: Wall-clock seconds for the whole run; simulating
+                stops early to leave time to publish the sims completed
+            extend: Grow the run published in Redis to num_sims sims instead
+                of starting over; it must be of the same slate and engine
+            live_states_file: JSON of LiveGameStates keyed by "AWAY@HOME";
+                those games are only simulated from their state to the end
+            antithetic: Play sims in antithetic pairs (scalar engine only)
+            common_random_numbers: Give every sim its own seed stream, so
+                reruns of a changed slate with the same seed are compared
+                sim for sim
+            tilts: importance.Tilts of hitters to importance-sample, so the
+                tail props of their stat lines are published from weighted
+                sims at far better precision
+            storage: How props are published, one of prop_bitmap.STORAGE_MODES:
+                'bitmaps' for a bitmap per catalog threshold, 'levels' for a
+                uint8 level array per player stat that any line is read from,
+                'planes' for the bit planes of those level arrays
+            outcome_counts: Publish each hitter's per-sim PA outcome counts,
+                so reweight.Reweighter can reprice the run
+        """
         # Convert to absolute paths and validate
         self.hitter_file = os.path.abspath(hitter_file)
         self.pitcher_file = os.path.abspath(pitcher_file)
@@ -30,8 +97,48 @@ class SimulationHandler:
             raise FileNotFoundError(f"Hitter file not found: {self.hitter_file}")
         if not os.path.exists(self.pitcher_file):
             raise FileNotFoundError(f"Pitcher file not found: {self.pitcher_file}")
+        if extend and target_se is not None:
+            raise ValueError('A precision target cannot be combined with extending a run')
+        if extend and live_states_file is not None:
+            raise ValueError('Live game states cannot be combined with extending a run')
+        if extend and tilts:
+            raise ValueError('Tilted PA outcomes cannot be combined with extending a run')
+        if storage not in STORAGE_MODES:
+            raise ValueError(f"Unknown storage {storage}; expected one of {', '.join(STORAGE_MODES)}")
             
         self.num_sims = num_sims
+        self.engine = engine or ('scalar' if antithetic else 'vectorized')
+        self.seed = seed
+        self.target_se = target_se
+        self.props_file = props_file
+        self.time_budget = time_budget
+        self.extend = extend
+        self.live_states_file = live_states_file
+        self.live_states = {}
+        self.antithetic = antithetic
+        self.common_random_numbers = common_random_numbers
+        self.tilts = tuple(tilts)
+        self.storage = storage
+        self.outcome_counts = outcome_counts
+        # Process computing the preliminary stats, and whether they may still be published
+        self.preliminary_process = None
+        self.preliminary_lock = threading.Lock()
+        self.preliminary_open = False
+        # Sims of the published run an extension keeps, and how many it had
+        self.kept_sims = 0
+        self.prior_sims = 0
+        # Sims actually run, the worst prop standard error they reached, the
+        # number of independent sims the props are worth and whether the time
+        # budget cut the run short
+        self.achieved_sims = None
+        self.worst_se = None
+        self.effective_sims = None
+        self.truncated = False
+        self.game_cache = None
+        self.slate_key = None
+        # player_key -> each hitter's (SP/RP, outcome) PA probabilities, published
+        # with the outcome counts so the sims can be reweighted later
+        self.outcome_probs = {}
         self.redis = RedisHelper.get_instance()
         
         # Set up logging with a less verbose default level
@@ -47,56 +154,309 @@ class SimulationHandler:
     def run_simulation(self):
         self.logger.info('Starting simulation')
         start_time = time.time()
+        budget_start = time.monotonic()
+        deadline = None
         try:
             # Use the uploaded files 
             hitters_path = self.hitter_file
             pitchers_path = self.pitcher_file
 
+            # Re-uploads of the same files reuse the slate compiled last time
+            slate_cache = SlateCache(redis=self.redis)
+            self.slate_key = slate_cache.key(hitters_path, pitchers_path)
+            slate = slate_cache.load(hitters_path, pitchers_path)
+            if self.extend:
+                self.load_prior_run()
+            if self.live_states_file:
+                self.live_states = load_live_states(self.live_states_file)
+            # With a fixed seed, games whose inputs did not change since the
+            # last run reuse its sims; fresh entropy never repeats, so no cache
+            self.game_cache = GameResultCache() if self.seed is not None else None
+
             # Run simulation
-            sim = MLB_Game_Simulator(self.num_sims, hitters_path, pitchers_path)
-            batter_sims, pitcher_sims = sim.run_simulation()
+            sim = MLB_Game_Simulator(self.num_sims, hitters_path, pitchers_path, engine=self.engine, seed=self.seed,
+                                     slate=slate, antithetic=self.antithetic,
+                                     common_random_numbers=self.common_random_numbers, tilts=self.tilts,
+                                     outcome_counts=self.outcome_counts)
+            # Keep the seed that was actually used so the run can be reproduced
+            self.seed = sim.seed
+            if self.time_budget is not None:
+                deadline = budget_start + self.time_budget - self.publish_reserve(len(sim.players))
+            self.outcome_probs = {player_key(sim.players[index]['Name']): np.diff(sim.pa_cdf[index], prepend=0.0, axis=1)
+                                  for index in sim.slate.hitters}
+            if not (self.extend or self.live_states or self.tilts):
+                self.start_preliminary_stats(sim)
+            if self.extend:
+                results = self.simulate_extension(sim, deadline)
+            elif self.target_se is None:
+                results = sim.simulate_games(sim.games, deadline=deadline, cache=self.game_cache,
+                                             states=self.live_states)
+                self.achieved_sims = next(iter(results['hitters']['stats'].values())).shape[1]
+                self.worst_se, _ = worst_standard_error(results, pairs=self.antithetic)
+                self.effective_sims = effective_sims(results, pairs=self.antithetic)
+            else:
+                results = self.simulate_to_precision(sim, deadline)
+            batter_sims, pitcher_sims = results['hitters'], results['pitchers']
+
+            if not self.achieved_sims:
+                raise RuntimeError(f'No sims completed within the {self.time_budget}s time budget')
+            if self.achieved_sims < self.num_sims and self.time_budget is not None and time.monotonic() >= deadline:
+                self.truncated = True
+                self.logger.warning(f'Time budget reached; publishing {self.achieved_sims} of {self.num_sims} sims')
 
             end_time = time.time()
             self.logger.debug(f'Simulation completed in {end_time - start_time:.2f} seconds')  # Changed to debug
             return batter_sims, pitcher_sims
         except Exception as e:
             self.logger.error(f'Error in run_simulation: {str(e)}')
+            self.close_preliminary_stats()
             raise
 
+    def publish_reserve(self, num_players):
+        """Seconds of time_budget to leave for publishing num_sims sims of num_players players."""
+        reserve = max(self.MIN_PUBLISH_SECONDS, self.PUBLISH_SECONDS_PER_PLAYER_SIM * num_players * self.num_sims)
+        return min(reserve, self.time_budget * self.MAX_PUBLISH_SHARE)
+
+    def start_preliminary_stats(self, sim):
+        """Compute the Markov chain's hitter props in another process and publish them while the sims run.
+
+        Fresh runs only: extended runs and live states already have a
+        published run to show. The chain takes about half a second a game,
+        so it runs beside the simulation pool rather than out of its time
+        budget. Best effort, since the sims' props replace these when
+        process_results publishes them.
+        """
+        receiver, sender = mp.Pipe(duplex=False)
+        self.preliminary_process = mp.Process(target=_preliminary_player_stats, args=(sim, sender), daemon=True)
+        self.preliminary_process.start()
+        sender.close()
+        self.preliminary_open = True
+        threading.Thread(target=self.publish_preliminary_stats, args=(receiver,), daemon=True).start()
+
+    def publish_preliminary_stats(self, receiver):
+        """Publish the preliminary stats received from the process, unless the run is over."""
+        try:
+            player_stats = receiver.recv()
+            if isinstance(player_stats, Exception):
+                raise player_stats
+            player_stats['slate'] = self.slate_key
+            with self.preliminary_lock:
+                if self.preliminary_open:
+                    self.redis.set('pickem_preliminary_player_stats', json.dumps(player_stats))
+        except EOFError:
+            self.logger.debug('Preliminary stats stopped before they were computed')
+        except Exception as e:
+            self.logger.warning(f'Could not publish preliminary stats: {str(e)}')
+        finally:
+            receiver.close()
+
+    def close_preliminary_stats(self):
+        """Stop the preliminary stats and take any published ones down.
+
+        Called once the run's own stats are published, or when it fails,
+        so props.php never shows them as current past the run.
+        """
+        with self.preliminary_lock:
+            self.preliminary_open = False
+            if self.preliminary_process is not None and self.preliminary_process.is_alive():
+                self.preliminary_process.terminate()
+            try:
+                self.redis.delete('pickem_preliminary_player_stats')
+            except Exception as e:
+                self.logger.warning(f'Could not remove preliminary stats: {str(e)}')
+
+    def load_prior_run(self):
+        """Take the seed and size of the published run this one extends."""
+        metadata = self.redis.get('pickem_simulation_metadata')
+        if not metadata:
+            raise RuntimeError('No published simulation to extend')
+        if metadata.get('slate') != self.slate_key or metadata.get('engine') != self.engine:
+            raise RuntimeError('The published simulation used other projections or engine; run it again instead')
+        if (metadata.get('antithetic', False) != self.antithetic
+                or metadata.get('common_random_numbers', False) != self.common_random_numbers):
+            raise RuntimeError('The published simulation used other variance reduction; run it again instead')
+        if metadata.get('storage', 'bitmaps') != self.storage:
+            raise RuntimeError(f"The published simulation is stored as {metadata.get('storage', 'bitmaps')}; "
+                               f"run it again instead")
+        if self.seed is not None and self.seed != metadata['seed']:
+            raise ValueError(f"The published simulation used seed {metadata['seed']}, not {self.seed}")
+        if self.num_sims <= metadata['num_sims']:
+            raise ValueError(f"The published simulation already has {metadata['num_sims']} sims")
+        self.seed = metadata['seed']
+        self.prior_sims = metadata['num_sims']
+
+    def simulate_extension(self, sim, deadline=None):
+        """Run the sims that grow the published run to num_sims.
+
+        Sims continue the games' seed streams from the start of the block the
+        published run ended in. A partly run block is run again whole, since
+        the vectorized engine's sims depend on the block size, so the
+        extended run matches a fresh run of its size with the same seed.
+        Only the new sims are simulated; process_results prepends the kept
+        ones from the published bitmaps.
+
+        Returns:
+            Columnar results for the sims after kept_sims
+        """
+        self.kept_sims = self.prior_sims - self.prior_sims % sim.sim_block_size
+        results = sim.simulate_games(sim.games, num_sims=self.num_sims - self.kept_sims, first_sim=self.kept_sims,
+                                     deadline=deadline, cache=self.game_cache)
+        added = next(iter(results['hitters']['stats'].values())).shape[1]
+        self.achieved_sims = self.kept_sims + added
+        if self.achieved_sims <= self.prior_sims:
+            raise RuntimeError(f'No sims were added within the {self.time_budget}s time budget')
+        # Rates measured on the new sims, at the error of the combined count
+        worst_se, _ = worst_standard_error(results, pairs=self.antithetic)
+        self.worst_se = worst_se * math.sqrt(added / self.achieved_sims)
+        self.effective_sims = effective_sims(results, pairs=self.antithetic) * self.achieved_sims / added
+        self.logger.info(f'Extending {self.prior_sims} published sims to {self.achieved_sims}')
+        return results
+
+    def load_prior_props(self, player_name):
+        """Outcomes of the kept sims of a player's published props, by prop key."""
+        if not self.kept_sims:
+            return {}
+        bitmap = self.redis.get_player_bitmap(player_name)
+        if not bitmap:
+            raise RuntimeError(f'No published sims for {player_name} to extend')
+        prior_props = {}
+        for prop, data in bitmap.items():
+            bits = np.unpackbits(np.frombuffer(gzip.decompress(bytes(data)), dtype=np.uint8), bitorder='little')
+            prior_props[prop] = bits[:self.kept_sims].astype(bool)
+        return prior_props
+
+    def load_prior_levels(self, player_name):
+        """Stat values of the kept sims of a player's published level arrays or planes, by stat."""
+        if not self.kept_sims:
+            return {}
+        published = self.redis.get(f'pickem_player_{self.storage}_{player_name}')
+        if not published:
+            raise RuntimeError(f'No published sims for {player_name} to extend')
+        prior_values = {}
+        for stat, data in published['stats'].items():
+            if self.storage == 'planes':
+                planes = np.frombuffer(gzip.decompress(bytes(data['planes'])), dtype=np.uint8)
+                planes = planes.reshape(data['num_planes'], (published['num_sims'] + 7) // 8)
+                levels = plane_levels(planes, published['num_sims'])
+            else:
+                levels = np.frombuffer(gzip.decompress(bytes(data['levels'])), dtype=np.uint8)
+            prior_values[stat] = levels[:self.kept_sims].astype(np.int64) + data['offset']
+        return prior_values
+
+    def prior_hits(self, prior_props, names, keys):
+        """players x props x kept sims outcomes of published props, or None for a fresh run.
+
+        Args:
+            prior_props: Player name -> load_prior_props of the player
+            names: Player names of the rows
+            keys: Prop keys of the columns, e.g. 'hits_1_plus'
+        """
+        if not self.kept_sims:
+            return None
+        hits = np.empty((len(names), len(keys), self.kept_sims), dtype=bool)
+        for i, player_name in enumerate(names):
+            for j, key in enumerate(keys):
+                if key not in prior_props[player_name]:
+                    raise RuntimeError(f'No published sims for {player_name}_{key} to extend')
+                hits[i, j] = prior_props[player_name][key]
+        return hits
+
+    def simulate_to_precision(self, sim, deadline=None):
+        """Run sims in rounds until every prop's standard error reaches target_se.
+
+        Each round is sized from the last measured standard error, which
+        shrinks with 1/sqrt(n), and is capped at num_sims in total. Rounds
+        continue the games' seed streams, so a run that stops at n sims
+        matches a fixed run of n sims with the same seed. Reaching the
+        deadline ends the run with the sims completed so far.
+
+        Returns:
+            Columnar results for all sims run
+        """
+        lines = self.load_underdog_lines() if self.props_file else None
+        block = sim.sim_block_size
+        parts = []
+        done = 0
+        num_sims = min(self.num_sims, -(-self.MIN_PRECISION_SIMS // block) * block)
+        while True:
+            part = sim.simulate_games(sim.games, num_sims=num_sims, first_sim=done, deadline=deadline,
+                                      cache=self.game_cache, states=self.live_states)
+            added = next(iter(part['hitters']['stats'].values())).shape[1]
+            if done and not added:
+                break
+            parts.append(part)
+            done += added
+            results = concat_results(parts)
+            parts = [results]
+
+            self.worst_se, covered = worst_standard_error(results, lines, pairs=self.antithetic)
+            if lines is not None and not covered:
+                self.logger.warning('No scraped Underdog lines match the slate; targeting every prop instead')
+                lines = None
+                self.worst_se, covered = worst_standard_error(results, pairs=self.antithetic)
+            self.logger.info(f'{done} sims: worst standard error {self.worst_se:.5f} over {covered} props')
+
+            if self.worst_se <= self.target_se or done >= self.num_sims:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            needed = math.ceil(done * (self.worst_se / self.target_se) ** 2)
+            num_sims = min(self.num_sims - done, max(block, -(-(needed - done) // block) * block))
+
+        if self.worst_se > self.target_se and done >= self.num_sims:
+            self.logger.warning(f'Stopped at the {self.num_sims} sim cap with worst standard error {self.worst_se:.5f}')
+        self.achieved_sims = done
+        self.effective_sims = effective_sims(results, lines, pairs=self.antithetic)
+        return results
+
+    def load_underdog_lines(self):
+        """Thresholds of the scraped Underdog lines, keyed like worst_standard_error expects.
+
+        A line of stat_value x is decided by the stat reaching ceil(x), the
+        threshold props.php looks up; first_* props have the single threshold 1.
+        """
+        with open(self.props_file) as f:
+            props = json.load(f)
+        lines = {}
+        for prop in props:
+            if prop.get('selection_header') is None or prop.get('stat_name') is None:
+                continue
+            stat_name = prop['stat_name'].lower()
+            if 'first' in stat_name:
+                threshold = 1
+            elif prop.get('stat_value') is not None:
+                threshold = math.ceil(float(prop['stat_value']))
+            else:
+                continue
+            lines.setdefault((player_key(prop['selection_header']), stat_name), set()).add(threshold)
+        return lines
+
     def process_results(self, batter_sims, pitcher_sims):
         self.logger.debug('Processing results')
         start_time = time.time()
         try:
-            # Convert lists to dictionaries if needed
-            if isinstance(batter_sims, list):
-                # Group sims by player
-                batter_dict = {}
-                for sim in batter_sims:
-                    player = sim['player']
-                    sim_no = sim['sim_no']
-                    if player not in batter_dict:
-                        batter_dict[player] = {}
-                    batter_dict[player][sim_no] = sim
-                batter_sims = batter_dict
-                
-            if isinstance(pitcher_sims, list):
-                # Group sims by player
-                pitcher_dict = {}
-                for sim in pitcher_sims:
-                    player = sim['player']
-                    sim_no = sim['sim_no']
-                    if player not in pitcher_dict:
-                        pitcher_dict[player] = {}
-                    pitcher_dict[player][sim_no] = sim
-                pitcher_sims = pitcher_dict
+            # Hitters' PA outcome counts are published on their own, not as props
+            batter_outcomes = {}
+            if self.outcome_counts and isinstance(batter_sims, dict) and 'stats' in batter_sims:
+                batter_outcomes, batter_sims = self.split_outcome_counts(batter_sims)
+
+            # Collect per-sim stat dicts into players x sims stat matrices
+            if not (isinstance(batter_sims, dict) and 'stats' in batter_sims):
+                batter_sims = player_sims_to_columnar(batter_sims)
+            if not (isinstance(pitcher_sims, dict) and 'stats' in pitcher_sims):
+                pitcher_sims = player_sims_to_columnar(pitcher_sims)
+
+            # Per-sim weights of an importance-sampled run: each player's for
+            # their own props, and the whole slate's for parlays of any legs
+            sim_weights = None
+            if 'weights' in batter_sims:
+                sim_weights = slate_weights({'hitters': batter_sims, 'pitchers': pitcher_sims})
 
             # Initialize bitmap storage with the number of simulations
-            first_player_sims = next(iter(batter_sims.values()))
-            if isinstance(first_player_sims, dict):
-                num_sims = len(first_player_sims)
-            else:
-                num_sims = len(first_player_sims)
-            bitmap_storage = PropBitmap(num_sims)
+            num_sims = next(iter(batter_sims['stats'].values())).shape[1]
+            # An extension's bitmaps also hold the published sims it keeps
+            total_sims = self.kept_sims + num_sims
+            bitmap_storage = PropBitmap(total_sims, sim_weights)
             
             # For storing preprocessed player stats
             player_stats = {
@@ -106,693 +466,63 @@ class SimulationHandler:
             
             # Track all players for easy discovery
             all_players = []
-            
-            # Process batter simulations
-            for player_name, sims in batter_sims.items():
-                # Create ordered list of sim results
-                if isinstance(sims, dict):
-                    ordered_sims = [sims[i] for i in range(num_sims)]
-                else:
-                    ordered_sims = sims
-                
-                # Clean player name
-                player_name = str(player_name).replace(' ', '_').lower()
-                all_players.append(player_name)
-                
-                # Initialize player stats structure
-                player_stats['batters'][player_name] = {
-                    'stats': {
-                        'hits': {},
-                        'singles': {},
-                        'doubles': {},
-                        'home_runs': {},
-                        'rbis': {},
-                        'runs': {},
-                        'total_bases': {},
-                        'batter_strikeouts': {},
-                        'stolen_bases': {},
-                        'hits_runs_rbis': {},
-                        'walks': {},
-                        'fantasy_points': {},
-                        'period_1_hits': {},
-                        'period_1_runs': {},
-                        'period_1_hits_runs_rbis': {},
-                        'period_1_2_3_hits_runs_rbis': {},
-                        'first_hit': {'1': 0},
-                        'first_rbi': {'1': 0},
-                        'first_run': {'1': 0},
-                        'first_home_run': {'1': 0}
-                    },
-                    'total_sims': num_sims
-                }
-                
-                # Track player's bitmap props
-                player_bitmap_props = {}
-                
-                # Hits props
-                for hits in range(1, 4):
-                    prop_name = f"{player_name}_hits_{hits}_plus"
-                    results = [sim['bH'] >= hits for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"hits_{hits}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['hits'][str(hits)] = count
-                
-                # Singles props
-                for singles in range(1, 3):
-                    prop_name = f"{player_name}_singles_{singles}_plus"
-                    results = [sim['b1B'] >= singles for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"singles_{singles}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['singles'][str(singles)] = count
-                
-                # Doubles props
-                for doubles in range(1, 3):
-                    prop_name = f"{player_name}_doubles_{doubles}_plus"
-                    results = [sim['b2B'] >= doubles for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"doubles_{doubles}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['doubles'][str(doubles)] = count
-                    
-                # Home runs props  
-                for hrs in range(1, 3):
-                    prop_name = f"{player_name}_home_runs_{hrs}_plus"
-                    results = [sim['bHR'] >= hrs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"home_runs_{hrs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['home_runs'][str(hrs)] = count
-                    
-                # RBIs props
-                for rbis in range(1, 4):
-                    prop_name = f"{player_name}_rbis_{rbis}_plus"
-                    results = [sim['bRBI'] >= rbis for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"rbis_{rbis}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['rbis'][str(rbis)] = count
-                    
-                # Runs props
-                for runs in range(1, 4):
-                    prop_name = f"{player_name}_runs_{runs}_plus"
-                    results = [sim['bR'] >= runs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"runs_{runs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['runs'][str(runs)] = count
-                    
-                # Total bases props
-                for tb in range(1, 9):
-                    prop_name = f"{player_name}_total_bases_{tb}_plus"
-                    results = [sim['bTB'] >= tb for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"total_bases_{tb}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['total_bases'][str(tb)] = count
-                    
-                # Strikeout props
-                for ks in range(1, 3):
-                    prop_name = f"{player_name}_batter_strikeouts_{ks}_plus"
-                    results = [sim['bK'] >= ks for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"batter_strikeouts_{ks}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['batter_strikeouts'][str(ks)] = count
-                    
-                # Stolen base props
-                for sbs in range(1, 3):
-                    prop_name = f"{player_name}_stolen_bases_{sbs}_plus"
-                    results = [sim['bSB'] >= sbs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"stolen_bases_{sbs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['stolen_bases'][str(sbs)] = count
-                    
-                # Hits + Runs + RBIs props
-                for val in range(1, 10):
-                    prop_name = f"{player_name}_hits_runs_rbis_{val}_plus"
-                    results = [sim['bHRRBI'] >= val for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"hits_runs_rbis_{val}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['hits_runs_rbis'][str(val)] = count
-                    
-                # Walks props
-                for walks in range(1, 3):
-                    prop_name = f"{player_name}_walks_{walks}_plus"
-                    results = [sim['bBB'] >= walks for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"walks_{walks}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['walks'][str(walks)] = count
-                    
-                # Fantasy points props
-                for pts in range(4, 15):
-                    prop_name = f"{player_name}_fantasy_points_{pts}_plus"
-                    if pts == 4:
-                        # For the first number (4), we want <= 4
-                        results = [sim['bUD'] <= 4 for sim in ordered_sims]
-                    else:
-                        # For all other numbers, we want >= that number
-                        results = [sim['bUD'] >= pts for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"fantasy_points_{pts}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['fantasy_points'][str(pts)] = count
-                    
-                # Period 1 props
-                for p1_hits in range(1, 3):
-                    prop_name = f"{player_name}_period_1_hits_{p1_hits}_plus"
-                    results = [sim['bFirstInnH'] >= p1_hits for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_hits_{p1_hits}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['period_1_hits'][str(p1_hits)] = count
-                
-                for p1_runs in range(1, 3):
-                    prop_name = f"{player_name}_period_1_runs_{p1_runs}_plus"
-                    results = [sim['bFirstInnR'] >= p1_runs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_runs_{p1_runs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['period_1_runs'][str(p1_runs)] = count
-                
-                for p1_hits_runs_rbis in range(1, 4):
-                    prop_name = f"{player_name}_period_1_hits_runs_rbis_{p1_hits_runs_rbis}_plus"
-                    results = [sim['bFirstInnHRBI'] >= p1_hits_runs_rbis for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_hits_runs_rbis_{p1_hits_runs_rbis}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['period_1_hits_runs_rbis'][str(p1_hits_runs_rbis)] = count
-                
-                # Period 1-3 props
-                for p1_3_hits_runs_rbis in range(1, 4):
-                    prop_name = f"{player_name}_period_1_2_3_hits_runs_rbis_{p1_3_hits_runs_rbis}_plus"
-                    results = [sim['bFirst3InnHRBI'] >= p1_3_hits_runs_rbis for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_2_3_hits_runs_rbis_{p1_3_hits_runs_rbis}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['batters'][player_name]['stats']['period_1_2_3_hits_runs_rbis'][str(p1_3_hits_runs_rbis)] = count
-                
-                # First occurrence props
-                prop_name = f"{player_name}_first_hit"
-                results = [sim['bFirstHit'] == 1 for sim in ordered_sims]
-                bitmap_storage.add_prop(prop_name, results)
-                # Store compressed bitmap data for this prop
-                binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                for i, result in enumerate(results):
-                    if result:
-                        binary_data[i // 8] |= 1 << (i % 8)
-                compressed_data = gzip.compress(bytes(binary_data))
-                player_bitmap_props["first_hit"] = [b for b in compressed_data]
-                # Store preprocessed count
-                count = sum(results)
-                player_stats['batters'][player_name]['stats']['first_hit']['1'] = count
-                
-                prop_name = f"{player_name}_first_rbi"
-                results = [sim['bFirstRBI'] == 1 for sim in ordered_sims]
-                bitmap_storage.add_prop(prop_name, results)
-                # Store compressed bitmap data for this prop
-                binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                for i, result in enumerate(results):
-                    if result:
-                        binary_data[i // 8] |= 1 << (i % 8)
-                compressed_data = gzip.compress(bytes(binary_data))
-                player_bitmap_props["first_rbi"] = [b for b in compressed_data]
-                # Store preprocessed count
-                count = sum(results)
-                player_stats['batters'][player_name]['stats']['first_rbi']['1'] = count
-                
-                prop_name = f"{player_name}_first_run"
-                results = [sim['bFirstRun'] == 1 for sim in ordered_sims]
-                bitmap_storage.add_prop(prop_name, results)
-                # Store compressed bitmap data for this prop
-                binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                for i, result in enumerate(results):
-                    if result:
-                        binary_data[i // 8] |= 1 << (i % 8)
-                compressed_data = gzip.compress(bytes(binary_data))
-                player_bitmap_props["first_run"] = [b for b in compressed_data]
-                # Store preprocessed count
-                count = sum(results)
-                player_stats['batters'][player_name]['stats']['first_run']['1'] = count
-                
-                prop_name = f"{player_name}_first_home_run"
-                results = [sim['bFirstHR'] == 1 for sim in ordered_sims]
-                bitmap_storage.add_prop(prop_name, results)
-                # Store compressed bitmap data for this prop
-                binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                for i, result in enumerate(results):
-                    if result:
-                        binary_data[i // 8] |= 1 << (i % 8)
-                compressed_data = gzip.compress(bytes(binary_data))
-                player_bitmap_props["first_home_run"] = [b for b in compressed_data]
-                # Store preprocessed count
-                count = sum(results)
-                player_stats['batters'][player_name]['stats']['first_home_run']['1'] = count
-                
-                # Store player's bitmap props
-                try:
-                    # Break down large data into smaller chunks
-                    chunk_size = 1000  # Number of props per chunk
-                    # Convert dictionary to list of items and chunk it
-                    items = list(player_bitmap_props.items())
-                    props_chunks = [dict(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
-                    
-                    for i, chunk in enumerate(props_chunks):
-                        chunk_key = f'pickem_player_bitmap_{player_name}_chunk_{i}'
-                        self.redis.set(chunk_key, json.dumps(chunk))
-                    
-                    # Store metadata about chunks
-                    chunk_metadata = {
-                        'num_chunks': len(props_chunks),
-                        'total_props': len(player_bitmap_props)
-                    }
-                    self.redis.set(f'pickem_player_bitmap_{player_name}_metadata', json.dumps(chunk_metadata))
-                except Exception as e:
-                    self.logger.error(f'Error storing player bitmap data for {player_name}: {str(e)}')
-                    raise
-            
-            # Process pitcher simulations
-            for player_name, sims in pitcher_sims.items():
-                # Create ordered list of sim results
-                if isinstance(sims, dict):
-                    ordered_sims = [sims[i] for i in range(num_sims)]
+
+            encode_start = time.process_time()
+            for group, block in (('batters', batter_sims), ('pitchers', pitcher_sims)):
+                # Clean player names
+                names = [str(player_name).replace(' ', '_').lower() for player_name in block['player']]
+                all_players.extend(names)
+                if self.storage == 'bitmaps':
+                    group_stats = self.publish_bitmaps(group, block, names, bitmap_storage)
                 else:
-                    ordered_sims = sims
-                    
-                # Clean player name
-                player_name = str(player_name).replace(' ', '_').lower()
-                all_players.append(player_name)
-                
-                # Initialize player stats structure
-                player_stats['pitchers'][player_name] = {
-                    'stats': {
-                        'strikeouts': {},
-                        'walks_allowed': {},
-                        'runs_allowed': {},
-                        'hits_allowed': {},
-                        'pitch_outs': {},
-                        'fantasy_points': {},
-                        'period_1_strikeouts': {},
-                        'period_1_total_runs_allowed': {},
-                        'period_1_hits_allowed': {},
-                        'period_1_pitch_count': {},
-                        'period_1_batters_faced': {},
-                        'period_1_2_3_total_runs_allowed': {},
-                        'period_first_strikeout': {'1': 0},
-                        'period_first_earned_run': {'1': 0}
-                    },
-                    'total_sims': num_sims
-                }
-                
-                # Track player's bitmap props
-                player_bitmap_props = {}
-                
-                # Strikeouts props
-                for ks in range(2, 11):
-                    prop_name = f"{player_name}_strikeouts_{ks}_plus"
-                    if ks == 2:
-                        results = [sim['pK'] <= 2 for sim in ordered_sims]
-                    else:
-                        results = [sim['pK'] >= ks for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"strikeouts_{ks}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['strikeouts'][str(ks)] = count
-                    
-                # Walks allowed props
-                for walks in range(1, 6):
-                    prop_name = f"{player_name}_walks_allowed_{walks}_plus"
-                    results = [sim['pBB'] >= walks for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"walks_allowed_{walks}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['walks_allowed'][str(walks)] = count
-                    
-                # Runs allowed props
-                for runs in range(1, 8):
-                    prop_name = f"{player_name}_runs_allowed_{runs}_plus"
-                    results = [sim['pR'] >= runs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"runs_allowed_{runs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['runs_allowed'][str(runs)] = count
-                    
-                # Hits allowed props
-                for hits in range(3, 10):
-                    prop_name = f"{player_name}_hits_allowed_{hits}_plus"
-                    if hits == 3:
-                        results = [sim['pH'] <= 3 for sim in ordered_sims]
-                    else:
-                        results = [sim['pH'] >= hits for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"hits_allowed_{hits}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['hits_allowed'][str(hits)] = count
-                    
-                # Outs recorded props
-                for outs in range(12, 22):
-                    prop_name = f"{player_name}_pitch_outs_{outs}_plus"
-                    if outs == 12:
-                        # For the first number (9), we want <= 9
-                        results = [sim['pOuts'] <= 12 for sim in ordered_sims]
-                    else:
-                        # For all other numbers, we want >= that number
-                        results = [sim['pOuts'] >= outs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"pitch_outs_{outs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['pitch_outs'][str(outs)] = count
-                    
-                # Fantasy points props
-                for pts in range(18, 41):
-                    prop_name = f"{player_name}_fantasy_points_{pts}_plus"
-                    if pts == 18:
-                        # For the first number (15), we want <= 15
-                        results = [sim['pUD'] <= 18 for sim in ordered_sims]
-                    else:
-                        # For all other numbers, we want >= that number
-                        results = [sim['pUD'] >= pts for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"fantasy_points_{pts}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['fantasy_points'][str(pts)] = count
-                    
-                # Period 1 props
-                for ks in range(1, 4):
-                    prop_name = f"{player_name}_period_1_strikeouts_{ks}_plus"
-                    results = [sim['pFirstInnK'] >= ks for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_strikeouts_{ks}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['period_1_strikeouts'][str(ks)] = count
-                    
-                for runs in range(1, 3):
-                    prop_name = f"{player_name}_period_1_total_runs_allowed_{runs}_plus"
-                    results = [sim['pFirstInnR'] >= runs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_total_runs_allowed_{runs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['period_1_total_runs_allowed'][str(runs)] = count
-                    
-                for hits in range(1, 3):
-                    prop_name = f"{player_name}_period_1_hits_allowed_{hits}_plus"
-                    results = [sim['pFirstInnH'] >= hits for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_hits_allowed_{hits}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['period_1_hits_allowed'][str(hits)] = count
-                    
-                # Period 1 pitch count props
-                for pc in range(20, 21):
-                    prop_name = f"{player_name}_period_1_pitch_count_{pc}_plus"
-                    results = [sim['pFirstInnPC'] >= pc for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_pitch_count_{pc}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['period_1_pitch_count'][str(pc)] = count
-                    
-                # Period 1 batters faced props
-                for bf in range(4, 5):
-                    prop_name = f"{player_name}_period_1_batters_faced_{bf}_plus"
-                    results = [sim['pFirstInnBF'] >= bf for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_batters_faced_{bf}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['period_1_batters_faced'][str(bf)] = count
-                    
-                for runs in range(1, 5):
-                    prop_name = f"{player_name}_period_1_2_3_total_runs_allowed_{runs}_plus"
-                    results = [sim['pFirst3InnR'] >= runs for sim in ordered_sims]
-                    bitmap_storage.add_prop(prop_name, results)
-                    # Store compressed bitmap data for this prop
-                    binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                    for i, result in enumerate(results):
-                        if result:
-                            binary_data[i // 8] |= 1 << (i % 8)
-                    compressed_data = gzip.compress(bytes(binary_data))
-                    player_bitmap_props[f"period_1_2_3_total_runs_allowed_{runs}_plus"] = [b for b in compressed_data]
-                    # Store preprocessed count
-                    count = sum(results)
-                    player_stats['pitchers'][player_name]['stats']['period_1_2_3_total_runs_allowed'][str(runs)] = count
-                    
-                # First occurrence props
-                prop_name = f"{player_name}_period_first_strikeout"
-                results = [sim['pFirstK'] == 1 for sim in ordered_sims]
-                bitmap_storage.add_prop(prop_name, results)
-                # Store compressed bitmap data for this prop
-                binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                for i, result in enumerate(results):
-                    if result:
-                        binary_data[i // 8] |= 1 << (i % 8)
-                compressed_data = gzip.compress(bytes(binary_data))
-                player_bitmap_props["period_first_strikeout"] = [b for b in compressed_data]
-                # Store preprocessed count
-                count = sum(results)
-                player_stats['pitchers'][player_name]['stats']['period_first_strikeout']['1'] = count
-                
-                prop_name = f"{player_name}_period_first_earned_run"
-                results = [sim['pFirstRunAllowed'] == 1 for sim in ordered_sims]
-                bitmap_storage.add_prop(prop_name, results)
-                # Store compressed bitmap data for this prop
-                binary_data = bytearray([0] * ((len(results) + 7) // 8))
-                for i, result in enumerate(results):
-                    if result:
-                        binary_data[i // 8] |= 1 << (i % 8)
-                compressed_data = gzip.compress(bytes(binary_data))
-                player_bitmap_props["period_first_earned_run"] = [b for b in compressed_data]
-                # Store preprocessed count
-                count = sum(results)
-                player_stats['pitchers'][player_name]['stats']['period_first_earned_run']['1'] = count
-                
-                # Store player's bitmap props
-                try:
-                    # Break down large data into smaller chunks
-                    chunk_size = 1000  # Number of props per chunk
-                    # Convert dictionary to list of items and chunk it
-                    items = list(player_bitmap_props.items())
-                    props_chunks = [dict(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
-                    
-                    for i, chunk in enumerate(props_chunks):
-                        chunk_key = f'pickem_player_bitmap_{player_name}_chunk_{i}'
-                        self.redis.set(chunk_key, json.dumps(chunk))
-                    
-                    # Store metadata about chunks
-                    chunk_metadata = {
-                        'num_chunks': len(props_chunks),
-                        'total_props': len(player_bitmap_props)
-                    }
-                    self.redis.set(f'pickem_player_bitmap_{player_name}_metadata', json.dumps(chunk_metadata))
-                except Exception as e:
-                    self.logger.error(f'Error storing player bitmap data for {player_name}: {str(e)}')
-                    raise
+                    group_stats = self.publish_levels(group, block, names, bitmap_storage)
+
+                for player, player_name in zip(block['player'], names):
+                    player_stats[group][player_name] = {'stats': group_stats[player_name], 'total_sims': total_sims}
+                    if group == 'batters' and player in batter_outcomes:
+                        self.store_outcome_counts(player_name, batter_outcomes[player])
+                    elif group == 'batters':
+                        # Counts of an earlier run would reweight this one's sims
+                        self.redis.delete(f'pickem_player_outcomes_{player_name}')
             
+            self.logger.info(f'Built and published {len(all_players)} players\' {self.storage} in '
+                             f'{time.process_time() - encode_start:.2f}s CPU')
+
             # Store simulation data in Redis
             try:
                 # Store metadata
                 metadata = {
                     'num_sims': bitmap_storage.num_sims,
+                    'seed': self.seed,
+                    'slate': self.slate_key,
+                    'engine': self.engine,
+                    'worst_se': self.worst_se,
+                    'effective_sims': self.effective_sims,
+                    'antithetic': self.antithetic,
+                    'common_random_numbers': self.common_random_numbers,
+                    'target_se': self.target_se,
+                    'max_sims': self.num_sims,
+                    'time_budget': self.time_budget,
+                    'truncated': self.truncated,
+                    'live_games': sorted(f"{away}@{home}" for away, home in self.live_states),
+                    'tilts': [tilt.player for tilt in self.tilts],
+                    'weighted': sim_weights is not None,
+                    'storage': self.storage,
+                    'outcome_counts': bool(batter_outcomes),
                     'timestamp': int(time.time())
                 }
                 self.redis.set('pickem_simulation_metadata', json.dumps(metadata))
+                if sim_weights is not None:
+                    self.redis.set('pickem_sim_weights', json.dumps(sim_weights.tolist()))
+                else:
+                    self.redis.delete('pickem_sim_weights')
                 
                 # Store the list of all players
                 self.redis.set('pickem_players_list', json.dumps(list(set(all_players))))
                 
                 # Store all player stats in one key
                 self.redis.set('pickem_all_player_stats', json.dumps(player_stats))
+                self.close_preliminary_stats()
                 
                 self.logger.info('Successfully stored simulation data in Redis')
             except Exception as e:
@@ -806,8 +536,169 @@ class SimulationHandler:
 
         except Exception as e:
             self.logger.error(f'Error in process_results: {str(e)}')
+            self.close_preliminary_stats()
+            raise
+
+    @staticmethod
+    def split_outcome_counts(sims):
+        """Take the PA outcome count stats out of a columnar hitter group.
+
+        Returns:
+            Tuple of (player name -> (SP/RP, outcome, sims) counts, the group
+            without the count stats)
+        """
+        outcome_stats = MLB_Game_Simulator.OUTCOME_STATS
+        counted = {stat for split_stats in outcome_stats for stat in split_stats}
+        counts = np.stack([np.stack([sims['stats'][stat] for stat in split_stats], axis=1)
+                           for split_stats in outcome_stats], axis=1)
+        group = dict(sims, stats={stat: values for stat, values in sims['stats'].items() if stat not in counted})
+        return dict(zip(sims['player'], counts)), group
+
+    def publish_bitmaps(self, group, block, names, bitmap_storage):
+        """Publish a bitmap per catalog prop of a group of players.
+
+        Args:
+            group: 'batters' or 'pitchers'
+            block: Columnar results of the group
+            names: Cleaned names of the block's players
+            bitmap_storage: PropBitmap the bitmaps are added to
+
+        Returns:
+            Player name -> {stat: {threshold: count}} of the catalog props
+        """
+        # Outcomes of the published sims this run extends
+        prior_props = {player_name: self.load_prior_props(player_name) for player_name in names}
+        weights = block.get('weights')
+
+        # Every catalog prop of the group as bitmaps and counts, a stat at a time
+        group_props = {player_name: {} for player_name in names}
+        group_stats = {player_name: {} for player_name in names}
+        for stat in load_catalog()[group]:
+            keys = stat.keys
+            prior = self.prior_hits(prior_props, names, keys)
+            packed, counts = threshold_bitmaps(block['stats'][stat.column], stat.lines, weights, prior)
+            for i, player_name in enumerate(names):
+                group_stats[player_name][stat.stat] = {str(threshold): counts[i, j].item()
+                                                       for j, (_, threshold) in enumerate(stat.lines)}
+                for j, key in enumerate(keys):
+                    # One compressed bitmap, shared by the storage and the publisher
+                    group_props[player_name][key] = bitmap_storage.add_packed(f"{player_name}_{key}", packed[i, j])
+
+        for player_name in names:
+            self.store_player_bitmap(player_name, group_props[player_name])
+            # Levels of an earlier run in levels or planes storage would shadow the bitmaps
+            for storage in ('levels', 'planes'):
+                self.redis.delete(f'pickem_player_{storage}_{player_name}')
+        return group_stats
+
+    def publish_levels(self, group, block, names, bitmap_storage):
+        """Publish a uint8 level array, or its bit planes, per catalog stat of a group of players.
+
+        Any line of a stat is read from its levels, so the counts published
+        for props.php cover every integer threshold in each player's range
+        on top of the catalog's, answering half-point and alternate lines.
+
+        Args:
+            group: 'batters' or 'pitchers'
+            block: Columnar results of the group
+            names: Cleaned names of the block's players
+            bitmap_storage: PropBitmap the levels or planes are added to
+
+        Returns:
+            Player name -> {stat: {threshold: count}}
+        """
+        # Stat values of the published sims this run extends
+        prior_values = {player_name: self.load_prior_levels(player_name) for player_name in names}
+        weights = block.get('weights')
+
+        group_levels = {player_name: {} for player_name in names}
+        group_stats = {player_name: {} for player_name in names}
+        for stat in load_catalog()[group]:
+            values = block['stats'][stat.column]
+            if self.kept_sims:
+                values = np.concatenate([[prior_values[player_name][stat.stat] for player_name in names], values],
+                                        axis=1)
+            levels, offsets = stat_levels(values)
+            catalog_lines = dict((threshold, comparison) for comparison, threshold in stat.lines)
+            for i, player_name in enumerate(names):
+                offset = int(offsets[i])
+                top = offset + int(levels[i].max(initial=0))
+                thresholds = sorted(set(catalog_lines) | set(range(offset + 1, top + 2)))
+                counts = threshold_counts(levels[i], offset,
+                                          [(catalog_lines.get(threshold, '>='), threshold) for threshold in thresholds],
+                                          None if weights is None else weights[i])
+                group_stats[player_name][stat.stat] = {str(threshold): count
+                                                       for threshold, count in zip(thresholds, counts)}
+                name = f"{player_name}_{stat.stat}"
+                if self.storage == 'planes':
+                    compressed = bitmap_storage.add_planes(name, levels[i], offset)
+                    group_levels[player_name][stat.stat] = {'offset': offset, 'planes': list(compressed),
+                                                            'num_planes': len(bitmap_storage.planes[name][1])}
+                else:
+                    compressed = bitmap_storage.add_levels(name, levels[i], offset)
+                    group_levels[player_name][stat.stat] = {'offset': offset, 'levels': list(compressed)}
+
+        for player_name in names:
+            self.redis.set(f'pickem_player_{self.storage}_{player_name}', json.dumps({
+                'num_sims': bitmap_storage.num_sims,
+                'group': group,
+                'stats': group_levels[player_name]
+            }))
+            # What an earlier run in another storage published would shadow these
+            self.redis.delete(f'pickem_player_bitmap_{player_name}_metadata')
+            self.redis.delete(f'pickem_player_bitmap_{player_name}')
+            for storage in ('levels', 'planes'):
+                if storage != self.storage:
+                    self.redis.delete(f'pickem_player_{storage}_{player_name}')
+        return group_stats
+
+    def store_player_bitmap(self, player_name, player_bitmap_props):
+        """Publish a player's gzipped prop bitmaps, by prop key, in chunks."""
+        try:
+            # Break down large data into smaller chunks
+            chunk_size = 1000  # Number of props per chunk
+            # Convert dictionary to list of items and chunk it
+            items = list(player_bitmap_props.items())
+            props_chunks = [dict(items[i:i + chunk_size]) for i in range(0, len(items), chunk_size)]
+
+            for i, chunk in enumerate(props_chunks):
+                chunk_key = f'pickem_player_bitmap_{player_name}_chunk_{i}'
+                # Bitmaps are published as lists of byte values
+                self.redis.set(chunk_key, json.dumps({prop: list(data) for prop, data in chunk.items()}))
+
+            # Store metadata about chunks
+            chunk_metadata = {
+                'num_chunks': len(props_chunks),
+                'total_props': len(player_bitmap_props)
+            }
+            self.redis.set(f'pickem_player_bitmap_{player_name}_metadata', json.dumps(chunk_metadata))
+        except Exception as e:
+            self.logger.error(f'Error storing player bitmap data for {player_name}: {str(e)}')
             raise
 
+    def store_outcome_counts(self, player_name, counts):
+        """Publish a hitter's per-sim PA outcome counts and the probabilities they were drawn from.
+
+        Counts are (SP/RP, outcome, sims) uint8, stored gzipped like the
+        bitmaps. An extension's counts start with those of the kept sims.
+        """
+        counts = np.asarray(counts, dtype=np.uint8)
+        if self.kept_sims:
+            prior = self.redis.get(f'pickem_player_outcomes_{player_name}')
+            if not prior:
+                # Runs published before outcome counts were recorded cannot be reweighted
+                self.logger.warning(f'No published outcome counts for {player_name} to extend')
+                return
+            prior_counts = np.frombuffer(gzip.decompress(bytes(prior['counts'])), dtype=np.uint8)
+            prior_counts = prior_counts.reshape(prior['shape'])[:, :, :self.kept_sims]
+            counts = np.concatenate([prior_counts, counts], axis=2)
+        probs = self.outcome_probs.get(player_key(player_name))
+        self.redis.set(f'pickem_player_outcomes_{player_name}', json.dumps({
+            'shape': list(counts.shape),
+            'counts': list(gzip.compress(counts.tobytes(), compresslevel=GZIP_LEVEL)),
+            'probs': None if probs is None else probs.tolist()
+        }))
+
     def load_props(self):
         """Load props from Redis.
         
@@ -0,0 +1,516 @@
+import collections
+import csv
+from dataclasses import dataclass
+
+import numpy as np
+
+from base_out import OUTCOMES
+
+# Version of the compiled slate layout; bump it whenever SlateCompiler's
+# output changes so slates cached by SlateCache are rebuilt
+PARSER_VERSION = 1
+# Rate columns of a hitter's SP/RP vectors in CompiledSlate.rates
+RATE_COLUMNS = OUTCOMES + ['K', 'SB', 'CS']
+SP_SPLIT, RP_SPLIT = 0, 1
+# Rows whose 2H column equals this are second-half lines and are skipped
+DH = "2"
+# Per-PA rates of the pinch hitter, before the projections of hitters
+# outside the lineup are added in
+REPLACEMENT_HITTER = {
+    "PA": 10,
+    "1B": 1.27,
+    "2B": 0.36,
+    "3B": 0.02,
+    "HR": 0.21,
+    "SB": 0.37,
+    "CS": 0.087,
+    "K": 2.99,
+    "BB": 1.16,
+    "HBP": 0.14,
+    "OUT": 6.84
+}
+# Optional pitcher CSV columns overriding the mean (pitches_<kind>) and
+# standard deviation (pitches_<kind>_sd) of the simulator's pitches per PA
+# outcome kind; a blank _sd keeps the default standard deviation (None)
+PITCH_COLUMN = 'pitches_{}'
+PITCH_KINDS = ('hit', 'bb', 'k', 'out', 'hbp')
+
+
+@dataclass(frozen=True)
+class CompiledSlate:
+    """Immutable model of a slate, built once from its projection files.
+
+    Every player record is a dict with an 'Index' into players, the position
+    of its row in rates. Teams are numbered in load order, and each team's
+    roster is followed by its pinch hitter and bullpen. All per-team fields
+    are tuples indexed by team id. Player records are shared by everything
+    built from the slate and are not modified once compiled.
+
+    Attributes:
+        players: Player records in Index order
+        teams: Team abbreviations, in team id order
+        rosters: Indexes of each team's hitters then pitchers, in file order
+        lineups: Indexes of each team's first nine hitters sorted by Order
+        starters: Index of each team's starting pitcher
+        openers: Index of each team's opener, or None
+        pinch_hitters: Index of each team's pinch hitter
+        bullpens: Index of each team's bullpen
+        hitters: Indexes of every hitter, pinch hitters included
+        pitchers: Indexes of every pitcher, bullpens included
+        rates: Read-only float array shaped players x (SP, RP) x
+            RATE_COLUMNS of projected events per game; zero for pitchers
+        games: (away_team, home_team) tuples in file order
+    """
+    players: tuple
+    teams: tuple
+    rosters: tuple
+    lineups: tuple
+    starters: tuple
+    openers: tuple
+    pinch_hitters: tuple
+    bullpens: tuple
+    hitters: tuple
+    pitchers: tuple
+    rates: np.ndarray
+    games: tuple
+
+
+def lower_first(iterator):
+    iterator = iter(iterator)
+    # Skip comment lines
+    for line in iterator:
+        if not line.strip().startswith("#"):
+            # Lowercase the header row and yield it
+            yield line.lower()
+            break
+    # Yield the rest of the file unchanged
+    for line in iterator:
+        yield line
+
+
+def read_rows(path):
+    """Parse a projections CSV once into row dicts with lowercased headers."""
+    with open(path, encoding="utf-8-sig") as file:
+        return list(csv.DictReader(lower_first(file)))
+
+
+def load_slate(hitter_file_path, pitcher_file_path, dh=DH):
+    """Read both projection files once and compile them into a CompiledSlate."""
+    return SlateCompiler(read_rows(hitter_file_path), read_rows(pitcher_file_path), dh).compile()
+
+
+class SlateCompiler:
+    """Turns parsed hitter and pitcher rows into a CompiledSlate.
+
+    Each step works on its own copies of the rows, since steps fill blank
+    cells with different defaults.
+    """
+
+    def __init__(self, hitter_rows, pitcher_rows, dh=DH):
+        self.hitter_rows = hitter_rows
+        self.pitcher_rows = pitcher_rows
+        self.dh = dh
+        self.id_counter = 1
+        self.hitters_dict = {}
+        self.pitchers_dict = {}
+        self.teams_dict = collections.defaultdict(list)
+        self.pitcher_totals = collections.defaultdict(dict)
+        self.hitter_totals_vs_sp = collections.defaultdict(dict)
+        self.replacement_hitter = dict(REPLACEMENT_HITTER)
+        self.rates = {}
+
+    def rows(self, rows):
+        return (dict(row) for row in rows)
+
+    def compile(self):
+        self.load_pitcher_totals()
+        self.load_hitter_totals()
+        self.load_hitters_projections()
+        self.load_pitchers_projections()
+        games = self.load_games()
+        self.update_pitcher_positions()
+        return self.build(games)
+
+    def load_pitcher_totals(self):
+        for row in self.rows(self.pitcher_rows):
+            if "2h" in row and row["2h"] == self.dh:
+                continue
+            opener = False
+            if "mpc" in row and row["mpc"] == "IP CAP":
+                opener = True
+            opponent = row.get("opp_tm") or row.get("opp")
+            pitcher_totals = {
+                "H": float(row['h']),
+                "HR": float(row["hr"]),
+                "SB": float(row.get("sb", 0.5)),
+                "CS": float(row.get("cs", 0.15)),
+                "K": float(row["k"]),
+                "BB": float(row["bb"]),
+                "HBP": float(row["hbp"]) if row["hbp"] else 0.0,
+                "OUT": float(row['outs']) if row['outs'] else float(row['ip']) * 3,
+            }
+            if opponent in self.pitcher_totals:
+                if opener:
+                    opener_value = row["opener"]
+                    if "Yes" in opener_value:
+                        pass
+                    else:
+                        self.pitcher_totals[opponent] = pitcher_totals
+                else:
+                    self.pitcher_totals[opponent] = pitcher_totals
+            else:
+                self.pitcher_totals[opponent] = pitcher_totals
+
+    def load_hitter_totals(self):
+        team_order = {}  # Dictionary to track order of teams
+        for row in self.rows(self.hitter_rows):
+            if "2h" in row and row["2h"] == self.dh:
+                continue
+            if not row["hbp"] or not row["hbp"].strip():
+                row["hbp"] = "0"
+            if not row["cs"] or not row["cs"].strip():
+                row["cs"] = "0.05"
+            team = row.get('team') or row.get('tm')
+            if not row["lp"] or not row["lp"].strip():
+                # Increment team order counter
+                team_order[team] = team_order.get(team, 0) + 1
+                row["lp"] = str(team_order[team])
+            if ("ipl" in row and row["ipl"] == "false") or float(row["lp"]) > 9:
+                player_data = {
+                    "PA": float(row["pa"]),
+                    "1B": float(row["1b"]),
+                    "2B": float(row["2b"]),
+                    "3B": float(row["3b"]),
+                    "HR": float(row["hr"]),
+                    "SB": float(row["sb"]),
+                    "CS": float(row["cs"]),
+                    "K": float(row["k"]),
+                    "BB": float(row["bb"]),
+                    "HBP": float(row["hbp"]),
+                    "OUT": 1 - float(row["_obp"])
+                }
+                for key, val in player_data.items():
+                    if key in self.replacement_hitter:
+                        self.replacement_hitter[key] += val
+                    else:
+                        self.replacement_hitter[key] = val
+            else:
+                if "pavssp" in row:
+                    pavssp = float(row["pavssp%"].replace("%", '')) / 100
+                else:
+                    pavssp = .053 + -.007 * float(row["lp"]) + .038 * float(self.pitcher_totals[team]["OUT"])
+                if "_obp" in row:
+                    outs = (1 - float(row["_obp"])) * float(row["pa"])
+                else:
+                    outs = float(row["pa"]) - float(row["bb"]) - float(row["hbp"]) - float(row["1b"]) - float(row["2b"]) - float(row["3b"]) - float(row["hr"])
+                h = (float(row["1b"]) + float(row["2b"]) + float(row["3b"]) + float(row["hr"])) * pavssp
+                hr = float(row["hr"]) * pavssp
+                sb = float(row["sb"]) * pavssp
+                cs = float(row["cs"]) * pavssp
+                k = float(row["k"]) * pavssp
+                bb = float(row["bb"]) * pavssp
+                hbp = float(row["hbp"]) * pavssp
+                out = outs * pavssp
+                player_data = {
+                    "HR": hr,
+                    "H": h,
+                    "SB": sb,
+                    "CS": cs,
+                    "K": k,
+                    "BB": bb,
+                    "HBP": hbp,
+                    "OUT": out
+                }
+
+                if team in self.hitter_totals_vs_sp:
+                    for key, val in player_data.items():
+                        if key in self.hitter_totals_vs_sp[team]:
+                            self.hitter_totals_vs_sp[team][key] += val
+                        else:
+                            self.hitter_totals_vs_sp[team][key] = val
+                else:
+                    self.hitter_totals_vs_sp[team] = player_data
+
+    def load_hitters_projections(self):
+        team_order = {}  # Dictionary to track order of teams
+        for row in self.rows(self.hitter_rows):
+            if not row["hbp"] or not row["hbp"].strip():
+                row["hbp"] = "0"
+            if not row["cs"] or not row["cs"].strip():
+                row["cs"] = "0"
+            if "2h" in row and row["2h"] == self.dh:
+                continue
+            if "ipl" in row and row["ipl"] == "false":
+                continue
+            team = row.get('team') or row.get('tm')
+            if not row["lp"] or not row["lp"].strip():
+                # Increment team order counter
+                team_order[team] = team_order.get(team, 0) + 1
+                row["lp"] = str(team_order[team])
+            if "lp" in row and float(row["lp"]) > 9:
+                continue
+            if team not in self.pitcher_totals:
+                continue
+            player_name = row["name"].replace("-", "#").lower()
+            if "playerid" in row:
+                player_id = row["playerid"]
+            else:
+                player_id = self.id_counter
+                self.id_counter += 1
+            if "pos" in row:
+                position = sorted([pos for pos in row["pos"].split("/")])
+            else:
+                position = ['batter']
+            opp = row.get("opp_tm") or row.get("opp")
+            # hfa = row.get("hfa")
+            batting_order = int(row["lp"])
+
+            if "pavssp" in row:
+                pavssp = float(row["pavssp%"].replace("%", '')) / 100
+            else:
+                pavssp = .053 + -.007 * float(row["lp"]) + .038 * float(self.pitcher_totals[team]["OUT"])
+            if "_obp" in row:
+                outs = (1 - float(row["_obp"])) * float(row["pa"])
+            else:
+                outs = float(row["pa"]) - float(row["bb"]) - float(row["hbp"]) - float(row["1b"]) - float(row["2b"]) - float(row["3b"]) - float(row["hr"])
+
+            if "ph%" in row:
+                pa_no_ph = (float(row["0%_ph%_fpts"]) / float(row["fpts"])) * float(row["pa"])
+                pa_vs_pen_no_ph = pa_no_ph - float(row["pavssp"])
+                ph = float(row["ph%"].replace("%", '')) / 100
+                ph_risk = 1 - ((1 - ph) ** (1 / pa_vs_pen_no_ph)) if pa_vs_pen_no_ph > 0 else 0
+            else:
+                ph_risk = max(0, 1.56 + -.03 * float(row["lp"]) + -.36 * float(row["pa"]) + .006 * self.pitcher_totals[team]["OUT"])
+
+            non_hr_hits = float(row["1b"]) + float(row["2b"]) + float(row["3b"])
+            non_hr_hits_singles = float(row["1b"]) / non_hr_hits
+            non_hr_hits_doubles = float(row["2b"]) / non_hr_hits
+            non_hr_hits_triples = float(row["3b"]) / non_hr_hits
+
+            totals = self.pitcher_totals[team]
+            totals_vs_sp = self.hitter_totals_vs_sp[team]
+            hits_vs_sp = (non_hr_hits + float(row["hr"])) * pavssp
+            adj_hits_vs_sp = hits_vs_sp * (totals["H"] / totals_vs_sp["H"])
+            hr_vs_sp = float(row["hr"]) * pavssp * (totals["HR"] / totals_vs_sp["HR"])
+            adj_non_hr_hits_vs_sp = adj_hits_vs_sp - hr_vs_sp
+
+            single_vs_sp = adj_non_hr_hits_vs_sp * non_hr_hits_singles
+            double_vs_sp = adj_non_hr_hits_vs_sp * non_hr_hits_doubles
+            triple_vs_sp = adj_non_hr_hits_vs_sp * non_hr_hits_triples
+
+            sb_vs_sp = float(row["sb"]) * pavssp * (totals["SB"] / totals_vs_sp["SB"])
+            cs_vs_sp = float(row["cs"]) * pavssp * (totals["CS"] / (totals_vs_sp["CS"] + 0.0001))
+            k_vs_sp = float(row["k"]) * pavssp * (totals["K"] / totals_vs_sp["K"])
+            bb_vs_sp = float(row["bb"]) * pavssp * (totals["BB"] / totals_vs_sp["BB"])
+            hbp_vs_sp = float(row["hbp"]) * pavssp * (totals["HBP"] / (totals_vs_sp["HBP"] + 0.0001))
+            out_vs_sp = outs * pavssp * (totals["OUT"] / totals_vs_sp["OUT"])
+
+            player_data = {
+                "Position": position[0],
+                "Name": player_name,
+                "Team": team,
+                "Opp": opp,
+                #"HFA": hfa,
+                "ID": player_id,
+                "Opp Pitcher ID": "",
+                "Opp Pitcher Name": "",
+                "In Lineup": True,
+                "Order": batting_order,
+                "PH": float(ph_risk)
+            }
+            rates = {
+                "SP": {
+                    "PA": pavssp,
+                    "1B": single_vs_sp,
+                    "2B": double_vs_sp,
+                    "3B": triple_vs_sp,
+                    "HR": hr_vs_sp,
+                    "SB": sb_vs_sp,
+                    "CS": cs_vs_sp,
+                    "K": k_vs_sp,
+                    "BB": bb_vs_sp,
+                    "HBP": hbp_vs_sp,
+                    "OUT": out_vs_sp
+                },
+                "RP": {
+                    "PA": float(row["pa"]) - pavssp,
+                    "1B": float(row["1b"]) - single_vs_sp,
+                    "2B": float(row["2b"]) - double_vs_sp,
+                    "3B": float(row["3b"]) - triple_vs_sp,
+                    "HR": float(row["hr"]) - hr_vs_sp,
+                    "SB": float(row["sb"]) - sb_vs_sp,
+                    "CS": float(row["cs"]) - cs_vs_sp,
+                    "K": float(row["k"]) - k_vs_sp,
+                    "BB": float(row["bb"]) - bb_vs_sp,
+                    "HBP": float(row["hbp"]) - hbp_vs_sp,
+                    "OUT": outs - out_vs_sp
+                }
+            }
+
+            self.hitters_dict[(player_name, position[0], team)] = player_data
+            self.rates[id(player_data)] = rates
+            if not self.teams_dict[team]:
+                pinch_hitter = {
+                    "Position": 'ph',
+                    "Name": 'ph',
+                    "Team": team,
+                    "Opp": opp,
+                    #"HFA": hfa,
+                    "ID": -1,
+                    "Opp Pitcher ID": "",
+                    "Opp Pitcher Name": "",
+                    "In Lineup": False,
+                    "Order": -1,
+                    "PH": 0.0
+                }
+                self.hitters_dict[('ph', 'ph', team)] = pinch_hitter
+                self.rates[id(pinch_hitter)] = {"SP": self.replacement_hitter, "RP": self.replacement_hitter}
+                self.pitchers_dict[('bullpen', 'bullpen', team)] = {
+                    "Position": 'bullpen',
+                    "Name": 'bullpen',
+                    "Team": team,
+                    "Opp": opp,
+                    #"HFA": hfa,
+                    "Opp Pitcher ID": "",
+                    "Opp Pitcher Name": "",
+                    "In Lineup": True,
+                    "ID": -1
+                }
+            self.teams_dict[team].append(player_data)
+
+    def load_pitchers_projections(self):
+        for row in self.rows(self.pitcher_rows):
+            if not row["hbp"] or not row["hbp"].strip():
+                row["hbp"] = "0"
+            if not row["outs"] or not row["outs"].strip():
+                row["outs"] = float(row["ip"]) * 3
+            if "2h" in row and row["2h"] == self.dh:
+                continue
+            opener = False
+            if "mpc" in row and row["mpc"] == "IP CAP":
+                opener = True
+            player_name = row["player"].replace("-", "#").lower()
+            if "playerid" in row:
+                player_id = row["playerid"]
+            else:
+                player_id = self.id_counter
+                self.id_counter += 1
+            position = ['P']
+            team = row.get("tm") or row.get("team")
+            opp = row.get("opp_tm") or row.get("opp")
+            #hfa = row.get("hfa")
+            ppc = 0
+            mpc = 0
+            if "ppc" in row and row["ppc"] == "--":
+                opener_value = row["opener"]
+                if "Yes" in opener_value:
+                    # Extract the number in parentheses
+                    ip_value = float(opener_value.split("(")[1].split()[0])
+                    ppc = ip_value * 15
+                    mpc = ppc + 15
+                else:
+                    ppc = 5 * float(row["outs"])
+                    mpc = 6 * float(row["outs"])
+            elif "pitch count (optional)" in row:
+                ppc = float(row["pitch count (optional)"]) if row["pitch count (optional)"].strip() else 3.35 * float(row["h"]) + 5.46 * float(row["bb"]) + 4.85 * float(row["k"]) + 3.35 * (float(row["outs"]) - float(row["k"]))
+                mpc = ppc * 1.12 if ppc > 0 else 0
+            else:
+                ppc = float(row["ppc"])
+                mpc = float(row["mpc"])
+
+            pitches = {}
+            for kind in PITCH_KINDS:
+                column = PITCH_COLUMN.format(kind)
+                if (row.get(column) or "").strip():
+                    sd = (row.get(column + "_sd") or "").strip()
+                    pitches[kind] = (float(row[column]), float(sd) if sd else None)
+
+            player_data = {
+                "Position": position[0],
+                "Name": player_name,
+                "Team": team,
+                "Opp": opp,
+                #"HFA": hfa,
+                "Opp Pitcher ID": "",
+                "Opp Pitcher Name": "",
+                "In Lineup": True,
+                "Opener": opener,
+                "ID": player_id,
+                "HR": float(row["hr"]),
+                "K": float(row["k"]),
+                "BB": float(row["bb"]),
+                "HBP": float(row["hbp"]),
+                "PPC": ppc,
+                "MPC": mpc,
+                "Pitches": pitches
+            }
+
+            self.pitchers_dict[(player_name, position[0], team)] = player_data
+            self.teams_dict[team].append(player_data)
+
+    def load_games(self):
+        games = []
+        for row in self.pitcher_rows:
+            if row['hfa'] == 'FALSE' or row['hfa'] == 'false' or row['hfa'].startswith('A') or row['hfa'].startswith('a'):
+                away_team = row.get('tm') or row.get('team')
+                home_team = row.get('opp_tm') or row.get('opp')
+                if (away_team, home_team) not in games:
+                    games.append((away_team, home_team))
+        return games
+
+    def update_pitcher_positions(self):
+        for team, players in self.teams_dict.items():
+            pitchers = [player for player in players if "P" in player["Position"]]
+
+            if len(pitchers) == 2:
+                for pitcher in pitchers:
+                    if pitcher["Opener"]:
+                        pitcher["Position"] = ["Opener"]
+                        break  # Only change one pitcher's position
+
+    def build(self, games):
+        """Number the players and freeze everything into a CompiledSlate."""
+        players = []
+        rosters, lineups, starters, openers, pinch_hitters, bullpens = [], [], [], [], [], []
+        for team, roster in self.teams_dict.items():
+            if ('ph', 'ph', team) not in self.hitters_dict:
+                raise ValueError(f"No lineup projections for team {team}")
+            pinch_hitter = self.hitters_dict[('ph', 'ph', team)]
+            bullpen = self.pitchers_dict[('bullpen', 'bullpen', team)]
+            for player in roster + [pinch_hitter, bullpen]:
+                player['Index'] = len(players)
+                players.append(player)
+
+            lineup = sorted([player for player in roster if 'P' not in player['Position']],
+                            key=lambda x: x.get('Order', float('inf')))[:9]
+            starter = next((player for player in roster if 'P' in player['Position']), None)
+            opener = next((player for player in roster if 'Opener' in player['Position']), None)
+            rosters.append(tuple(player['Index'] for player in roster))
+            lineups.append(tuple(player['Index'] for player in lineup))
+            starters.append(starter['Index'] if starter else None)
+            openers.append(opener['Index'] if opener else None)
+            pinch_hitters.append(pinch_hitter['Index'])
+            bullpens.append(bullpen['Index'])
+
+        hitters = [player['Index'] for player in players if id(player) in self.rates]
+        rates = np.zeros((len(players), 2, len(RATE_COLUMNS)))
+        for index in hitters:
+            for split, indicator in ((SP_SPLIT, 'SP'), (RP_SPLIT, 'RP')):
+                split_rates = self.rates[id(players[index])][indicator]
+                rates[index, split] = [float(split_rates[column]) for column in RATE_COLUMNS]
+        rates.setflags(write=False)
+
+        return CompiledSlate(
+            players=tuple(players),
+            teams=tuple(self.teams_dict),
+            rosters=tuple(rosters),
+            lineups=tuple(lineups),
+            starters=tuple(starters),
+            openers=tuple(openers),
+            pinch_hitters=tuple(pinch_hitters),
+            bullpens=tuple(bullpens),
+            hitters=tuple(hitters),
+            pitchers=tuple(player['Index'] for player in players if id(player) not in self.rates),
+            rates=rates,
+            games=tuple(games)
+        )
@@ -0,0 +1,155 @@
+import dataclasses
+import hashlib
+import io
+import json
+import logging
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+from slate import DH, PARSER_VERSION, CompiledSlate, load_slate
+
+logger = logging.getLogger(__name__)
+
+
+class SlateCache:
+    """Content-addressed cache of CompiledSlates.
+
+    A slate is keyed by a hash of the hitter and pitcher file bytes and
+    PARSER_VERSION, so re-uploading the same CSVs under new names reuses it
+    and a parser change invalidates every entry. Entries are pickles on local
+    disk, optionally backed by Redis through RedisHelper so other hosts and
+    fresh disks can share them. Redis entries hold data only, see dumps,
+    since anyone who can write to Redis could otherwise run code here
+    through a pickle. Cache failures are logged and fall back to compiling
+    the files.
+    """
+
+    DEFAULT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'slate_cache')
+    # Disk entries kept; the least recently used are removed past this
+    MAX_ENTRIES = 64
+    REDIS_KEY = 'slate_{}'
+    REDIS_TTL = 24 * 3600
+
+    def __init__(self, cache_dir=None, redis=None):
+        """
+        Args:
+            cache_dir: Directory for the disk tier, DEFAULT_DIR by default
+            redis: Optional RedisHelper for the shared tier
+        """
+        self.cache_dir = cache_dir or self.DEFAULT_DIR
+        self.redis = redis
+
+    @staticmethod
+    def key(hitter_file_path, pitcher_file_path, dh=DH):
+        """Hex digest identifying the compiled slate of a pair of files."""
+        digest = hashlib.sha256(f"slate:{PARSER_VERSION}:{dh}".encode('utf-8'))
+        for path in (hitter_file_path, pitcher_file_path):
+            with open(path, 'rb') as file:
+                data = file.read()
+            # Length-prefix each file so the boundary between them is part of the key
+            digest.update(len(data).to_bytes(8, 'little'))
+            digest.update(data)
+        return digest.hexdigest()
+
+    @staticmethod
+    def dumps(slate):
+        """npz bytes of a slate: its rates array and the JSON of every other field."""
+        fields = {field.name: getattr(slate, field.name) for field in dataclasses.fields(slate)
+                  if field.name != 'rates'}
+        buffer = io.BytesIO()
+        np.savez(buffer, rates=slate.rates,
+                 fields=np.frombuffer(json.dumps(fields).encode('utf-8'), dtype=np.uint8))
+        return buffer.getvalue()
+
+    @staticmethod
+    def loads(data):
+        """The slate of dumps bytes, read without unpickling anything."""
+        with np.load(io.BytesIO(data), allow_pickle=False) as npz:
+            rates = npz['rates']
+            fields = json.loads(npz['fields'].tobytes().decode('utf-8'))
+        rates.setflags(write=False)
+
+        def tuples(value):
+            return tuple(tuples(item) for item in value) if isinstance(value, list) else value
+
+        # JSON turns tuples into lists; player records keep their own lists
+        players = []
+        for player in fields.pop('players'):
+            if 'Pitches' in player:
+                player['Pitches'] = {kind: tuple(pitches) for kind, pitches in player['Pitches'].items()}
+            players.append(player)
+        return CompiledSlate(players=tuple(players), rates=rates,
+                             **{name: tuples(value) for name, value in fields.items()})
+
+    def path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.pkl")
+
+    def get(self, key):
+        """The cached slate for key, or None."""
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as file:
+                slate = pickle.load(file)
+            # Mark the entry as recently used for pruning
+            os.utime(path)
+            return slate
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cached slate {key}: {str(e)}")
+
+        if self.redis is not None:
+            try:
+                data = self.redis.get(self.REDIS_KEY.format(key))
+                if isinstance(data, bytes):
+                    slate = self.loads(data)
+                    self.write(key, pickle.dumps(slate, protocol=pickle.HIGHEST_PROTOCOL))
+                    return slate
+            except Exception as e:
+                logger.warning(f"Redis slate cache lookup failed: {str(e)}")
+        return None
+
+    def put(self, key, slate):
+        self.write(key, pickle.dumps(slate, protocol=pickle.HIGHEST_PROTOCOL))
+        if self.redis is not None:
+            try:
+                self.redis.set(self.REDIS_KEY.format(key), self.dumps(slate), ttl=self.REDIS_TTL)
+            except Exception as e:
+                logger.warning(f"Redis slate cache store failed: {str(e)}")
+
+    def write(self, key, data):
+        """Atomically write a pickled slate to the disk tier."""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as file:
+                file.write(data)
+            os.replace(tmp_path, self.path(key))
+            self.prune()
+        except OSError as e:
+            logger.warning(f"Could not write cached slate {key}: {str(e)}")
+
+    def prune(self):
+        entries = [entry for entry in os.scandir(self.cache_dir) if entry.name.endswith('.pkl')]
+        if len(entries) <= self.MAX_ENTRIES:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.MAX_ENTRIES]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+    def load(self, hitter_file_path, pitcher_file_path, dh=DH):
+        """Compiled slate of the files, from the cache when they were seen before."""
+        key = self.key(hitter_file_path, pitcher_file_path, dh)
+        slate = self.get(key)
+        if slate is None:
+            slate = load_slate(hitter_file_path, pitcher_file_path, dh)
+            self.put(key, slate)
+        else:
+            logger.info(f"Using cached slate {key[:12]}")
+        return slate
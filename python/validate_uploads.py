@@ -2,6 +2,7 @@
 import sys
 import pandas as pd
 import json
+from slate_cache import SlateCache
 
 def validate_hitter_file(file_path):
     """
@@ -307,6 +308,12 @@ def validate_files(hitter_path, pitcher_path):
     
     if not pitcher_validation['valid']:
         return pitcher_validation
+
+    # Compile the slate now so the simulation run finds it in the cache
+    try:
+        SlateCache().load(hitter_path, pitcher_path)
+    except Exception as e:
+        return {'valid': False, 'message': f"Error reading projections: {str(e)}"}
     
     return {'valid': True, 'message': "All validation checks passed"}
 
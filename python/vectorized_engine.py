@@ -0,0 +1,614 @@
+import numpy as np
+
+from base_out import (OUTCOMES, SINGLE, DOUBLE, TRIPLE, HOME_RUN, WALK, HIT_BY_PITCH, OUT, SP, RP,
+                      EMPTY, BIP_BOUNDS, BIP_BASES, BIP_SCORER, BIP_RBI, BIP_OUTS)
+from sim_results import add_derived_stats
+
+
+class VectorizedGameEngine:
+    """Simulate many games of one matchup in lock-step.
+
+    Every sim's game state (inning, half, outs, bases, score, lineup slot,
+    pitch counts) is held in NumPy arrays, and each step of the loop plays one
+    plate appearance for every sim that is still in progress. Player stats are
+    accumulated into stat x player x sim count arrays, using the same stat
+    columns as MLB_Game_Simulator.simulate_game.
+    """
+    # Arrays holding the state of every sim, saved at a scenario checkpoint
+    GAME_ARRAYS = ('hstats', 'pstats', 'inning', 'half', 'outs', 'runs', 'runs_inning', 'bases', 'inherited',
+                   'order', 'lineup', 'game_over', 'first_hit', 'first_rbi', 'first_run', 'first_hr', 'first_k',
+                   'first_run_allowed', 'log_weight')
+
+    def __init__(self, simulator, away_team, home_team, rng=None):
+        self.simulator = simulator
+        self.teams = (away_team, home_team)
+        self.rng = rng if rng is not None else simulator.rng
+        self.hitter_stats = simulator.hitter_stats
+        self.pitcher_stats = simulator.PITCHER_STATS
+        self.h_col = {stat: i for i, stat in enumerate(self.hitter_stats)}
+        # hstats row of each [split, outcome] PA outcome count, when the run counts them
+        self.outcome_col = None
+        if simulator.outcome_counts:
+            self.outcome_col = np.array([[self.h_col[stat] for stat in split_stats]
+                                         for split_stats in simulator.OUTCOME_STATS])
+        self.p_col = {stat: i for i, stat in enumerate(self.pitcher_stats)}
+        self._build_rosters()
+        self._build_rates()
+        self._apply_scenario(None)
+
+    def _build_rosters(self):
+        """Assign local indices to every hitter and pitcher in the game.
+
+        Hitters are numbered per team in roster order with the team's
+        pinch hitter last. Pitchers are [away starter, away bullpen,
+        home starter, home bullpen], so a team's starter is 2 * team.
+        """
+        self.hitters = []
+        self.hitter_team = []
+        self.lineups = np.zeros((2, 9), dtype=np.int32)
+        self.ph_index = np.zeros(2, dtype=np.int32)
+        self.pitchers = []
+        for team_index, team in enumerate(self.teams):
+            start = len(self.hitters)
+            roster = [player for player in self.simulator.roster(team)
+                      if 'Opener' not in player['Position'] and 'P' not in player['Position']]
+            self.hitters.extend(roster)
+            position = {id(player): start + i for i, player in enumerate(roster)}
+            for slot, player in enumerate(self.simulator.create_lineup(team)):
+                self.lineups[team_index, slot] = position[id(player)]
+            self.ph_index[team_index] = len(self.hitters)
+            self.hitters.append(self.simulator.pinch_hitters[self.simulator.team_ids[team]])
+            self.hitter_team.extend([team_index] * (len(self.hitters) - start))
+            self.pitchers.append(self.simulator.get_pitcher(team))
+            self.pitchers.append(self.simulator.bullpens[self.simulator.team_ids[team]])
+        self.hitter_team = np.array(self.hitter_team)
+
+    def _build_rates(self):
+        """Precompute per-hitter, per-split probability tables."""
+        num_hitters = len(self.hitters)
+        self.pa_cdf = np.zeros((num_hitters, 2, len(OUTCOMES)))
+        # Log likelihood ratio of each outcome, zero for hitters without a tilt
+        self.log_ratio = np.zeros((num_hitters, 2, len(OUTCOMES)))
+        self.k_per_out = np.zeros((num_hitters, 2))
+        self.steal_attempt = np.zeros((num_hitters, 2))
+        self.steal_success = np.zeros((num_hitters, 2))
+        self.advance_attempt = np.zeros((num_hitters, 2))
+        self.advance_success = np.zeros((num_hitters, 2))
+        self.ph_risk = np.array([float(hitter['PH']) for hitter in self.hitters])
+
+        for i, hitter in enumerate(self.hitters):
+            index = hitter['Index']
+            self.pa_cdf[i] = self.simulator.pa_cdf[index]
+            if index in self.simulator.tilted_cdf:
+                self.pa_cdf[i] = self.simulator.tilted_cdf[index]
+                self.log_ratio[i] = self.simulator.tilt_log_ratio[index]
+            self.k_per_out[i] = self.simulator.k_per_out[index]
+            self.steal_attempt[i], self.steal_success[i] = zip(*self.simulator.steal_rates[index])
+            self.advance_attempt[i], self.advance_success[i] = zip(*self.simulator.advance_rates[index])
+
+        self.projected_pitch_count = np.array([float(p.get('PPC', 0)) for p in self.pitchers])
+        self.max_pitch_count = np.array([float(p.get('MPC', 0)) for p in self.pitchers])
+
+        # Pitch-count distributions per pitcher and PA outcome kind
+        pitch_kinds = ['hit', 'bb', 'k', 'out', 'hbp']
+        self.pitch_kind = {kind: i for i, kind in enumerate(pitch_kinds)}
+        distributions = np.array([[self.simulator.pitch_distribution(pitcher['Index'], kind) for kind in pitch_kinds]
+                                  for pitcher in self.pitchers])
+        self.pitch_mean, self.pitch_std, self.pitch_min = distributions.transpose(2, 0, 1)
+
+    def _reset(self, num_sims):
+        n = num_sims
+        self.hstats = np.zeros((len(self.hitter_stats), len(self.hitters), n), dtype=np.int16)
+        self.pstats = np.zeros((len(self.pitcher_stats), len(self.pitchers), n), dtype=np.int16)
+        self.pstats[self.p_col['In_Game'], [0, 2], :] = 1
+
+        self.inning = np.ones(n, dtype=np.int16)
+        self.half = np.zeros(n, dtype=np.int8)
+        self.outs = np.zeros(n, dtype=np.int8)
+        self.runs = np.zeros((n, 2), dtype=np.int16)
+        self.runs_inning = np.zeros(n, dtype=np.int16)
+        self.bases = np.full((n, 3), EMPTY, dtype=np.int32)
+        self.inherited = np.full((n, 3), EMPTY, dtype=np.int32)
+        self.order = np.zeros((n, 2), dtype=np.int8)
+        self.lineup = np.broadcast_to(self.lineups, (n, 2, 9)).copy()
+        self.game_over = np.zeros(n, dtype=bool)
+        self.log_weight = np.zeros(n)
+
+        # Per-sim scratch for the plate appearance in progress
+        self.batter = np.zeros(n, dtype=np.int32)
+        self.pitcher = np.zeros(n, dtype=np.int32)
+        self.split = np.zeros(n, dtype=np.int8)
+
+        self.first_hit = np.zeros(n, dtype=bool)
+        self.first_rbi = np.zeros(n, dtype=bool)
+        self.first_run = np.zeros(n, dtype=bool)
+        self.first_hr = np.zeros(n, dtype=bool)
+        self.first_k = np.zeros(n, dtype=bool)
+        self.first_run_allowed = np.zeros(n, dtype=bool)
+
+    def run(self, num_sims, start=None):
+        """Simulate num_sims games and return columnar per-player results.
+
+        Every game starts at first pitch, or at the live state compiled by
+        MLB_Game_Simulator.compile_live_state given as start.
+
+        Returns:
+            Dict with 'hitters' and 'pitchers' entries, each holding the
+            player/team/opp/pos labels and a 'stats' dict of
+            players x sims arrays per stat column.
+        """
+        self._reset(num_sims)
+        if start is not None:
+            self._start_from(start)
+        self._play(np.arange(num_sims))
+        return self._collect()
+
+    def run_scenarios(self, num_sims, checkpoint, scenarios, start=None):
+        """Play num_sims games to a checkpoint once, then finish them once per scenario.
+
+        Args:
+            num_sims: Games to simulate
+            checkpoint: Last inning played before branching
+            scenarios: Scenarios to finish every game under
+            start: Optional compiled live state, as for run
+
+        With the simulator's common random numbers, every branch restarts
+        the RNG from the checkpoint.
+
+        Returns:
+            Dict of scenario name -> results as from run
+        """
+        self._reset(num_sims)
+        if start is not None:
+            self._start_from(start)
+        sims = np.arange(num_sims)
+        self._play(sims, until=checkpoint)
+        saved = {name: getattr(self, name).copy() for name in self.GAME_ARRAYS}
+        rng_state = self.rng.bit_generator.state
+
+        results = {}
+        for scenario in scenarios:
+            for name, values in saved.items():
+                setattr(self, name, values.copy())
+            if self.simulator.common_random_numbers:
+                self.rng.bit_generator.state = rng_state
+            self._apply_scenario(scenario)
+            self._play(sims[~self.game_over])
+            results[scenario.name] = self._collect()
+        self._apply_scenario(None)
+        return results
+
+    def _play(self, sims, until=None):
+        """Step sims until their games are over, or until inning until is complete."""
+        active = sims
+        if until is not None:
+            active = active[self.inning[active] <= until]
+        while active.size:
+            self._step(active)
+            active = active[~self.game_over[active]]
+            if until is not None:
+                active = active[self.inning[active] <= until]
+
+    def _apply_scenario(self, scenario):
+        """Manage the teams as scenario says, or as the model does when None."""
+        pull_after, bullpen_split, pinch_hit_rate = (scenario.settings(self.teams) if scenario is not None
+                                                     else ([None, None], [RP, RP], 1.0))
+        self.pull_after = np.array([np.inf if inning is None else inning for inning in pull_after])
+        self.bullpen_split = np.array(bullpen_split, dtype=np.int8)
+        self.pinch_hit_rate = pinch_hit_rate
+
+    def _start_from(self, start):
+        """Put every sim at a compiled live game state."""
+        hitter_rows = {hitter['Index']: i for i, hitter in enumerate(self.hitters)}
+        pitcher_rows = {pitcher['Index']: i for i, pitcher in enumerate(self.pitchers)}
+        for index, stat, count in start['stats']:
+            if stat in self.h_col and index in hitter_rows:
+                self.hstats[self.h_col[stat], hitter_rows[index]] = count
+            elif stat in self.p_col and index in pitcher_rows:
+                self.pstats[self.p_col[stat], pitcher_rows[index]] = count
+        for team in range(2):
+            if start['relieved'][team]:
+                self.pstats[self.p_col['In_Game'], 2 * team] = 0
+
+        batting = start['half']
+        self.inning[:] = start['inning']
+        self.half[:] = batting
+        self.outs[:] = start['outs']
+        self.runs[:] = start['runs']
+        self.runs_inning[:] = start['runs_inning']
+        self.order[:] = start['order']
+        self.bases[:] = [EMPTY if runner is None else hitter_rows.get(runner, self.ph_index[batting])
+                         for runner in start['bases']]
+        for flag, decided in start['first'].items():
+            getattr(self, flag)[:] = decided
+
+    def _h(self, stat, players, sims, value=1):
+        self.hstats[self.h_col[stat], players, sims] += value
+
+    def _p(self, stat, pitchers, sims, value=1):
+        self.pstats[self.p_col[stat], pitchers, sims] += value
+
+    def _step(self, sims):
+        batting = self.half[sims].astype(np.int32)
+        starter = 2 * (1 - batting)
+
+        self._pitching_changes(sims, starter)
+        starter_in = self.pstats[self.p_col['In_Game'], starter, sims] == 1
+        self.pitcher[sims] = starter + ~starter_in
+        self.split[sims] = np.where(starter_in, SP, self.bullpen_split[1 - batting])
+
+        # Pinch hitters and other removals
+        slot = self.order[sims, batting]
+        batter = self.lineup[sims, batting, slot]
+        draws = self.rng.random((2, sims.size))
+        remove = (draws[0] < 0.01) | (~starter_in & (draws[1] < self.ph_risk[batter] * self.pinch_hit_rate))
+        batter = np.where(remove, self.ph_index[batting], batter)
+        self.lineup[sims[remove], batting[remove], slot[remove]] = batter[remove]
+        self.batter[sims] = batter
+
+        self._stolen_bases(sims)
+
+        at_bat = self.outs[sims] < 3
+        pa_sims = sims[at_bat]
+        self._plate_appearance(pa_sims)
+
+        walk_off = np.zeros(sims.size, dtype=bool)
+        walk_off[at_bat] = ((self.half[pa_sims] == 1) & (self.inning[pa_sims] >= 9)
+                            & (self.runs[pa_sims, 1] > self.runs[pa_sims, 0]))
+        advance = at_bat & ~walk_off
+        self.order[sims[advance], batting[advance]] = (slot[advance] + 1) % 9
+
+        self._end_half_innings(sims[(self.outs[sims] >= 3) | walk_off])
+
+    def _pitching_changes(self, sims, starter):
+        in_game = self.pstats[self.p_col['In_Game'], starter, sims] == 1
+        sims, starter = sims[in_game], starter[in_game]
+        if not sims.size:
+            return
+        pitch_count = self.pstats[self.p_col['pPC'], starter, sims]
+        projected = self.projected_pitch_count[starter]
+        maximum = self.max_pitch_count[starter]
+        blowup = self.runs_inning[sims] >= 9 - self.inning[sims]
+        spread = np.where(maximum > projected, maximum - projected, 1)
+        pull_probability = 0.5 + 0.5 * (pitch_count - projected) / spread
+
+        draws = self.rng.random((2, sims.size))
+        pulled = ((draws[0] < .0015) | blowup | (pitch_count >= maximum)
+                  | ((pitch_count >= projected) & (draws[1] < pull_probability))
+                  | (self.inning[sims] > self.pull_after[starter // 2]))
+
+        self.inherited[sims[~pulled]] = EMPTY
+        sims, starter = sims[pulled], starter[pulled]
+        self.inherited[sims] = self.bases[sims]
+        self.pstats[self.p_col['In_Game'], starter, sims] = 0
+
+        # Starter leaving with the lead after five is in line for the win
+        fielding = 1 - self.half[sims]
+        ahead = self.runs[sims, fielding] > self.runs[sims, 1 - fielding]
+        eligible = (self.inning[sims] > 5) & ahead
+        self.pstats[self.p_col['In_Line_For_Win'], starter[eligible], sims[eligible]] = 1
+
+    def _stolen_bases(self, sims):
+        occupied = self.bases[sims] != EMPTY
+        # Lead runner must be on first or second with third open
+        lead = np.where(occupied[:, 1], 1, 0)
+        attempt_sims = ~occupied[:, 2] & occupied[:, :2].any(axis=1)
+        sims, lead = sims[attempt_sims], lead[attempt_sims]
+        if not sims.size:
+            return
+        runner = self.bases[sims, lead]
+        split = self.split[sims]
+        draws = self.rng.random((2, sims.size))
+        attempt = draws[0] < self.steal_attempt[runner, split]
+        success = attempt & (draws[1] < self.steal_success[runner, split])
+        caught = attempt & ~success
+
+        s, b, r = sims[success], lead[success], runner[success]
+        self.bases[s, b + 1] = r
+        self.bases[s, b] = EMPTY
+        self._h('bSB', r, s)
+
+        s, b, r = sims[caught], lead[caught], runner[caught]
+        self.bases[s, b] = EMPTY
+        self._h('bCS', r, s)
+        self.outs[s] += 1
+        self._p('pOuts', self.pitcher[s], s)
+
+    def _add_pitches(self, sims, kind):
+        if not sims.size:
+            return
+        k = self.pitch_kind[kind]
+        pitcher = self.pitcher[sims]
+        pitches = np.rint(self.rng.normal(self.pitch_mean[pitcher, k], self.pitch_std[pitcher, k]))
+        pitches = np.maximum(pitches, self.pitch_min[pitcher, k]).astype(np.int16)
+        inning = self.inning[sims]
+        self._p('pPC', pitcher, sims, pitches)
+        self._p('pFirstInnPC', pitcher, sims, pitches * (inning == 1))
+        self._p('pFirst3InnPC', pitcher, sims, pitches * (inning <= 3))
+
+    def _plate_appearance(self, sims):
+        if not sims.size:
+            return
+        batter = self.batter[sims]
+        pitcher = self.pitcher[sims]
+        split = self.split[sims]
+        self._h('bPA', batter, sims)
+        self._p('pBF', pitcher, sims)
+
+        draws = self.rng.random(sims.size)
+        outcome = (self.pa_cdf[batter, split] <= draws[:, None]).sum(axis=1)
+        outcome = np.minimum(outcome, OUT)
+        if self.outcome_col is not None:
+            self.hstats[self.outcome_col[split, outcome], batter, sims] += 1
+        if self.simulator.tilts:
+            self.log_weight[sims] += self.log_ratio[batter, split, outcome]
+
+        inning = self.inning[sims]
+        first_inning = inning == 1
+        first_three = inning <= 3
+        self._p('pFirstInnBF', pitcher, sims, first_inning)
+        self._p('pFirst3InnBF', pitcher, sims, first_three)
+
+        hit = outcome <= HOME_RUN
+        s, b, p = sims[hit], batter[hit], pitcher[hit]
+        self._p('pFirstInnH', p, s, first_inning[hit])
+        self._p('pFirst3InnH', p, s, first_three[hit])
+        self._h('bFirstInnH', b, s, first_inning[hit])
+        self._h('bFirst3InnH', b, s, first_three[hit])
+        self._h('bFirstInnHRBI', b, s, first_inning[hit])
+        self._h('bFirst3InnHRBI', b, s, first_three[hit])
+        new = ~self.first_hit[s]
+        self._h('bFirstHit', b[new], s[new])
+        self.first_hit[s] = True
+
+        self._single(sims[outcome == SINGLE])
+        self._double(sims[outcome == DOUBLE])
+        self._triple(sims[outcome == TRIPLE])
+        self._home_run(sims[outcome == HOME_RUN])
+        self._free_pass(sims[outcome == WALK], 'bBB', 'pBB', 'bb')
+        self._free_pass(sims[outcome == HIT_BY_PITCH], 'bHBP', 'pHBP', 'hbp')
+        self._out(sims[outcome == OUT])
+
+    def _score(self, sims, runner, rbi=True):
+        """Credit runs scored by runner in each sim to batter and pitcher stats.
+
+        rbi may be a bool or a per-sim bool array. The run is charged to the
+        pulled starter if the runner was inherited, else the current pitcher.
+        """
+        if not sims.size:
+            return
+        batter = self.batter[sims]
+        first_inning = self.inning[sims] == 1
+        first_three = self.inning[sims] <= 3
+        self.runs[sims, self.half[sims]] += 1
+        self.runs_inning[sims] += 1
+
+        self._h('bR', runner, sims)
+        new = ~self.first_run[sims]
+        self._h('bFirstRun', runner[new], sims[new])
+        self.first_run[sims] = True
+        self._h('bFirstInnR', runner, sims, first_inning)
+        self._h('bFirstInnHRBI', runner, sims, first_inning)
+        self._h('bFirst3InnR', runner, sims, first_three)
+        self._h('bFirst3InnHRBI', runner, sims, first_three)
+
+        rbi = np.broadcast_to(rbi, sims.shape)
+        s, b = sims[rbi], batter[rbi]
+        self._h('bRBI', b, s)
+        new = ~self.first_rbi[s]
+        self._h('bFirstRBI', b[new], s[new])
+        self.first_rbi[s] = True
+        self._h('bFirstInnHRBI', b, s, first_inning[rbi])
+        self._h('bFirst3InnHRBI', b, s, first_three[rbi])
+
+        inherited = (self.inherited[sims] == runner[:, None]).any(axis=1)
+        charged = np.where(inherited, 2 * (1 - self.half[sims]), self.pitcher[sims])
+        self._p('pR', charged, sims)
+        new = ~self.first_run_allowed[sims]
+        self._p('pFirstRunAllowed', charged[new], sims[new])
+        self.first_run_allowed[sims] = True
+        self._p('pFirstInnR', charged, sims, first_inning)
+        self._p('pFirst3InnR', charged, sims, first_three)
+
+    def _score_from(self, sims, runners, rbi=True):
+        on_base = runners != EMPTY
+        self._score(sims[on_base], runners[on_base], rbi)
+
+    def _free_pass(self, sims, batter_stat, pitcher_stat, pitch_kind):
+        self._h(batter_stat, self.batter[sims], sims)
+        self._p(pitcher_stat, self.pitcher[sims], sims)
+        self._add_pitches(sims, pitch_kind)
+        old = self.bases[sims]
+        self._score_from(sims, old[:, 2])
+        self.bases[sims] = np.column_stack((self.batter[sims], old[:, 0], old[:, 1]))
+
+    def _single(self, sims):
+        self._h('b1B', self.batter[sims], sims)
+        self._p('p1B', self.pitcher[sims], sims)
+        self._add_pitches(sims, 'hit')
+        old = self.bases[sims]
+        self._score_from(sims, old[:, 2])
+        self.bases[sims] = np.column_stack((self.batter[sims], old[:, 0], old[:, 1]))
+        lead = np.where(old[:, 1] != EMPTY, 2, np.where(old[:, 0] != EMPTY, 1, EMPTY))
+        has_lead = lead != EMPTY
+        self._extra_base(sims[has_lead], lead[has_lead], single=True)
+
+    def _double(self, sims):
+        self._h('b2B', self.batter[sims], sims)
+        self._p('p2B', self.pitcher[sims], sims)
+        self._add_pitches(sims, 'hit')
+        old = self.bases[sims]
+        self._score_from(sims, old[:, 1])
+        self._score_from(sims, old[:, 2])
+        self.bases[sims] = np.column_stack((np.full(sims.size, EMPTY), self.batter[sims], old[:, 0]))
+        has_lead = old[:, 0] != EMPTY
+        self._extra_base(sims[has_lead], np.full(has_lead.sum(), 2), single=False)
+
+    def _triple(self, sims):
+        self._h('b3B', self.batter[sims], sims)
+        self._p('p3B', self.pitcher[sims], sims)
+        self._add_pitches(sims, 'hit')
+        old = self.bases[sims]
+        for base in range(3):
+            self._score_from(sims, old[:, base])
+        self.bases[sims] = EMPTY
+        self.bases[sims, 2] = self.batter[sims]
+
+    def _home_run(self, sims):
+        batter = self.batter[sims]
+        pitcher = self.pitcher[sims]
+        first_inning = self.inning[sims] == 1
+        first_three = self.inning[sims] <= 3
+        self.runs[sims, self.half[sims]] += 1
+        self.runs_inning[sims] += 1
+        for stat in ('bHR', 'bR', 'bRBI'):
+            self._h(stat, batter, sims)
+        new = ~self.first_hr[sims]
+        self._h('bFirstHR', batter[new], sims[new])
+        self.first_hr[sims] = True
+        self._h('bFirstInnR', batter, sims, first_inning)
+        self._h('bFirstInnHRBI', batter, sims, first_inning)
+        self._h('bFirst3InnR', batter, sims, first_three)
+        self._h('bFirst3InnHRBI', batter, sims, first_three)
+        self._p('pHR', pitcher, sims)
+        self._p('pR', pitcher, sims)
+        self._p('pFirstInnR', pitcher, sims, first_inning)
+        self._p('pFirst3InnR', pitcher, sims, first_three)
+        self._add_pitches(sims, 'hit')
+
+        old = self.bases[sims]
+        for base in range(3):
+            self._score_from(sims, old[:, base])
+        self.bases[sims] = EMPTY
+
+    def _extra_base(self, sims, lead, single):
+        """Lead runner tries to take an extra base on a single or double."""
+        if not sims.size:
+            return
+        runner = self.bases[sims, lead]
+        split = self.split[sims]
+        draws = self.rng.random((2, sims.size))
+        attempt = draws[0] < self.advance_attempt[runner, split]
+        success = attempt & (draws[1] < self.advance_success[runner, split])
+        thrown_out = attempt & ~success
+
+        scores = success & (lead == 2)
+        self._score(sims[scores], runner[scores])
+        if single:
+            # Runner from second moves up to third behind the lead runner
+            moves_up = (success | (thrown_out & (lead == 2)))
+            s = sims[moves_up]
+            self.bases[s, 2] = self.bases[s, 1]
+            self.bases[s, 1] = EMPTY
+            s = sims[thrown_out & (lead == 1)]
+            self.bases[s, 1] = EMPTY
+        else:
+            s = sims[scores]
+            self.bases[s, 2] = EMPTY
+            s = sims[thrown_out]
+            self.bases[s, 2] = self.bases[s, 1]
+            self.bases[s, 1] = EMPTY
+
+        s = sims[thrown_out]
+        self.outs[s] += 1
+        self._p('pOuts', self.pitcher[s], s)
+
+    def _out(self, sims):
+        if not sims.size:
+            return
+        batter = self.batter[sims]
+        pitcher = self.pitcher[sims]
+        self._p('pOuts', pitcher, sims)
+
+        draws = self.rng.random(sims.size)
+        strikeout = draws <= self.k_per_out[batter, self.split[sims]]
+        s, b, p = sims[strikeout], batter[strikeout], pitcher[strikeout]
+        first_inning = self.inning[s] == 1
+        first_three = self.inning[s] <= 3
+        self._h('bK', b, s)
+        self._p('pK', p, s)
+        new = ~self.first_k[s]
+        self._p('pFirstK', p[new], s[new])
+        self.first_k[s] = True
+        self._p('pFirstInnK', p, s, first_inning)
+        self._p('pFirst3InnK', p, s, first_three)
+        self._add_pitches(s, 'k')
+        self._add_pitches(sims[~strikeout], 'out')
+
+        self.outs[sims] += 1
+        in_play = ~strikeout & (self.outs[sims] < 3) & (self.bases[sims] != EMPTY).any(axis=1)
+        self._ball_in_play(sims[in_play])
+
+    def _ball_in_play(self, sims):
+        if not sims.size:
+            return
+        old = self.bases[sims]
+        code = (old != EMPTY) @ np.array([1, 2, 4])
+        draws = self.rng.random(sims.size)
+        branch = (BIP_BOUNDS[code] <= draws[:, None]).sum(axis=1)
+
+        outs_added = BIP_OUTS[code, branch]
+        self.outs[sims] += outs_added
+        self._p('pOuts', self.pitcher[sims], sims, outs_added)
+
+        sources = np.column_stack((old, self.batter[sims]))
+        rows = np.arange(sims.size)
+        scorer = BIP_SCORER[code, branch]
+        scores = (scorer != EMPTY) & (self.outs[sims] < 3)
+        self._score(sims[scores], sources[rows[scores], scorer[scores]], BIP_RBI[code, branch][scores])
+
+        new_bases = BIP_BASES[code, branch]
+        moved = np.take_along_axis(sources, np.maximum(new_bases, 0).astype(np.intp), axis=1)
+        self.bases[sims] = np.where(new_bases == EMPTY, EMPTY, moved)
+
+    def _end_half_innings(self, sims):
+        if not sims.size:
+            return
+        inning = self.inning[sims]
+        half = self.half[sims]
+        away_runs, home_runs = self.runs[sims, 0], self.runs[sims, 1]
+        over = (((inning >= 9) & (half == 1) & (away_runs != home_runs))
+                | ((inning == 9) & (half == 0) & (home_runs > away_runs)))
+        self.game_over[sims[over]] = True
+
+        sims = sims[~over]
+        self.outs[sims] = 0
+        self.runs_inning[sims] = 0
+        self.bases[sims] = EMPTY
+        self.inherited[sims] = EMPTY
+
+        # Check if starters are still in line for the win
+        line_for_win = self.p_col['In_Line_For_Win']
+        for team in range(2):
+            s = sims[self.pstats[line_for_win, 2 * team, sims] == 1]
+            self.pstats[line_for_win, 2 * team, s] = self.runs[s, team] > self.runs[s, 1 - team]
+
+        self.inning[sims] += self.half[sims]
+        self.half[sims] = 1 - self.half[sims]
+
+    def _collect(self):
+        away_team, home_team = self.teams
+        hitter_rows = [i for i in range(len(self.hitters)) if i not in self.ph_index]
+        hitters = {
+            'player': [self.hitters[i]['Name'] for i in hitter_rows],
+            'team': [self.hitters[i]['Team'] for i in hitter_rows],
+            'opp': [self.teams[1 - self.hitter_team[i]] for i in hitter_rows],
+            'pos': [self.hitters[i]['Position'] for i in hitter_rows],
+            'stats': {stat: self.hstats[col, hitter_rows]
+                      for stat, col in self.h_col.items()},
+        }
+
+        starters = [0, 2]
+        pitchers = {
+            'player': [self.pitchers[i]['Name'] for i in starters],
+            'team': [self.pitchers[i]['Team'] for i in starters],
+            'opp': [home_team, away_team],
+            'pos': [self.pitchers[i]['Position'] for i in starters],
+            'stats': {stat: self.pstats[col, starters]
+                      for stat, col in self.p_col.items()},
+        }
+        if self.simulator.tilts:
+            weights = np.exp(self.log_weight)
+            hitters['weights'] = np.broadcast_to(weights, (len(hitter_rows), weights.size))
+            pitchers['weights'] = np.broadcast_to(weights, (len(starters), weights.size))
+        return add_derived_stats({'hitters': hitters, 'pitchers': pitchers})
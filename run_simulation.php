@@ -12,6 +12,10 @@ error_log("Run Simulation - Session data: " . print_r($_SESSION, true));
 ini_set('memory_limit', '2G');  // Increased memory limit
 ini_set('max_execution_time', 600); // 10 minutes
 set_time_limit(600);
+// Seconds the Python job may take, leaving headroom before the PHP timeout
+define('SIMULATION_TIME_BUDGET', 540);
+// Simulation engine; runs extend only runs of the same engine
+define('SIMULATION_ENGINE', 'vectorized');
 
 // Set process priority to improve performance
 if (function_exists('proc_nice')) {
@@ -37,6 +41,16 @@ if ($isAjax && $_SERVER['REQUEST_METHOD'] === 'POST') {
     try {
         $fileHandler = new FileHandler();
         $num_simulations = $_POST['num_simulations'] ?? 1000;
+        // Optional precision target; num_simulations then caps the run
+        $target_se = (isset($_POST['target_se']) && is_numeric($_POST['target_se']) && $_POST['target_se'] > 0)
+            ? (float)$_POST['target_se'] : null;
+        // Grow the last published run to num_simulations instead of starting over
+        $extend = !empty($_POST['extend']);
+        if ($extend && $target_se !== null) {
+            // An extension's sims are fixed by num_simulations; it has no stopping rule
+            throw new Exception('Extending the last run cannot be combined with a precision target. '
+                . 'Clear one of the two and run again.');
+        }
         
         error_log("Processing AJAX upload for session: " . session_id());
         error_log("Number of simulations requested: " . $num_simulations);
@@ -115,9 +129,29 @@ if ($isAjax && $_SERVER['REQUEST_METHOD'] === 'POST') {
             throw new Exception('One or both files do not exist. Please try uploading again.');
         }
         
+        // Only the scraped Underdog lines need to reach the precision target when they exist
+        $precision_args = '';
+        if ($extend) {
+            $precision_args = ' --extend';
+        } elseif ($target_se !== null) {
+            $precision_args = ' --target-se ' . escapeshellarg($target_se);
+            $props_file = $current_dir . '/data/sessions/' . session_id() . '/underdog_props.json';
+            if (file_exists($props_file)) {
+                $precision_args .= ' --props-file ' . escapeshellarg($props_file);
+            }
+        }
+        
+        // Keep one seed per session, so re-running after fixing a lineup or
+        // starter only re-simulates the games whose inputs changed
+        if (!isset($_SESSION['simulation_seed'])) {
+            $_SESSION['simulation_seed'] = random_int(0, PHP_INT_MAX);
+        }
+        // An extended run carries on with the seed it was published with
+        $seed_arg = $extend ? '' : ' ' . (int)$_SESSION['simulation_seed'];
+        
         // Execute the simulation handler with optimized environment variables
         $command = sprintf(
-            'cd %s && PYTHONPATH=%s OPENBLAS_NUM_THREADS=2 MKL_NUM_THREADS=2 %s/venv/bin/python3 -O %s %s %s %d > %s 2>&1',
+            'cd %s && PYTHONPATH=%s OPENBLAS_NUM_THREADS=2 MKL_NUM_THREADS=2 %s/venv/bin/python3 -O %s %s %s %d%s --engine %s --time-budget %d%s > %s 2>&1',
             escapeshellarg($current_dir),
             escapeshellarg($current_dir),
             escapeshellarg($current_dir),
@@ -125,6 +159,10 @@ if ($isAjax && $_SERVER['REQUEST_METHOD'] === 'POST') {
             escapeshellarg($hitter_path),
             escapeshellarg($pitcher_path),
             $num_simulations,
+            $seed_arg,
+            escapeshellarg(SIMULATION_ENGINE),
+            SIMULATION_TIME_BUDGET,
+            $precision_args,
             escapeshellarg($log_file)
         );
         
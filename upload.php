@@ -195,6 +195,22 @@ $hasActiveSubscription = $userId ? $subscriptionHelper->hasActiveSubscription($u
                 </div>
             </div>
             
+            <div class="mb-3">
+                <label for="target_se" class="form-label">Target Precision (optional)</label>
+                <input type="number" class="form-control" id="target_se" name="target_se" step="0.001" min="0.001" max="0.05" placeholder="e.g. 0.005">
+                <div class="form-text">
+                    Stop early once every prop probability has at most this standard error. The number of simulations above becomes the maximum.
+                </div>
+            </div>
+            
+            <div class="mb-3 form-check">
+                <input type="checkbox" class="form-check-input" id="extend" name="extend" value="1">
+                <label for="extend" class="form-check-label">Add to my last run</label>
+                <div class="form-text">
+                    Keep the simulations already run for these same files and only simulate up to the new total.
+                </div>
+            </div>
+            
             <button type="submit" class="btn btn-primary">Run Simulations</button>
         </form>
     </div>
@@ -282,6 +298,12 @@ $hasActiveSubscription = $userId ? $subscriptionHelper->hasActiveSubscription($u
                         // Step 2: Run the simulation with validated files
                         const simulationFormData = new FormData();
                         simulationFormData.append('num_simulations', formData.get('num_simulations'));
+                        if (formData.get('target_se')) {
+                            simulationFormData.append('target_se', formData.get('target_se'));
+                        }
+                        if (formData.get('extend')) {
+                            simulationFormData.append('extend', '1');
+                        }
                         simulationFormData.append('hitter_path', data.hitter_path);
                         simulationFormData.append('pitcher_path', data.pitcher_path);
                         